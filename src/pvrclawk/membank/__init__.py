@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 
 from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 from pvrclawk.membank.models.session import Session
 
 
@@ -53,18 +54,20 @@ def membank_group(ctx: click.Context, root_path: str, session_id: str | None, fe
     """Manage the graph-based membank."""
     ctx.ensure_object(dict)
     resolved_root = _resolve_storage_root(root_path)
-    storage = StorageEngine(Path(resolved_root))
+    storage = open_storage(Path(resolved_root))
     ctx.obj["root_path"] = str(resolved_root)
     ctx.obj["session"] = _resolve_session(storage, session_id)
     ctx.obj["federated"] = federated
 
 
 from pvrclawk.membank.commands.config import register_config  # noqa: E402
+from pvrclawk.membank.commands.export import register_export  # noqa: E402
 from pvrclawk.membank.commands.focus import register_focus  # noqa: E402
 from pvrclawk.membank.commands.forctx import register_forctx  # noqa: E402
 from pvrclawk.membank.commands.init import register_init  # noqa: E402
 from pvrclawk.membank.commands.last import register_last  # noqa: E402
 from pvrclawk.membank.commands.link import register_link  # noqa: E402
+from pvrclawk.membank.commands.migrate import register_migrate  # noqa: E402
 from pvrclawk.membank.commands.mood import register_mood  # noqa: E402
 from pvrclawk.membank.commands.node import register_node  # noqa: E402
 from pvrclawk.membank.commands.prune import register_prune  # noqa: E402
@@ -79,6 +82,8 @@ register_focus(membank_group)
 register_forctx(membank_group)
 register_last(membank_group)
 register_prune(membank_group)
+register_migrate(membank_group)
+register_export(membank_group)
 register_mood(membank_group)
 register_rules(membank_group)
 register_session(membank_group)
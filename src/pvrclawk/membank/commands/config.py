@@ -3,7 +3,7 @@ from pathlib import Path
 import click
 
 from pvrclawk.membank.core.config import load_config, set_config_value
-from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 
 
 def register_config(group: click.Group) -> None:
@@ -20,7 +20,7 @@ def register_config(group: click.Group) -> None:
     def set_command(ctx: click.Context, key: str, value: str) -> None:
         """Set a configuration key to a value."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
         storage.init_db()
         set_config_value(storage.config_file, key, value)
         click.echo(f"{key}={value}")
@@ -31,7 +31,7 @@ def register_config(group: click.Group) -> None:
     def get_command(ctx: click.Context, key: str) -> None:
         """Get a configuration value by dotted key path."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
         config = load_config(storage.config_file)
         value = config
         for part in key.split("."):
@@ -43,6 +43,6 @@ def register_config(group: click.Group) -> None:
     def list_command(ctx: click.Context) -> None:
         """Print the full configuration as JSON."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
         config = load_config(storage.config_file)
         click.echo(config.model_dump_json(indent=2))
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import click
+
+from pvrclawk.membank.core.storage.factory import open_storage
+from pvrclawk.utils.json_io import DEFAULT_CODEC
+
+
+def register_export(group: click.Group) -> None:
+    @group.command("export", help="Dump all nodes and links as one JSON document.")
+    @click.option("--pretty", is_flag=True, help="Indent the JSON for reading.")
+    @click.option(
+        "--output",
+        "output_path",
+        type=click.Path(dir_okay=False, path_type=Path),
+        default=None,
+        help="Write to this file instead of stdout.",
+    )
+    @click.pass_context
+    def export_command(ctx: click.Context, pretty: bool, output_path: Path | None) -> None:
+        """Dump all nodes and links as one JSON document."""
+        storage = open_storage(Path(ctx.obj["root_path"]))
+        document = {
+            "nodes": list(storage.raw_node_payloads().values()),
+            "links": storage.raw_link_payloads(),
+        }
+        blob = DEFAULT_CODEC.dumps(document, pretty=pretty)
+        if output_path is None:
+            click.echo(blob.decode("utf-8"))
+        else:
+            output_path.write_bytes(blob)
@@ -1,15 +1,31 @@
 from pathlib import Path
+import time
 
 import click
 
-from pvrclawk.membank.commands.render import render_node
+from pvrclawk.membank.commands.render import render_node, stream_ranked
+from pvrclawk.membank.commands.rules import warn_rule_errors
 from pvrclawk.membank.core.federation.service import FederatedMembankService
-from pvrclawk.membank.core.graph.engine import GraphEngine
-from pvrclawk.membank.core.graph.scorer import VectorScorer
-from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.graph.candidates import gather_focus_candidates
+from pvrclawk.membank.core.graph.engine import GraphEngine, build_graph_engine
+from pvrclawk.membank.core.mood.tracker import MoodTracker
+from pvrclawk.membank.core.rules.engine import load_rule_engine
+from pvrclawk.membank.core.storage.cache import QueryCache, config_fingerprint
+from pvrclawk.membank.core.storage.factory import open_storage
 from pvrclawk.membank.models.config import load_config
 from pvrclawk.membank.models.session import Session
 
+# Cached rankings with time decay on are reused within this window; at the default 7-day
+# half-life a link's score moves by under half a percent in it.
+DECAY_BUCKET_SECONDS = 3600
+
+
+def _graph_engine(config) -> GraphEngine:
+    try:
+        return build_graph_engine(config)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+
 
 def register_focus(group: click.Group) -> None:
     @group.command("focus", help="Retrieve ranked nodes relevant to query tags.")
@@ -19,7 +35,9 @@ def register_focus(group: click.Group) -> None:
     def focus_command(ctx: click.Context, tags: str, limit: int) -> None:
         """Retrieve ranked nodes relevant to query tags."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
+        # Link usage from this query is buffered and written once, without an fsync.
+        ctx.call_on_close(storage.flush_link_usage)
         config = load_config(storage.config_file)
         active_session = ctx.obj.get("session")
         active_session = active_session if isinstance(active_session, Session) else None
@@ -27,28 +45,89 @@ def register_focus(group: click.Group) -> None:
         newly_served: list[str] = []
         tag_list = [t.strip() for t in tags.split(",") if t.strip()]
         federated = bool(ctx.obj.get("federated"))
+        # mood.json is read once; only query tags can change a link's mood factor.
+        mood = MoodTracker(storage.mood_file, config, storage.codec).values()
+        query_mood = {tag: mood[tag] for tag in sorted(set(tag_list)) if tag in mood}
+        rule_engine = load_rule_engine(storage.rules_file)
+        warn_rule_errors(rule_engine)
+        rule_adjustments = rule_engine.tag_adjustments(tag_list, mood, config.mood.default)
+        nodes: list = []
+        contributing_links: list[str] = []
+        # Tags of the contributing links, so usage write-back does not look them up in links.json.
+        link_tags: dict[str, list[str]] | None = None
         if federated:
             service = FederatedMembankService(root_path, config)
             try:
-                nodes, links, node_multipliers = service.aggregate_for_focus(tag_list)
+                nodes, links, node_multipliers, total_frequency = service.aggregate_for_focus(tag_list)
             except ValueError as exc:
                 raise click.ClickException(str(exc)) from exc
+            engine = _graph_engine(config)
+            ranked = engine.retrieve(
+                nodes,
+                links,
+                tag_list,
+                limit=limit,
+                node_multipliers=node_multipliers,
+                total_frequency=total_frequency,
+                rule_adjustments=rule_adjustments,
+                mood=query_mood,
+            )
         else:
-            nodes = storage.all_nodes()
-            links = storage.all_links()
-            node_multipliers = {}
-        engine = GraphEngine(VectorScorer(config))
-        ranked = engine.retrieve(nodes, links, tag_list, limit=limit, node_multipliers=node_multipliers)
-
-        node_by_uid = {n.uid: n for n in nodes}
-        for uid, score in ranked:
-            node = node_by_uid.get(uid)
-            if node is not None:
-                already_served = uid in served_uids
-                click.echo(render_node(node, score=score, truncated=already_served))
-                if active_session is not None and not already_served:
-                    newly_served.append(uid)
-                    served_uids.add(uid)
+            cache = QueryCache(storage.cache_dir, config.cache, storage.codec)
+            # Mood and rule factors come from mood.json, which is not versioned by the bank generation;
+            # time decay moves scores with the clock, so the key also carries a coarse time bucket.
+            # Link usage is left out on purpose: every run writes it back, so keying on it would make
+            # each repeat a miss. Cached rankings pick up usage at the next generation or bucket.
+            decay_bucket = int(time.time() // DECAY_BUCKET_SECONDS) if config.decay.half_life_days > 0 else None
+            normalized = [
+                sorted(set(tag_list)),
+                sorted(rule_adjustments.items()),
+                sorted(query_mood.items()),
+                decay_bucket,
+            ]
+            cache_key = cache.key("focus", normalized, limit, config_fingerprint(config), storage.generation())
+            cached = cache.get(cache_key)
+            if cached is not None:
+                ranked = [(uid, score) for uid, score in cached["ranked"]]
+                contributing_links = cached["links"]
+                link_tags = cached.get("link_tags")
+            else:
+                candidates = gather_focus_candidates(storage, tag_list)
+                nodes = candidates.nodes
+                engine = _graph_engine(config)
+                ranked = engine.retrieve(
+                    nodes,
+                    candidates.links,
+                    tag_list,
+                    limit=limit,
+                    adjacency=storage.load_adjacency(),
+                    total_frequency=candidates.total_frequency,
+                    rule_adjustments=rule_adjustments,
+                    mood=query_mood,
+                )
+                contributing_links = engine.contributing_links
+                tags_by_link = {link.uid: link.tags for link in candidates.links}
+                link_tags = {uid: tags_by_link[uid] for uid in contributing_links if uid in tags_by_link}
+                cache.put(cache_key, {"ranked": ranked, "links": contributing_links, "link_tags": link_tags})
+
+        wanted = {uid for uid, _ in ranked}
+        node_by_uid = {n.uid: n for n in nodes if n.uid in wanted}
+
+        def load_ranked(uids: list[str]) -> list:
+            # Expansion neighbors and cached results are loaded together, as lazy views.
+            missing = [uid for uid in uids if uid not in node_by_uid]
+            if missing and not federated:
+                node_by_uid.update((node.uid, node) for node in storage.load_nodes(missing, lazy=True))
+            return [node_by_uid[uid] for uid in uids if uid in node_by_uid]
+
+        for node, score in stream_ranked(ranked, load_ranked):
+            already_served = node.uid in served_uids
+            click.echo(render_node(node, score=score, truncated=already_served))
+            if active_session is not None and not already_served:
+                newly_served.append(node.uid)
+                served_uids.add(node.uid)
 
         if active_session is not None and newly_served:
             storage.record_session_served(active_session, newly_served)
+        if contributing_links:
+            storage.record_link_usage(contributing_links, link_tags=link_tags)
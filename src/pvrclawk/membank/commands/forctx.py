@@ -4,10 +4,13 @@ from pathlib import Path
 
 import click
 
-from pvrclawk.membank.commands.render import render_node
+from pvrclawk.membank.commands.render import render_node, stream_ranked
+from pvrclawk.membank.core.forctx.candidates import gather_forctx_documents
 from pvrclawk.membank.core.forctx.parser import parse_forctx_query
-from pvrclawk.membank.core.forctx.scorer import score_nodes_forctx
-from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.forctx.scorer import rank_nodes_bm25, rank_nodes_forctx
+from pvrclawk.membank.core.storage.cache import QueryCache, config_fingerprint
+from pvrclawk.membank.core.storage.factory import open_storage
+from pvrclawk.membank.models.config import load_config
 from pvrclawk.membank.models.session import Session
 
 
@@ -15,28 +18,49 @@ def register_forctx(group: click.Group) -> None:
     @group.command("forctx", help="Retrieve context by query: #tag for tags, [phrase] for content (tags weighted higher).")
     @click.argument("query", required=True)
     @click.option("--top", type=click.IntRange(min=1), default=50, help="Maximum number of ranked nodes to return (default 50).")
+    @click.option(
+        "--rank",
+        type=click.Choice(["flat", "bm25"]),
+        default="flat",
+        help="Phrase scoring: flat weight per matched phrase (default) or BM25 over the phrase words.",
+    )
     @click.pass_context
-    def forctx_command(ctx: click.Context, query: str, top: int) -> None:
+    def forctx_command(ctx: click.Context, query: str, top: int, rank: str) -> None:
         """Return nodes ranked by tag and content phrase match."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
-        nodes = storage.all_nodes()
+        storage = open_storage(root_path)
+        config = load_config(storage.config_file)
         tag_tokens, content_phrases = parse_forctx_query(query)
-        ranked = score_nodes_forctx(nodes, tag_tokens, content_phrases, top=top)
+        cache = QueryCache(storage.cache_dir, config.cache, storage.codec)
+        normalized = [sorted(set(tag_tokens)), sorted(phrase.lower() for phrase in content_phrases), rank]
+        cache_key = cache.key("forctx", normalized, top, config_fingerprint(config), storage.generation())
+        cached = cache.get(cache_key)
+        if cached is not None:
+            scored = cached["ranked"]
+        else:
+            # One batch so the text index is loaded once for candidates, texts and statistics.
+            with storage.batch():
+                documents = gather_forctx_documents(storage, tag_tokens, content_phrases)
+                if rank == "bm25":
+                    statistics = storage.text_statistics(content_phrases)
+                    ranked_documents = rank_nodes_bm25(documents, tag_tokens, content_phrases, statistics, top=top)
+                else:
+                    ranked_documents = rank_nodes_forctx(documents, tag_tokens, content_phrases, top=top)
+            scored = [(document.uid, score) for document, score in ranked_documents]
+            cache.put(cache_key, {"ranked": scored})
+        # Only the ranked uids are loaded, in one call, and each is validated as it is rendered.
+        ranked = stream_ranked(scored, lambda uids: storage.load_nodes(uids, lazy=True))
 
-        node_by_uid = {n.uid: n for n in nodes}
         active_session = ctx.obj.get("session")
         active_session = active_session if isinstance(active_session, Session) else None
         served_uids = set(active_session.served_uids) if active_session is not None else set()
         newly_served: list[str] = []
 
-        for uid, score in ranked:
-            node = node_by_uid.get(uid)
-            if node is not None:
-                already_served = uid in served_uids
-                click.echo(render_node(node, score=score, truncated=already_served))
-                if active_session is not None and not already_served:
-                    newly_served.append(uid)
-                    served_uids.add(uid)
+        for node, score in ranked:
+            already_served = node.uid in served_uids
+            click.echo(render_node(node, score=score, truncated=already_served))
+            if active_session is not None and not already_served:
+                newly_served.append(node.uid)
+                served_uids.add(node.uid)
         if active_session is not None and newly_served:
             storage.record_session_served(active_session, newly_served)
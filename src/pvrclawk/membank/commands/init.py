@@ -2,7 +2,7 @@ from pathlib import Path
 
 import click
 
-from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 
 
 def register_init(group: click.Group) -> None:
@@ -11,6 +11,6 @@ def register_init(group: click.Group) -> None:
     def init_command(ctx: click.Context) -> None:
         """Initialize membank storage files and directories."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
         storage.init_db()
         click.echo(f"Initialized membank at {root_path}")
@@ -5,7 +5,7 @@ from pathlib import Path
 import click
 
 from pvrclawk.membank.commands.render import render_node
-from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 from pvrclawk.membank.models.session import Session
 
 
@@ -20,8 +20,8 @@ def register_last(group: click.Group) -> None:
     def last_command(ctx: click.Context, top: int) -> None:
         """Return the N most recently updated nodes."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
-        nodes = _sort_recent(storage.all_nodes())
+        storage = open_storage(root_path)
+        nodes = _sort_recent(storage.all_nodes(lazy=True))
         nodes = nodes[:top]
 
         active_session = ctx.obj.get("session")
@@ -5,6 +5,7 @@ import click
 from pvrclawk.membank.core.federation.service import FederatedMembankService
 from pvrclawk.membank.models.config import load_config
 from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 from pvrclawk.membank.models.link import Link
 
 
@@ -30,12 +31,13 @@ def register_link(group: click.Group) -> None:
     @click.pass_context
     def add_command(ctx: click.Context, source_uid: str, target_uid: str, tags: str, weight: float) -> None:
         """Create one link from source UID to target UID."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
-        source_uid = _resolve_uid_reference(storage, source_uid)
-        target_uid = _resolve_uid_reference(storage, target_uid)
-        tag_list = [t.strip() for t in tags.split(",") if t.strip()]
-        link = Link(source=source_uid, target=target_uid, tags=tag_list, weight=weight)
-        storage.save_link(link)
+        storage = open_storage(Path(ctx.obj["root_path"]))
+        with storage.batch():
+            source_uid = _resolve_uid_reference(storage, source_uid)
+            target_uid = _resolve_uid_reference(storage, target_uid)
+            tag_list = [t.strip() for t in tags.split(",") if t.strip()]
+            link = Link(source=source_uid, target=target_uid, tags=tag_list, weight=weight)
+            storage.save_link(link)
         click.echo(link.uid)
 
     @link_group.command("list", help="List outgoing links for a source UID.")
@@ -44,7 +46,7 @@ def register_link(group: click.Group) -> None:
     def list_command(ctx: click.Context, source_uid: str) -> None:
         """List outgoing links for a source UID."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
         federated = bool(ctx.obj.get("federated"))
         if federated:
             config = load_config(storage.config_file)
@@ -65,7 +67,7 @@ def register_link(group: click.Group) -> None:
     @click.pass_context
     def weight_command(ctx: click.Context, tags: str, delta: float) -> None:
         """Adjust weights for links matching all provided tags."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        storage = open_storage(Path(ctx.obj["root_path"]))
         updated = storage.adjust_link_weights_by_tags([t.strip() for t in tags.split(",") if t.strip()], delta)
         click.echo(str(updated))
 
@@ -76,15 +78,16 @@ def register_link(group: click.Group) -> None:
     @click.pass_context
     def chain_command(ctx: click.Context, uids: tuple[str, ...], tags: str, weight: float) -> None:
         """Create sequential links from a list of UIDs."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        storage = open_storage(Path(ctx.obj["root_path"]))
         if len(uids) < 2:
             raise click.ClickException("Chain requires at least two UIDs.")
-        resolved = [_resolve_uid_reference(storage, uid) for uid in uids]
-        tag_list = [t.strip() for t in tags.split(",") if t.strip()]
+        with storage.batch():
+            resolved = [_resolve_uid_reference(storage, uid) for uid in uids]
+            tag_list = [t.strip() for t in tags.split(",") if t.strip()]
 
-        links = [
-            Link(source=resolved[i], target=resolved[i + 1], tags=tag_list, weight=weight)
-            for i in range(len(resolved) - 1)
-        ]
-        created = storage.save_links(links)
+            links = [
+                Link(source=resolved[i], target=resolved[i + 1], tags=tag_list, weight=weight)
+                for i in range(len(resolved) - 1)
+            ]
+            created = storage.save_links(links)
         click.echo(f"Created {created} links")
@@ -0,0 +1,18 @@
+from pathlib import Path
+
+import click
+
+from pvrclawk.membank.core.storage.factory import BACKENDS, migrate_storage
+
+
+def register_migrate(group: click.Group) -> None:
+    @group.command("migrate", help="Convert the bank to another storage backend (json or sqlite).")
+    @click.option("--to", "backend", required=True, type=click.Choice(sorted(BACKENDS)), help="Target storage backend.")
+    @click.pass_context
+    def migrate_command(ctx: click.Context, backend: str) -> None:
+        """Convert the bank to another storage backend (json or sqlite)."""
+        try:
+            nodes, links = migrate_storage(Path(ctx.obj["root_path"]), backend)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        click.echo(f"Migrated {nodes} node(s) and {links} link(s) to {backend}")
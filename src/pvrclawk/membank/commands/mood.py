@@ -1,10 +1,29 @@
 from pathlib import Path
+import sys
 
 import click
 
 from pvrclawk.membank.core.mood.tracker import MoodTracker
-from pvrclawk.membank.core.storage.engine import StorageEngine
-from pvrclawk.membank.models.config import AppConfig
+from pvrclawk.membank.core.storage.factory import open_storage
+from pvrclawk.membank.models.config import load_config
+
+
+def parse_mood_reports(lines) -> list[tuple[str, float]]:
+    """Parse `<tag> <value>` lines (`tag=value` and `tag,value` also work); skip blanks and `#` comments."""
+    reports: list[tuple[str, float]] = []
+    for number, line in enumerate(lines, start=1):
+        text = line.split("#", 1)[0].strip()
+        if not text:
+            continue
+        parts = text.replace("=", " ").replace(",", " ").split()
+        try:
+            if len(parts) != 2:
+                raise ValueError
+            reports.append((parts[0], float(parts[1])))
+        except ValueError:
+            expected = "expected '<tag> <value>'"
+            raise ValueError(f"Invalid mood report on line {number}: {line.strip()!r} ({expected})") from None
+    return reports
 
 
 def register_mood(group: click.Group) -> None:
@@ -12,14 +31,26 @@ def register_mood(group: click.Group) -> None:
     def report_group() -> None:
         """Submit observations that influence mood-aware scoring."""
 
-    @report_group.command("mood", help="Report a mood value for a tag.")
-    @click.argument("tag")
-    @click.argument("value", type=float)
+    @report_group.command("mood", help="Report a mood value for a tag, or many '<tag> <value>' lines with --stdin.")
+    @click.argument("tag", required=False)
+    @click.argument("value", type=float, required=False)
+    @click.option("--stdin", "from_stdin", is_flag=True, help="Read '<tag> <value>' lines from stdin and apply them at once.")
     @click.pass_context
-    def mood_command(ctx: click.Context, tag: str, value: float) -> None:
+    def mood_command(ctx: click.Context, tag: str | None, value: float | None, from_stdin: bool) -> None:
         """Report a mood value for a tag."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        if from_stdin:
+            if tag is not None:
+                raise click.UsageError("Pass either TAG VALUE or --stdin, not both.")
+            try:
+                reports = parse_mood_reports(sys.stdin)
+            except ValueError as exc:
+                raise click.ClickException(str(exc)) from exc
+        elif tag is None or value is None:
+            raise click.UsageError("TAG and VALUE are required unless --stdin is given.")
+        else:
+            reports = [(tag, value)]
+        storage = open_storage(Path(ctx.obj["root_path"]))
         storage.init_db()
-        tracker = MoodTracker(storage.mood_file, AppConfig())
-        updated = tracker.report(tag, value)
-        click.echo(f"{tag}={updated}")
+        tracker = MoodTracker(storage.mood_file, load_config(storage.config_file), storage.codec)
+        for name, updated in tracker.report_many(reports).items():
+            click.echo(f"{name}={updated}")
@@ -5,6 +5,7 @@ import click
 from pvrclawk.membank.commands.render import render_node, render_node_detail
 from pvrclawk.membank.core.federation.service import FederatedMembankService
 from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 from pvrclawk.membank.models.config import load_config
 from pvrclawk.membank.models.nodes import (
     Bug,
@@ -106,7 +107,7 @@ def register_node(group: click.Group) -> None:
         criteria: tuple[str, ...],
     ) -> None:
         """Create a node for the given node type."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        storage = open_storage(Path(ctx.obj["root_path"]))
         storage.init_db()
         parsed_tags = _parse_tags(tags)
 
@@ -149,7 +150,7 @@ def register_node(group: click.Group) -> None:
     def get_node(ctx: click.Context, uid: str | None, last_n: int | None) -> None:
         """Show full detail for a single node by UID."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
         federated = bool(ctx.obj.get("federated"))
         node = None
         resolved_uid = uid or ""
@@ -187,9 +188,10 @@ def register_node(group: click.Group) -> None:
         if new_status not in allowed_statuses:
             raise click.ClickException(f"Invalid status: {new_status}")
 
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
-        resolved_uid = _resolve_uid_reference(storage, uid, last_n, allow_unresolved_uid=True)
-        ok = storage.update_node_status(resolved_uid, new_status)
+        storage = open_storage(Path(ctx.obj["root_path"]))
+        with storage.batch():
+            resolved_uid = _resolve_uid_reference(storage, uid, last_n, allow_unresolved_uid=True)
+            ok = storage.update_node_status(resolved_uid, new_status)
         if ok:
             click.echo(f"Status updated to {new_status}")
         else:
@@ -202,7 +204,7 @@ def register_node(group: click.Group) -> None:
     def list_nodes(ctx: click.Context, node_type: str, top: int | None) -> None:
         """List all nodes of a given type."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
         active_session = ctx.obj.get("session")
         active_session = active_session if isinstance(active_session, Session) else None
         served_uids = set(active_session.served_uids) if active_session is not None else set()
@@ -216,7 +218,7 @@ def register_node(group: click.Group) -> None:
             except ValueError as exc:
                 raise click.ClickException(str(exc)) from exc
         else:
-            nodes = _sort_recent(storage.load_nodes_by_type(node_type))
+            nodes = _sort_recent(storage.load_nodes_by_type(node_type, lazy=True))
         if top is not None:
             nodes = nodes[:top]
         for node in nodes:
@@ -234,7 +236,7 @@ def register_node(group: click.Group) -> None:
     def list_all_nodes(ctx: click.Context, top: int | None) -> None:
         """List all nodes across all types."""
         root_path = Path(ctx.obj["root_path"])
-        storage = StorageEngine(root_path)
+        storage = open_storage(root_path)
         active_session = ctx.obj.get("session")
         active_session = active_session if isinstance(active_session, Session) else None
         served_uids = set(active_session.served_uids) if active_session is not None else set()
@@ -248,7 +250,7 @@ def register_node(group: click.Group) -> None:
             except ValueError as exc:
                 raise click.ClickException(str(exc)) from exc
         else:
-            nodes = _sort_recent(storage.all_nodes())
+            nodes = _sort_recent(storage.all_nodes(lazy=True))
         if top is not None:
             nodes = nodes[:top]
         for node in nodes:
@@ -266,9 +268,10 @@ def register_node(group: click.Group) -> None:
     @click.pass_context
     def remove_node(ctx: click.Context, uid: str | None, last_n: int | None) -> None:
         """Remove a single node by UID."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
-        resolved_uid = _resolve_uid_reference(storage, uid, last_n, allow_unresolved_uid=True)
-        ok = storage.remove_node(resolved_uid)
+        storage = open_storage(Path(ctx.obj["root_path"]))
+        with storage.batch():
+            resolved_uid = _resolve_uid_reference(storage, uid, last_n, allow_unresolved_uid=True)
+            ok = storage.remove_node(resolved_uid)
         if ok:
             click.echo(f"Removed node {resolved_uid}")
         else:
@@ -282,7 +285,7 @@ def register_node(group: click.Group) -> None:
         """Remove all nodes of one type (requires --all)."""
         if not confirm_all:
             raise click.ClickException("Use --all to confirm bulk removal by type.")
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        storage = open_storage(Path(ctx.obj["root_path"]))
         removed = storage.remove_nodes_by_type(node_type)
         click.echo(f"Removed {removed} node(s) of type {node_type}")
 
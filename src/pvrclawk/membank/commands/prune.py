@@ -2,7 +2,7 @@ from pathlib import Path
 
 import click
 
-from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 
 
 def register_prune(group: click.Group) -> None:
@@ -10,6 +10,6 @@ def register_prune(group: click.Group) -> None:
     @click.pass_context
     def prune_command(ctx: click.Context) -> None:
         """Rebalance node storage clusters and rebuild indexes."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        storage = open_storage(Path(ctx.obj["root_path"]))
         name = storage.prune()
         click.echo(name)
@@ -1,5 +1,7 @@
 """Shared node rendering for CLI output."""
 
+from collections.abc import Callable, Iterable, Iterator
+
 from pvrclawk.membank.models.nodes import (
     Bug,
     Feature,
@@ -12,11 +14,16 @@ from pvrclawk.membank.models.nodes import (
     SubTask,
     Task,
 )
+from pvrclawk.membank.models.view import NodeView, materialize
+
+
+def _type_name(node) -> str:
+    return node.node_class.__name__ if isinstance(node, NodeView) else node.__class__.__name__
 
 
 def render_node(node, score: float | None = None, truncated: bool = False) -> str:
     tag_str = ",".join(node.tags.keys()) if node.tags else ""
-    ntype = node.__class__.__name__
+    ntype = _type_name(node)
     if score is not None:
         header = f"[{score:.3f}] ({ntype}) {tag_str}"
     else:
@@ -25,6 +32,7 @@ def render_node(node, score: float | None = None, truncated: bool = False) -> st
     if truncated:
         return header
 
+    node = materialize(node)
     if isinstance(node, Memory):
         return f"{header}\n  {node.content}"
     if isinstance(node, MemoryLink):
@@ -59,8 +67,25 @@ def render_node(node, score: float | None = None, truncated: bool = False) -> st
     return f"{header}\n  {node.uid}"
 
 
+def stream_ranked(
+    ranked: Iterable[tuple[str, float]], load: Callable[[list[str]], Iterable]
+) -> Iterator[tuple[object, float]]:
+    """Yield (node, score) for ranked uids in rank order; uids `load` does not return are skipped.
+
+    All uids are resolved with one `load` call. Pass a loader returning lazy views so each node
+    is only validated when the caller renders it.
+    """
+    ranked = list(ranked)
+    nodes = {node.uid: node for node in load([uid for uid, _ in ranked])}
+    for uid, score in ranked:
+        node = nodes.get(uid)
+        if node is not None:
+            yield node, score
+
+
 def render_node_detail(node) -> str:
     """Full detail view for node get."""
+    node = materialize(node)
     lines = [f"uid: {node.uid}"]
     lines.append(f"type: {node.__class__.__name__}")
     lines.append(f"tags: {', '.join(f'{k}:{v}' for k, v in node.tags.items())}")
@@ -2,7 +2,15 @@ from pathlib import Path
 
 import click
 
-from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.rules.compiler import compile_rule
+from pvrclawk.membank.core.rules.engine import RuleEngine
+from pvrclawk.membank.core.storage.factory import open_storage
+
+
+def warn_rule_errors(engine: RuleEngine) -> None:
+    """Report stored rules that no longer compile on stderr; scoring skips them."""
+    for rule, error in engine.errors.items():
+        click.echo(f"warning: skipping rule {rule!r}: {error}", err=True)
 
 
 def register_rules(group: click.Group) -> None:
@@ -15,15 +23,22 @@ def register_rules(group: click.Group) -> None:
     @click.pass_context
     def add_command(ctx: click.Context, rule: str) -> None:
         """Add one rule expression to rules storage."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
-        storage.init_db()
-        storage.add_rule(rule)
+        try:
+            compile_rule(rule)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        storage = open_storage(Path(ctx.obj["root_path"]))
+        with storage.batch():
+            storage.init_db()
+            storage.add_rule(rule)
         click.echo("ok")
 
     @rule_group.command("list", help="List all configured rule expressions.")
     @click.pass_context
     def list_command(ctx: click.Context) -> None:
         """List all configured rule expressions."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
-        for rule in storage.list_rules():
+        storage = open_storage(Path(ctx.obj["root_path"]))
+        rules = storage.list_rules()
+        for rule in rules:
             click.echo(rule)
+        warn_rule_errors(RuleEngine(rules, strict=False))
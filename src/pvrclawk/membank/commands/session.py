@@ -3,7 +3,7 @@ from pathlib import Path
 
 import click
 
-from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 
 
 def register_session(group: click.Group) -> None:
@@ -15,16 +15,17 @@ def register_session(group: click.Group) -> None:
     @click.pass_context
     def session_up(ctx: click.Context) -> None:
         """Start or reuse an active session and print its UUID."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
-        storage.init_db()
-        session = storage.activate_session()
+        storage = open_storage(Path(ctx.obj["root_path"]))
+        with storage.batch():
+            storage.init_db()
+            session = storage.activate_session()
         click.echo(session.session_id)
 
     @session_group.command("tear", help="End the active session and clear session context state.")
     @click.pass_context
     def session_tear(ctx: click.Context) -> None:
         """End the active session and clear session context state."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        storage = open_storage(Path(ctx.obj["root_path"]))
         active = storage.load_active_session()
         if active is None:
             click.echo("No active session.")
@@ -38,7 +39,7 @@ def register_session(group: click.Group) -> None:
     @click.pass_context
     def session_reset(ctx: click.Context) -> None:
         """Clear served UID history for the active session."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        storage = open_storage(Path(ctx.obj["root_path"]))
         active = storage.load_active_session()
         if active is None:
             click.echo("No active session.")
@@ -50,7 +51,7 @@ def register_session(group: click.Group) -> None:
     @click.pass_context
     def session_info(ctx: click.Context) -> None:
         """Show active session UUID, age, and served UID count."""
-        storage = StorageEngine(Path(ctx.obj["root_path"]))
+        storage = open_storage(Path(ctx.obj["root_path"]))
         active = storage.load_active_session()
         if active is None:
             click.echo("No active session.")
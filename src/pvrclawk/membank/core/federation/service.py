@@ -3,6 +3,7 @@ from pathlib import Path
 import re
 
 from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import open_storage
 from pvrclawk.membank.models.base import BaseNode
 from pvrclawk.membank.models.config import AppConfig
 from pvrclawk.membank.models.link import Link
@@ -69,18 +70,23 @@ class FederatedMembankService:
             )
         return contexts
 
-    def aggregate_for_focus(self, query_tags: list[str]) -> tuple[list[BaseNode], list[Link], dict[str, float]]:
+    def aggregate_for_focus(
+        self, query_tags: list[str]
+    ) -> tuple[list[BaseNode], list[Link], dict[str, float], int]:
+        """Return nodes, links, per-node bank multipliers and the total link usage across banks."""
         contexts = self.discover_banks()
         all_nodes: list[BaseNode] = []
         all_links: list[Link] = []
         multipliers: dict[str, float] = {}
         nodes_by_bank: dict[str, list[BaseNode]] = {}
+        total_frequency = 0
         for ctx in contexts:
-            storage = StorageEngine(ctx.root)
+            storage = open_storage(ctx.root)
             nodes = storage.all_nodes()
             links = storage.all_links()
             all_nodes.extend(nodes)
             all_links.extend(links)
+            total_frequency += storage.total_link_usage()
             nodes_by_bank[ctx.bank_id] = nodes
             multiplier = self._bank_multiplier(ctx)
             for node in nodes:
@@ -88,12 +94,13 @@ class FederatedMembankService:
 
         cross_links = self._build_cross_bank_links(nodes_by_bank, query_tags)
         all_links.extend(cross_links)
-        return all_nodes, all_links, multipliers
+        total_frequency += sum(max(link.usage_count, 0) for link in cross_links)
+        return all_nodes, all_links, multipliers, total_frequency
 
     def aggregate_nodes(self, node_type: str | None = None) -> list[BaseNode]:
         nodes: list[BaseNode] = []
         for ctx in self.discover_banks():
-            storage = StorageEngine(ctx.root)
+            storage = open_storage(ctx.root)
             if node_type is None:
                 nodes.extend(storage.all_nodes())
             else:
@@ -103,7 +110,7 @@ class FederatedMembankService:
     def aggregate_node_by_uid(self, uid_or_prefix: str) -> BaseNode | None:
         matches: list[BaseNode] = []
         for ctx in self.discover_banks():
-            storage = StorageEngine(ctx.root)
+            storage = open_storage(ctx.root)
             resolved, reason = storage.resolve_uid_with_reason(uid_or_prefix)
             if reason in {"exact", "prefix"} and resolved is not None:
                 node = storage.load_node(resolved)
@@ -116,7 +123,7 @@ class FederatedMembankService:
     def aggregate_links_by_source_uid(self, uid_or_prefix: str) -> list[Link]:
         matches: list[tuple[StorageEngine, str]] = []
         for ctx in self.discover_banks():
-            storage = StorageEngine(ctx.root)
+            storage = open_storage(ctx.root)
             resolved, reason = storage.resolve_uid_with_reason(uid_or_prefix)
             if reason in {"exact", "prefix"} and resolved is not None:
                 matches.append((storage, resolved))
@@ -0,0 +1,31 @@
+"""Index-driven candidate generation for forctx."""
+
+from pvrclawk.membank.core.forctx.scorer import SearchDocument
+from pvrclawk.membank.core.storage.engine import StorageEngine
+
+
+def gather_forctx_documents(
+    storage: StorageEngine, tag_tokens: list[str], content_phrases: list[str]
+) -> list[SearchDocument]:
+    """Return the nodes that can score for a forctx query as `SearchDocument`s, in bank order.
+
+    Tag matches come from the index's tag postings and phrase matches from the text index, and
+    each candidate's searchable text is read from the text index too, so neither cluster files
+    nor node models are touched; callers hydrate only the nodes they render. Phrases are still
+    confirmed on the full text by the rankers. A phrase without word characters and shorter
+    than a trigram cannot be looked up and falls back to every node.
+    """
+    matched_tags: dict[str, set[str]] = {}
+    for tag, uids in storage.tag_postings(tag_tokens).items():
+        for uid in uids:
+            matched_tags.setdefault(uid, set()).add(tag)
+    wanted: set[str] | None = set(matched_tags)
+    for uids in storage.search_text(content_phrases):
+        if uids is None:
+            wanted = None
+            break
+        wanted.update(uids)
+    # Keep bank order so score ties rank as they do over all_nodes().
+    ordered = storage.bank_order(wanted)
+    texts = storage.load_search_texts(ordered)
+    return [SearchDocument(uid, frozenset(matched_tags.get(uid, ())), texts.get(uid, "")) for uid in ordered]
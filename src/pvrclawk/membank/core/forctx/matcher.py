@@ -0,0 +1,75 @@
+"""Find which forctx phrases occur in a text.
+
+A few phrases are fastest with one `in` scan each, which runs in C. From
+`AUTOMATON_MIN_PHRASES` on, the matcher builds an Aho-Corasick automaton once per query and
+finds every phrase in one pass over the text, so the cost of long pasted queries stops growing
+with the phrase count.
+"""
+
+from collections import deque
+
+# Phrase count from which one automaton pass beats repeated `in` scans.
+AUTOMATON_MIN_PHRASES = 64
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over a fixed set of patterns.
+
+    Failure links are folded into a full transition table (state -> char -> state), so each
+    character of the text costs one dict lookup; characters no pattern contains go to the root.
+    """
+
+    def __init__(self, patterns: list[str]):
+        goto: list[dict[str, int]] = [{}]
+        # Pattern indices that end at each state, including those reached through failure links.
+        self.out: list[tuple[int, ...]] = [()]
+        self.pattern_count = len(patterns)
+        for position, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                following = goto[state].get(char)
+                if following is None:
+                    following = len(goto)
+                    goto[state][char] = following
+                    goto.append({})
+                    self.out.append(())
+                state = following
+            self.out[state] += (position,)
+
+        fail = [0] * len(goto)
+        self.delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        # Breadth-first, so a state's failure target is complete before the state itself.
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self.delta[state] = {**self.delta[fail[state]], **goto[state]}
+            for char, following in goto[state].items():
+                fail[following] = self.delta[fail[state]].get(char, 0) if state else 0
+                self.out[following] += self.out[fail[following]]
+                queue.append(following)
+
+    def matched(self, text: str) -> set[int]:
+        """Indices of the patterns that occur in `text`; stops once all of them have."""
+        delta, out = self.delta, self.out
+        found: set[int] = set(out[0])
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+                if len(found) == self.pattern_count:
+                    break
+        return found
+
+
+class PhraseMatcher:
+    """Report which of a query's phrases occur in a text, by scans or by automaton."""
+
+    def __init__(self, phrases: list[str], min_automaton_phrases: int = AUTOMATON_MIN_PHRASES):
+        self.phrases = phrases
+        self.automaton = AhoCorasick(phrases) if len(phrases) >= min_automaton_phrases else None
+
+    def matched(self, text: str) -> set[int]:
+        if self.automaton is not None:
+            return self.automaton.matched(text)
+        return {position for position, phrase in enumerate(self.phrases) if phrase in text}
@@ -1,5 +1,11 @@
 """Score nodes by tag and content phrase occurrence (tags weighted higher)."""
 
+from collections.abc import Iterable
+from dataclasses import dataclass
+import heapq
+import math
+
+from pvrclawk.membank.core.forctx.matcher import PhraseMatcher
 from pvrclawk.membank.models.base import BaseNode
 from pvrclawk.membank.models.nodes import (
     Bug,
@@ -13,13 +19,31 @@ from pvrclawk.membank.models.nodes import (
     SubTask,
     Task,
 )
+from pvrclawk.membank.models.text_index import TextStatistics
+from pvrclawk.membank.models.view import materialize
 
 TAG_WEIGHT = 2.0
 CONTENT_WEIGHT = 1.0
+# BM25 term-frequency saturation and document-length normalization.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    """A node as forctx ranks it, read from the text index instead of a hydrated model.
+
+    `tags` needs to hold only the node's tags that the query names; `text` is lowercased.
+    """
+
+    uid: str
+    tags: frozenset[str]
+    text: str
 
 
 def node_to_searchable_text(node: BaseNode) -> str:
     """Concatenate all searchable text fields of a node for content matching."""
+    node = materialize(node)
     parts: list[str] = [node.uid]
     if isinstance(node, Memory):
         parts.append(node.content)
@@ -46,8 +70,14 @@ def node_to_searchable_text(node: BaseNode) -> str:
     return " ".join(str(p) for p in parts if p)
 
 
+def _search_text(item: BaseNode | SearchDocument) -> str:
+    if isinstance(item, SearchDocument):
+        return item.text
+    return node_to_searchable_text(item).lower()
+
+
 def score_nodes_forctx(
-    nodes: list[BaseNode],
+    nodes: list[BaseNode | SearchDocument],
     tag_tokens: list[str],
     content_phrases: list[str],
     tag_weight: float = TAG_WEIGHT,
@@ -55,24 +85,119 @@ def score_nodes_forctx(
     top: int = 50,
 ) -> list[tuple[str, float]]:
     """Score nodes by tag and content occurrence; return (uid, score) sorted desc, limited to top."""
+    ranked = rank_nodes_forctx(nodes, tag_tokens, content_phrases, tag_weight, content_weight, top)
+    return [(node.uid, score) for node, score in ranked]
+
+
+def rank_nodes_forctx(
+    nodes: Iterable[BaseNode | SearchDocument],
+    tag_tokens: list[str],
+    content_phrases: list[str],
+    tag_weight: float = TAG_WEIGHT,
+    content_weight: float = CONTENT_WEIGHT,
+    top: int = 50,
+) -> list[tuple[BaseNode | SearchDocument, float]]:
+    """Return the `top` (node, score) pairs, best first; ties keep input order.
+
+    Nodes may be models (lazy views included) or `SearchDocument`s, which carry their text.
+
+    Keeps a bounded min-heap of the best scores so far. A node's tag score plus every phrase
+    matching is an upper bound on its score, so once the heap is full, nodes that cannot beat
+    its minimum are skipped before their text is built (which would materialize lazy views).
+    Phrases are found with a `PhraseMatcher` built once for the query.
+    """
+    tag_set = set(tag_tokens)
+    phrases = [phrase.lower() for phrase in content_phrases]
+    matcher = PhraseMatcher(phrases)
+    phrase_bound = len(phrases) * content_weight
+    # Entries are (score, -position, node): the root is the lowest score, latest on ties.
+    heap: list[tuple[float, int, BaseNode | SearchDocument]] = []
+
+    for position, node in enumerate(nodes):
+        score = len(tag_set.intersection(node.tags or ())) * tag_weight
+        if len(heap) >= top and score + phrase_bound <= heap[0][0]:
+            continue
+
+        if phrases:
+            score += len(matcher.matched(_search_text(node))) * content_weight
+
+        _keep_top(heap, score, position, node, top)
+
+    return _best_first(heap)
+
+
+def bm25_weight(
+    frequency: int,
+    doc_length: int,
+    document_frequency: int,
+    statistics: TextStatistics,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+) -> float:
+    """Okapi BM25 weight of one query word in one node (non-negative IDF variant)."""
+    if frequency <= 0:
+        return 0.0
+    idf = math.log(1.0 + (statistics.doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+    average = statistics.average_length or 1.0
+    norm = k1 * (1.0 - b + b * doc_length / average)
+    return idf * frequency * (k1 + 1.0) / (frequency + norm)
+
+
+def rank_nodes_bm25(
+    nodes: Iterable[BaseNode | SearchDocument],
+    tag_tokens: list[str],
+    content_phrases: list[str],
+    statistics: TextStatistics,
+    tag_weight: float = TAG_WEIGHT,
+    content_weight: float = CONTENT_WEIGHT,
+    top: int = 50,
+) -> list[tuple[BaseNode | SearchDocument, float]]:
+    """Like `rank_nodes_forctx`, but a phrase found in a node earns the BM25 weight of its words.
+
+    Each phrase contributes `content_weight` times the sum of its words' BM25 weights, so rare
+    words and short nodes count for more; a phrase without words earns `content_weight`. The
+    weights come from `statistics` alone, which bounds a node's score before its text is built.
+    """
     tag_set = set(tag_tokens)
-    scored: list[tuple[str, float]] = []
-
-    for node in nodes:
-        score = 0.0
-        node_tags = set(node.tags.keys()) if node.tags else set()
-        tag_matches = len(tag_set & node_tags)
-        if tag_matches > 0:
-            score += tag_matches * tag_weight
-
-        if content_phrases:
-            text = node_to_searchable_text(node).lower()
-            for phrase in content_phrases:
-                if phrase.lower() in text:
-                    score += content_weight
-
-        if score > 0:
-            scored.append((node.uid, score))
-
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return scored[:top]
+    phrases = [phrase.lower() for phrase in content_phrases]
+    matcher = PhraseMatcher(phrases)
+    heap: list[tuple[float, int, BaseNode | SearchDocument]] = []
+
+    def phrase_weight(phrase: str, uid: str) -> float:
+        words = statistics.phrase_words.get(phrase) or []
+        if not words:
+            return content_weight
+        doc_length = statistics.doc_lengths.get(uid, 0)
+        total = 0.0
+        for word in words:
+            counts = statistics.frequencies.get(word, {})
+            total += bm25_weight(counts.get(uid, 0), doc_length, len(counts), statistics)
+        return content_weight * total
+
+    for position, node in enumerate(nodes):
+        score = len(tag_set.intersection(node.tags or ())) * tag_weight
+        weights = [phrase_weight(phrase, node.uid) for phrase in phrases]
+        if len(heap) >= top and score + sum(weights) <= heap[0][0]:
+            continue
+
+        if phrases:
+            found = matcher.matched(_search_text(node))
+            score += sum(weights[phrase_index] for phrase_index in sorted(found))
+
+        _keep_top(heap, score, position, node, top)
+
+    return _best_first(heap)
+
+
+def _keep_top(heap: list, score: float, position: int, node: BaseNode | SearchDocument, top: int) -> None:
+    if score <= 0:
+        return
+    entry = (score, -position, node)
+    if len(heap) < top:
+        heapq.heappush(heap, entry)
+    elif entry[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, entry)
+
+
+def _best_first(heap: list) -> list[tuple[BaseNode | SearchDocument, float]]:
+    return [(node, score) for score, _, node in sorted(heap, key=lambda item: item[:2], reverse=True)]
@@ -1,4 +1,4 @@
 from pvrclawk.membank.core.graph.scorer import VectorScorer
-from pvrclawk.membank.core.graph.engine import GraphEngine
+from pvrclawk.membank.core.graph.engine import GraphEngine, build_graph_engine
 
-__all__ = ["VectorScorer", "GraphEngine"]
+__all__ = ["VectorScorer", "GraphEngine", "build_graph_engine"]
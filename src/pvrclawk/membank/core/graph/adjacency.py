@@ -0,0 +1,155 @@
+"""Undirected link adjacency in CSR form keyed by dense integer node ids.
+
+On disk (`.pvrclawk/adjacency.bin`, little endian):
+
+    header       magic "PVRADJ02", node count u32, neighbor count u32, uid blob length u32
+    uid offsets  (node count + 1) x u32; uid i is uids[uid_offsets[i]:uid_offsets[i + 1]]
+    uids         concatenated UTF-8 uids sorted by their bytes (dense id = position), padded to 4 bytes
+    offsets      (node count + 1) x u32; neighbors of id i are neighbors[offsets[i]:offsets[i + 1]]
+    neighbors    neighbor count x u32
+
+The file is memory-mapped and a uid is found by binary search over the sorted uid table, so a
+lookup decodes only the uids it touches. Neighbor order matches first-seen link order, like
+`networkx.Graph`. Edges added or nodes removed after the file was written (pending mutation-log
+records) are layered on in memory.
+"""
+
+from collections.abc import Iterable
+import mmap
+from pathlib import Path
+import struct
+import sys
+
+MAGIC = b"PVRADJ02"
+_HEADER = struct.Struct("<8sIII")
+
+
+class Adjacency:
+    def __init__(self, buffer):
+        magic, count, neighbor_count, uid_length = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not an adjacency file")
+        uid_base = _HEADER.size + 4 * (count + 1)
+        offsets_start = uid_base + _padded(uid_length)
+        neighbors_start = offsets_start + 4 * (count + 1)
+        if len(buffer) < neighbors_start + 4 * neighbor_count:
+            raise ValueError("truncated adjacency file")
+        view = memoryview(buffer)
+        self._buffer = buffer
+        self._uid_base = uid_base
+        self._uid_offsets = _u32(view, _HEADER.size, count + 1)
+        self.offsets = _u32(view, offsets_start, count + 1)
+        self.neighbor_ids = _u32(view, neighbors_start, neighbor_count)
+        self.count = count
+        self._extra: dict[str, list[str]] = {}
+        self._removed: set[str] = set()
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[tuple[str, str]]) -> "Adjacency":
+        adjacency: dict[str, dict[str, None]] = {}
+        for source, target in edges:
+            adjacency.setdefault(source, {})[target] = None
+            adjacency.setdefault(target, {})[source] = None
+        uids = sorted(adjacency, key=lambda uid: uid.encode("utf-8"))
+        ids = {uid: position for position, uid in enumerate(uids)}
+        offsets = [0]
+        neighbors: list[int] = []
+        for uid in uids:
+            neighbors.extend(ids[other] for other in adjacency[uid])
+            offsets.append(len(neighbors))
+        return cls(_encode(uids, offsets, neighbors))
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "Adjacency":
+        return cls(blob)
+
+    @classmethod
+    def open(cls, path: Path) -> "Adjacency | None":
+        """Map the file at `path`; None when it is missing or unreadable."""
+        try:
+            with path.open("rb") as handle:
+                view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            return cls(view)
+        except (struct.error, ValueError):
+            view.close()
+            return None
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer)
+
+    @property
+    def uids(self) -> list[str]:
+        return [self._uid(position).decode("utf-8") for position in range(self.count)]
+
+    def _uid(self, position: int) -> bytes:
+        start = self._uid_base + self._uid_offsets[position]
+        return self._buffer[start : self._uid_base + self._uid_offsets[position + 1]]
+
+    def _find(self, uid: str) -> int | None:
+        """Dense id of `uid` in the stored table, or None."""
+        target = uid.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._uid(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._uid(low) == target:
+            return low
+        return None
+
+    def add_edge(self, source: str, target: str) -> None:
+        for node, other in ((source, target), (target, source)):
+            extra = self._extra.setdefault(node, [])
+            if other not in extra:
+                extra.append(other)
+
+    def remove_node(self, uid: str) -> None:
+        self._removed.add(uid)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid not in self._removed and (uid in self._extra or self._find(uid) is not None)
+
+    def neighbors(self, uid: str) -> list[str]:
+        if uid in self._removed:
+            return []
+        found: dict[str, None] = {}
+        position = self._find(uid)
+        if position is not None:
+            for neighbor_id in self.neighbor_ids[self.offsets[position] : self.offsets[position + 1]]:
+                found[self._uid(neighbor_id).decode("utf-8")] = None
+        for other in self._extra.get(uid, ()):
+            found[other] = None
+        return [other for other in found if other not in self._removed]
+
+
+def _encode(uids: list[str], offsets: list[int], neighbors: list[int]) -> bytes:
+    encoded = [uid.encode("utf-8") for uid in uids]
+    uid_offsets = [0]
+    for raw in encoded:
+        uid_offsets.append(uid_offsets[-1] + len(raw))
+    uid_blob = b"".join(encoded)
+    count = len(uids)
+    parts = [
+        _HEADER.pack(MAGIC, count, len(neighbors), len(uid_blob)),
+        struct.pack(f"<{count + 1}I", *uid_offsets),
+        uid_blob.ljust(_padded(len(uid_blob)), b"\0"),
+        struct.pack(f"<{count + 1}I", *offsets),
+        struct.pack(f"<{len(neighbors)}I", *neighbors),
+    ]
+    return b"".join(parts)
+
+
+def _u32(view: memoryview, start: int, count: int):
+    values = view[start : start + 4 * count].cast("I")
+    if sys.byteorder == "big":  # pragma: no cover - files are always little endian
+        return [int.from_bytes(struct.pack("=I", value), "little") for value in values]
+    return values
+
+
+def _padded(length: int) -> int:
+    return (length + 3) & ~3
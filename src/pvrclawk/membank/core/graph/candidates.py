@@ -0,0 +1,43 @@
+"""Index-driven candidate generation for focus."""
+
+from dataclasses import dataclass, field
+
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.models.link import Link
+
+
+@dataclass
+class FocusCandidates:
+    """The only nodes and links that can score for a query, plus the bank-wide usage total."""
+
+    nodes: list = field(default_factory=list)
+    links: list[Link] = field(default_factory=list)
+    total_frequency: int = 0
+
+
+def gather_focus_candidates(storage: StorageEngine, query_tags: list[str]) -> FocusCandidates:
+    """Collect nodes posted under a query tag and links carrying one, plus those links' targets.
+
+    `total_frequency` comes from the storage's running usage total instead of a pass over all links.
+
+    Nodes are hydrated lazily through `load_nodes`, so clusters without candidates are not read.
+    Neighbors reached by 1-hop expansion are hydrated by the caller after ranking.
+    """
+    query = set(query_tags)
+    # One batch so the JSON backend loads its index once for every lookup below.
+    with storage.batch():
+        wanted: set[str] = set()
+        for uids in storage.tag_postings(query).values():
+            wanted.update(uids)
+
+        links: list[Link] = []
+        for payload in storage.links_with_tags(query):
+            links.append(Link.model_validate(payload))
+            wanted.add(payload["target"])
+
+        # Keep bank order so score ties rank as they do over all_nodes().
+        return FocusCandidates(
+            nodes=storage.load_nodes(storage.bank_order(wanted), lazy=True),
+            links=links,
+            total_frequency=storage.total_link_usage(),
+        )
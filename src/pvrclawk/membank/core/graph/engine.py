@@ -1,15 +1,30 @@
 from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import heapq
 
-import networkx as nx
-
+from pvrclawk.membank.core.graph.adjacency import Adjacency
 from pvrclawk.membank.core.graph.scorer import VectorScorer
 from pvrclawk.membank.models.base import BaseNode
+from pvrclawk.membank.models.config import AppConfig
 from pvrclawk.membank.models.link import Link
 
 
+@dataclass(frozen=True)
+class LinkAdjustments:
+    """Per-tag link multipliers for one retrieval: rule factors and mood multipliers."""
+
+    rules: dict[str, float] = field(default_factory=dict)
+    mood: dict[str, float] = field(default_factory=dict)
+
+
 class GraphEngine:
     def __init__(self, scorer: VectorScorer):
         self.scorer = scorer
+        # (link uid, target uid) for every link that scored in the last `score` call.
+        self.link_hits: list[tuple[str, str]] = []
+        # Links that fed a node in the last `retrieve` result, for usage write-back.
+        self.contributing_links: list[str] = []
 
     def retrieve(
         self,
@@ -18,43 +33,71 @@ class GraphEngine:
         query_tags: list[str],
         limit: int = 5,
         node_multipliers: dict[str, float] | None = None,
+        adjacency: Adjacency | None = None,
+        total_frequency: int | None = None,
+        now: datetime | None = None,
+        rule_adjustments: dict[str, float] | None = None,
+        mood: dict[str, float] | None = None,
     ) -> list[tuple[str, float]]:
-        node_by_uid = {n.uid: n for n in nodes}
-        g = nx.Graph()
-        for uid in node_by_uid:
-            g.add_node(uid)
-        for link in links:
-            g.add_edge(link.source, link.target, weight=link.weight)
+        """Rank node uids for `query_tags`.
 
-        # Phase 1: Direct tag match on nodes themselves
-        scores: dict[str, float] = defaultdict(float)
-        multipliers = node_multipliers or {}
-        for node in nodes:
-            node_tags = set(node.tags.keys()) if isinstance(node.tags, dict) else set()
-            overlap = node_tags & set(query_tags)
-            if overlap:
-                # Sum the tag weights for matching tags
-                direct_score = sum(node.tags.get(t, 0.0) for t in overlap)
-                direct_score *= multipliers.get(node.uid, 1.0)
-                scores[node.uid] += direct_score
+        `adjacency` supplies 1-hop neighbors (e.g. the stored CSR file); without it one is built from `links`.
+        `total_frequency` is the bank-wide link usage total when `links` is only a candidate subset.
+        `now` is the reference time for `decay.half_life_days` (defaults to the current time).
+        `rule_adjustments` maps tags to rule factors (see `RuleEngine.tag_adjustments`).
+        `mood` is the tag -> mood map, loaded once by the caller and turned into per-tag multipliers.
+        """
+        adjustments = LinkAdjustments(
+            rules=rule_adjustments or {}, mood=self.scorer.mood_factors(mood) if mood else {}
+        )
+        ranked = self._rank(
+            nodes, links, query_tags, limit, node_multipliers, adjacency, total_frequency, now, adjustments
+        )
+        returned = {uid for uid, _ in ranked}
+        self.contributing_links = [link_uid for link_uid, target in self.link_hits if target in returned]
+        return ranked
 
-        # Phase 2: Link-based scoring — only add non-zero scores
-        total_frequency = sum(max(l.usage_count, 0) for l in links)
-        for link in links:
-            link_score = self.scorer.score_link(link, query_tags, total_frequency=total_frequency)
-            if link_score > 0:
-                scores[link.target] += link_score * multipliers.get(link.target, 1.0)
+    def _rank(
+        self,
+        nodes: list[BaseNode],
+        links: list[Link],
+        query_tags: list[str],
+        limit: int,
+        node_multipliers: dict[str, float] | None,
+        adjacency: Adjacency | None,
+        total_frequency: int | None,
+        now: datetime | None,
+        adjustments: "LinkAdjustments",
+    ) -> list[tuple[str, float]]:
+        if total_frequency is None:
+            total_frequency = sum(max(l.usage_count, 0) for l in links)
+        now = now or datetime.now(timezone.utc)
+        scores = self.score(nodes, links, query_tags, node_multipliers or {}, total_frequency, now, adjustments)
 
         # Phase 3: Filter zeros, apply resistance threshold, rank, expand 1-hop neighbors
         threshold = self.scorer.config.retrieval.resistance_threshold
+        if self.scorer.config.retrieval.mode == "ppr":
+            seeds = {uid: s for uid, s in scores.items() if s > 0}
+            if seeds and adjacency is None:
+                adjacency = self.build_adjacency(links)
+            activated = self.personalized_pagerank(seeds, adjacency, limit) if seeds else {}
+            above_threshold = {uid: s for uid, s in activated.items() if s >= threshold}
+            return heapq.nlargest(limit, above_threshold.items(), key=lambda x: x[1])
         positive = {
             uid: s for uid, s in scores.items() if s > 0 and s >= threshold
         }
-        ranked = sorted(positive.items(), key=lambda x: x[1], reverse=True)[:limit]
+        ranked = heapq.nlargest(limit, positive.items(), key=lambda x: x[1])
         expanded = dict(ranked)
+        if ranked and adjacency is None:
+            adjacency = self.build_adjacency(links)
+        # A neighbor scores at most half its source, and `ranked` is best first: once that bound
+        # falls below the threshold or a full result's lowest score, no later source can add one.
+        floor = max(threshold, ranked[-1][1] if len(ranked) == limit else 0.0)
         for uid, score in ranked:
-            if uid in g:
-                for neighbor in g.neighbors(uid):
+            if score * 0.5 < floor:
+                break
+            if uid in adjacency:
+                for neighbor in adjacency.neighbors(uid):
                     neighbor_score = score * 0.5
                     if neighbor_score >= threshold:
                         expanded[neighbor] = max(
@@ -64,6 +107,100 @@ class GraphEngine:
         above_threshold = {
             uid: s for uid, s in expanded.items() if s >= threshold
         }
-        return sorted(
-            above_threshold.items(), key=lambda x: x[1], reverse=True
-        )[:limit]
+        return heapq.nlargest(limit, above_threshold.items(), key=lambda x: x[1])
+
+    def score(
+        self,
+        nodes: list[BaseNode],
+        links: list[Link],
+        query_tags: list[str],
+        multipliers: dict[str, float],
+        total_frequency: int,
+        now: datetime,
+        adjustments: "LinkAdjustments",
+    ) -> dict[str, float]:
+        """Direct tag and link scores per uid, in first-scored order (ties rank in this order)."""
+        # Phase 1: Direct tag match on nodes themselves
+        scores: dict[str, float] = defaultdict(float)
+        for node in nodes:
+            node_tags = set(node.tags.keys()) if isinstance(node.tags, dict) else set()
+            overlap = node_tags & set(query_tags)
+            if overlap:
+                # Sum the tag weights for matching tags
+                direct_score = sum(node.tags.get(t, 0.0) for t in overlap)
+                direct_score *= multipliers.get(node.uid, 1.0)
+                scores[node.uid] += direct_score
+
+        # Phase 2: Link-based scoring — only add non-zero scores
+        self.link_hits = []
+        for link in links:
+            mood_factor = self.scorer.mood_factor(link.tags, query_tags, adjustments.mood) if adjustments.mood else 1.0
+            rule_adjustment = self.scorer.rule_factor(link.tags, adjustments.rules) if adjustments.rules else 1.0
+            link_score = self.scorer.score_link(
+                link,
+                query_tags,
+                total_frequency=total_frequency,
+                mood_factor=mood_factor,
+                rule_adjustment=rule_adjustment,
+                now=now,
+            )
+            if link_score > 0:
+                scores[link.target] += link_score * multipliers.get(link.target, 1.0)
+                self.link_hits.append((link.uid, link.target))
+        return scores
+
+    def personalized_pagerank(self, seeds: dict[str, float], adjacency, limit: int) -> dict[str, float]:
+        """Spread seed scores over the link graph with personalized PageRank.
+
+        Runs at most `ppr_depth` iterations, so mass travels at most that many hops. It stops early
+        once the top `limit` is unchanged and the L1 change drops below `ppr_tolerance`. Scores
+        are rescaled by the total seed score so `resistance_threshold` keeps its meaning.
+        """
+        retrieval = self.scorer.config.retrieval
+        damping = retrieval.ppr_damping
+        total = sum(seeds.values())
+        personal = {uid: s / total for uid, s in seeds.items()}
+        rank = dict(personal)
+        previous_top: list[str] | None = None
+        for _ in range(max(retrieval.ppr_depth, 0)):
+            spread: dict[str, float] = defaultdict(float)
+            for uid, mass in rank.items():
+                neighbors = adjacency.neighbors(uid) if uid in adjacency else []
+                if not neighbors:
+                    # Dangling nodes keep their mass instead of leaking it.
+                    spread[uid] += mass
+                    continue
+                share = mass / len(neighbors)
+                for neighbor in neighbors:
+                    spread[neighbor] += share
+            updated = {uid: (1.0 - damping) * p for uid, p in personal.items()}
+            for uid, mass in spread.items():
+                updated[uid] = updated.get(uid, 0.0) + damping * mass
+            change = sum(abs(updated.get(uid, 0.0) - rank.get(uid, 0.0)) for uid in updated.keys() | rank.keys())
+            rank = updated
+            top = [uid for uid, _ in heapq.nlargest(limit, rank.items(), key=lambda x: x[1])]
+            if top == previous_top and change < retrieval.ppr_tolerance:
+                break
+            previous_top = top
+        return {uid: mass * total for uid, mass in rank.items()}
+
+    def build_adjacency(self, links: list[Link]):
+        return Adjacency.from_edges((link.source, link.target) for link in links)
+
+
+def build_graph_engine(config: AppConfig) -> GraphEngine:
+    """Return the retrieval engine selected by `retrieval.engine`.
+
+    Raises ValueError when `numpy` is selected but numpy is not installed.
+    """
+    scorer = VectorScorer(config)
+    if config.retrieval.engine == "numpy":
+        try:
+            from pvrclawk.membank.core.graph.vectorized import NumpyGraphEngine
+        except ImportError as exc:
+            raise ValueError(
+                'retrieval.engine = "numpy" needs numpy: install pvrclawk[numpy] '
+                'or set retrieval.engine to "python".'
+            ) from exc
+        return NumpyGraphEngine(scorer)
+    return GraphEngine(scorer)
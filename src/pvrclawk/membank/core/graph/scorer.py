@@ -1,6 +1,17 @@
+from datetime import datetime, timezone
+
 from pvrclawk.membank.models.config import AppConfig
 from pvrclawk.membank.models.link import Link
 
+SECONDS_PER_DAY = 86400.0
+
+
+def epoch_seconds(moment: datetime) -> float:
+    """POSIX timestamp of `moment`; naive datetimes (older banks) are taken as UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
 
 class VectorScorer:
     def __init__(self, config: AppConfig):
@@ -16,6 +27,31 @@ class VectorScorer:
             return 1.0
         return ratio
 
+    def compute_time_decay(self, last_accessed: datetime, now: datetime) -> float:
+        """Halve a link's score for every `decay.half_life_days` since it was last used (0 disables)."""
+        half_life = self.config.decay.half_life_days
+        if half_life <= 0:
+            return 1.0
+        age_days = max(epoch_seconds(now) - epoch_seconds(last_accessed), 0.0) / SECONDS_PER_DAY
+        return 0.5 ** (age_days / half_life)
+
+    def mood_factors(self, mood: dict[str, float]) -> dict[str, float]:
+        """Per-tag mood multipliers: 1.0 at `mood.default`, moving one-for-one with the mood value."""
+        default = self.config.mood.default
+        return {tag: max(1.0 + float(value) - default, 0.0) for tag, value in mood.items()}
+
+    def mood_factor(self, tags, query_tags, factors: dict[str, float]) -> float:
+        """Mean mood multiplier over the link tags that matched the query."""
+        matched = [factors.get(tag, 1.0) for tag in tags if tag in query_tags]
+        return sum(matched) / len(matched) if matched else 1.0
+
+    def rule_factor(self, tags, adjustments: dict[str, float]) -> float:
+        """Product of the precomputed per-tag rule factors for a link's tags."""
+        factor = 1.0
+        for tag in set(tags):
+            factor *= adjustments.get(tag, 1.0)
+        return factor
+
     def score_link(
         self,
         link: Link,
@@ -23,9 +59,11 @@ class VectorScorer:
         total_frequency: int,
         mood_factor: float = 1.0,
         rule_adjustment: float = 1.0,
+        now: datetime | None = None,
     ) -> float:
         tag_match = 1.0 if any(tag in query_tags for tag in link.tags) else 0.0
         if tag_match == 0.0:
             return 0.0
         freq_decay = self.compute_decay(link.usage_count, total_frequency)
-        return tag_match * link.weight * link.decay * freq_decay * mood_factor * rule_adjustment
+        time_decay = self.compute_time_decay(link.last_accessed, now or datetime.now(timezone.utc))
+        return tag_match * link.weight * link.decay * freq_decay * time_decay * mood_factor * rule_adjustment
@@ -0,0 +1,133 @@
+"""NumPy-vectorized focus scoring (`retrieval.engine = "numpy"`).
+
+Nodes and links are flattened into arrays once per call: a sparse node x tag weight matrix in
+coordinate form, and per-link source/target/weight/decay/usage arrays plus a link x tag
+incidence list. Direct tag scores, frequency and time decay, link scores and 1-hop neighbor lookups are
+then array operations, and scores come back in the same first-scored order as `GraphEngine`, so
+ties rank identically.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from pvrclawk.membank.core.graph.engine import GraphEngine, LinkAdjustments
+from pvrclawk.membank.core.graph.scorer import SECONDS_PER_DAY, epoch_seconds
+from pvrclawk.membank.models.base import BaseNode
+from pvrclawk.membank.models.link import Link
+
+
+class ArrayNeighbors:
+    """1-hop neighbor lookups over link endpoint arrays, in first-seen link order."""
+
+    def __init__(self, uids: list[str], ids: dict[str, int], sources: np.ndarray, targets: np.ndarray):
+        self.uids = uids
+        self.ids = ids
+        self.sources = sources
+        self.targets = targets
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self.ids
+
+    def neighbors(self, uid: str) -> list[str]:
+        position = self.ids[uid]
+        outgoing = self.sources == position
+        mask = outgoing | (self.targets == position)
+        other = np.where(outgoing, self.targets, self.sources)[mask]
+        if other.size == 0:
+            return []
+        _, first = np.unique(other, return_index=True)
+        return [self.uids[i] for i in other[np.sort(first)]]
+
+
+class NumpyGraphEngine(GraphEngine):
+    def __init__(self, scorer):
+        super().__init__(scorer)
+        self._neighbors: ArrayNeighbors | None = None
+
+    def score(
+        self,
+        nodes: list[BaseNode],
+        links: list[Link],
+        query_tags: list[str],
+        multipliers: dict[str, float],
+        total_frequency: int,
+        now: datetime,
+        adjustments: LinkAdjustments,
+    ) -> dict[str, float]:
+        uid_ids: dict[str, int] = {}
+        node_rows = np.fromiter((uid_ids.setdefault(node.uid, len(uid_ids)) for node in nodes), dtype=np.int64, count=len(nodes))
+        sources = np.fromiter((uid_ids.setdefault(link.source, len(uid_ids)) for link in links), dtype=np.int64, count=len(links))
+        targets = np.fromiter((uid_ids.setdefault(link.target, len(uid_ids)) for link in links), dtype=np.int64, count=len(links))
+        uids = list(uid_ids)
+        size = len(uids)
+        self._neighbors = ArrayNeighbors(uids, uid_ids, sources, targets)
+
+        query = set(query_tags)
+        multiplier = np.ones(size)
+        for uid, factor in multipliers.items():
+            position = uid_ids.get(uid)
+            if position is not None:
+                multiplier[position] = factor
+
+        # Phase 1: direct tag weights, from the query-tag entries of the node x tag matrix.
+        entry_nodes: list[int] = []
+        entry_weights: list[float] = []
+        for position, node in enumerate(nodes):
+            tags = node.tags if isinstance(node.tags, dict) else {}
+            for tag, weight in tags.items():
+                if tag in query:
+                    entry_nodes.append(position)
+                    entry_weights.append(weight)
+        entry_rows = node_rows[np.asarray(entry_nodes, dtype=np.int64)]
+        direct = np.bincount(entry_rows, weights=np.asarray(entry_weights, dtype=float), minlength=size)
+        scores = direct * multiplier
+        first_seen = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_seen, entry_rows, np.asarray(entry_nodes, dtype=np.int64))
+
+        # Phase 2: link scores = tag match * weight * decay * usage share * time decay * mood * rule factor.
+        self.link_hits = []
+        if links:
+            entries = [(position, tag) for position, link in enumerate(links) for tag in link.tags if tag in query]
+            tag_links = np.fromiter((position for position, _ in entries), dtype=np.int64, count=len(entries))
+            matches = np.bincount(tag_links, minlength=len(links))
+            matched = matches > 0
+            usage = np.fromiter((link.usage_count for link in links), dtype=float, count=len(links))
+            share = np.clip(usage / total_frequency, 0.0, 1.0) if total_frequency > 0 else np.zeros(len(links))
+            weight = np.fromiter((link.weight for link in links), dtype=float, count=len(links))
+            decay = np.fromiter((link.decay for link in links), dtype=float, count=len(links))
+            factors = weight * decay * share * self._time_decay(links, now)
+            if adjustments.mood:
+                # Mood multipliers over the query-tag vocabulary, averaged per link over its matched tags.
+                vocabulary = sorted(query)
+                tag_mood = np.array([adjustments.mood.get(tag, 1.0) for tag in vocabulary])
+                tag_ids = {tag: i for i, tag in enumerate(vocabulary)}
+                entry_tags = np.fromiter((tag_ids[tag] for _, tag in entries), dtype=np.int64, count=len(entries))
+                entry_mood = tag_mood[entry_tags]
+                mood_sum = np.bincount(tag_links, weights=entry_mood, minlength=len(links))
+                factors *= np.divide(mood_sum, matches, out=np.ones(len(links)), where=matched)
+            if adjustments.rules:
+                factors *= np.fromiter(
+                    (self.scorer.rule_factor(link.tags, adjustments.rules) for link in links), dtype=float, count=len(links)
+                )
+            link_scores = np.where(matched, factors, 0.0)
+            scoring = np.nonzero(link_scores > 0)[0]
+            hit_targets = targets[scoring]
+            self.link_hits = [(links[i].uid, uids[j]) for i, j in zip(scoring.tolist(), hit_targets.tolist())]
+            scores += np.bincount(hit_targets, weights=link_scores[scoring] * multiplier[hit_targets], minlength=size)
+            np.minimum.at(first_seen, hit_targets, len(nodes) + scoring)
+
+        order = np.nonzero(first_seen != np.iinfo(np.int64).max)[0]
+        order = order[np.argsort(first_seen[order], kind="stable")]
+        return {uids[i]: float(scores[i]) for i in order}
+
+    def _time_decay(self, links: list[Link], now: datetime) -> np.ndarray:
+        half_life = self.scorer.config.decay.half_life_days
+        if half_life <= 0:
+            return np.ones(len(links))
+        accessed = np.fromiter((epoch_seconds(link.last_accessed) for link in links), dtype=float, count=len(links))
+        age_days = np.maximum(epoch_seconds(now) - accessed, 0.0) / SECONDS_PER_DAY
+        return np.power(0.5, age_days / half_life)
+
+    def build_adjacency(self, links: list[Link]):
+        return self._neighbors
@@ -1,31 +1,42 @@
-import json
 from pathlib import Path
 
 from pvrclawk.membank.models.config import AppConfig
+from pvrclawk.utils.json_io import DEFAULT_CODEC, JsonCodec, atomic_write_bytes
 
 
 class MoodTracker:
-    def __init__(self, mood_file: Path, config: AppConfig):
+    def __init__(self, mood_file: Path, config: AppConfig, codec: JsonCodec = DEFAULT_CODEC):
         self.mood_file = mood_file
         self.config = config
+        self.codec = codec
 
     def _read(self) -> dict[str, float]:
         if not self.mood_file.exists():
             return {}
-        return json.loads(self.mood_file.read_text(encoding="utf-8"))
+        return self.codec.loads(self.mood_file.read_bytes())
 
     def _write(self, data: dict[str, float]) -> None:
-        self.mood_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        atomic_write_bytes(self.mood_file, self.codec.dumps(data))
+
+    def values(self) -> dict[str, float]:
+        """All reported mood values by tag (tags never reported use `mood.default`)."""
+        return {tag: float(value) for tag, value in self._read().items()}
 
     def get(self, tag: str) -> float:
         data = self._read()
         return float(data.get(tag, self.config.mood.default))
 
     def report(self, tag: str, value: float) -> float:
+        return self.report_many([(tag, value)])[tag]
+
+    def report_many(self, reports: list[tuple[str, float]]) -> dict[str, float]:
+        """Apply reports in order with one read and one write; return each tag's final value."""
         data = self._read()
-        old = float(data.get(tag, self.config.mood.default))
         alpha = self.config.mood.smoothing
-        new_value = old * (1 - alpha) + value * alpha
-        data[tag] = new_value
-        self._write(data)
-        return new_value
+        updated: dict[str, float] = {}
+        for tag, value in reports:
+            old = float(data.get(tag, self.config.mood.default))
+            data[tag] = updated[tag] = old * (1 - alpha) + value * alpha
+        if updated:
+            self._write(data)
+        return updated
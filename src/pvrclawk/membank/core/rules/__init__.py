@@ -1,4 +1,5 @@
-from pvrclawk.membank.core.rules.engine import RuleEngine
+from pvrclawk.membank.core.rules.compiler import CompiledRule, compile_rule
+from pvrclawk.membank.core.rules.engine import RuleEngine, load_rule_engine
 from pvrclawk.membank.core.rules.parser import parse_rule
 
-__all__ = ["RuleEngine", "parse_rule"]
+__all__ = ["CompiledRule", "RuleEngine", "compile_rule", "load_rule_engine", "parse_rule"]
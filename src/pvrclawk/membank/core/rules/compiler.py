@@ -0,0 +1,208 @@
+"""Compile rule DSL expressions into predicate/action closures.
+
+Grammar (`if <predicate> then <action>`):
+
+    predicate := disjunct ("or" disjunct)*
+    disjunct  := term ("and" term)*
+    term      := "not" term | "(" predicate ")" | "true" | "false"
+               | tag("x") | tag == x | mood("x") <cmp> <number>
+    action    := weight("x") (+= | -= | *=) <number> | boost <number>
+
+`tag(...)` is true when the query carries the tag; `mood(...)` reads the tag's mood value.
+`weight` adjusts the rule factor of links tagged `x`; `boost n` multiplies the factor of every
+tag the predicate names. Rules are parsed once here, so evaluation is plain closure calls.
+"""
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+import operator
+import re
+
+from pvrclawk.membank.core.rules.parser import parse_rule
+
+TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>"[^"]*"|'[^']*')
+      | (?P<op>\+=|-=|\*=|==|!=|<=|>=|<|>|\(|\))
+      | (?P<name>[A-Za-z_][\w.:-]*)
+    )""",
+    re.VERBOSE,
+)
+
+COMPARATORS: dict[str, Callable[[float, float], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# Predicates see the query tags and a mood lookup (tag -> value, default applied).
+Predicate = Callable[[frozenset[str], Callable[[str], float]], bool]
+# Actions update the per-tag rule factors in place.
+Action = Callable[[dict[str, float]], None]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    source: str
+    predicate: Predicate
+    action: Action
+    # Signed `weight += / -=` amount, for the legacy query-wide multiplier.
+    delta: float = 0.0
+    tags: frozenset[str] = field(default_factory=frozenset)
+
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    tokens: list[tuple[str, str]] = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN_RE.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid DSL rule near: {text[position:]!r}")
+        kind = match.lastgroup or ""
+        value = match.group(kind)
+        if kind == "string":
+            value = value[1:-1]
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.position = 0
+        self.tags: set[str] = set()
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, kind: str | None = None, value: str | None = None) -> str:
+        token = self.peek()
+        if token is None or (kind and token[0] != kind) or (value and token[1] != value):
+            expected = value or kind or "token"
+            found = token[1] if token else "end of rule"
+            raise ValueError(f"Invalid DSL rule: expected {expected}, found {found!r}")
+        self.position += 1
+        return token[1]
+
+    def accept(self, value: str) -> bool:
+        token = self.peek()
+        if token is not None and token[1] == value and token[0] in {"op", "name"}:
+            self.position += 1
+            return True
+        return False
+
+    def finish(self) -> None:
+        token = self.peek()
+        if token is not None:
+            raise ValueError(f"Invalid DSL rule: unexpected {token[1]!r}")
+
+    def argument(self) -> str:
+        self.take("op", "(")
+        token = self.peek()
+        value = self.take("string") if token and token[0] == "string" else self.take("name")
+        self.take("op", ")")
+        return value
+
+    def predicate(self) -> Predicate:
+        parts = [self.conjunction()]
+        while self.accept("or"):
+            parts.append(self.conjunction())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda tags, mood: any(part(tags, mood) for part in parts)
+
+    def conjunction(self) -> Predicate:
+        parts = [self.term()]
+        while self.accept("and"):
+            parts.append(self.term())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda tags, mood: all(part(tags, mood) for part in parts)
+
+    def term(self) -> Predicate:
+        if self.accept("not"):
+            inner = self.term()
+            return lambda tags, mood: not inner(tags, mood)
+        if self.accept("("):
+            inner = self.predicate()
+            self.take("op", ")")
+            return inner
+        if self.accept("true"):
+            return lambda tags, mood: True
+        if self.accept("false"):
+            return lambda tags, mood: False
+        if self.accept("tag"):
+            if self.accept("=="):
+                token = self.peek()
+                tag = self.take("string") if token and token[0] == "string" else self.take("name")
+            else:
+                tag = self.argument()
+            self.tags.add(tag)
+            return lambda tags, mood: tag in tags
+        if self.accept("mood"):
+            tag = self.argument()
+            comparator = COMPARATORS.get(self.take("op"))
+            if comparator is None:
+                raise ValueError("Invalid DSL rule: mood() needs a comparison (<, <=, >, >=, ==, !=)")
+            threshold = float(self.take("number"))
+            return lambda tags, mood: comparator(mood(tag), threshold)
+        token = self.peek()
+        raise ValueError(f"Invalid DSL rule: unknown predicate {token[1] if token else 'end of rule'!r}")
+
+    def action(self) -> tuple[Action, float]:
+        if self.accept("boost"):
+            factor = float(self.take("number"))
+            boosted = frozenset(self.tags)
+
+            def boost(adjustments: dict[str, float]) -> None:
+                for tag in boosted:
+                    adjustments[tag] = adjustments.get(tag, 1.0) * factor
+
+            return boost, 0.0
+        self.take("name", "weight")
+        tag = self.argument()
+        op = self.take("op")
+        amount = float(self.take("number"))
+        if op == "+=":
+            return lambda adjustments: adjustments.__setitem__(tag, adjustments.get(tag, 1.0) + amount), amount
+        if op == "-=":
+            return lambda adjustments: adjustments.__setitem__(tag, adjustments.get(tag, 1.0) - amount), -amount
+        if op == "*=":
+            return lambda adjustments: adjustments.__setitem__(tag, adjustments.get(tag, 1.0) * amount), 0.0
+        raise ValueError("Invalid DSL rule: weight() needs +=, -= or *=")
+
+
+def compile_rule(rule: str) -> CompiledRule:
+    """Compile one `if <predicate> then <action>` rule; raises ValueError when it is malformed."""
+    parsed = parse_rule(rule)
+    parser = _Parser(parsed["predicate"])
+    predicate = parser.predicate()
+    parser.finish()
+    predicate_tags = frozenset(parser.tags)
+    action_parser = _Parser(parsed["action"])
+    action_parser.tags = set(predicate_tags)
+    action, delta = action_parser.action()
+    action_parser.finish()
+    return CompiledRule(source=rule, predicate=predicate, action=action, delta=delta, tags=predicate_tags)
+
+
+def tag_adjustments(
+    rules: list[CompiledRule], query_tags, mood: Mapping[str, float], default_mood: float
+) -> dict[str, float]:
+    """Run every rule whose predicate holds and return the resulting factor per tag (>= 0)."""
+    tags = frozenset(query_tags)
+
+    def mood_of(tag: str) -> float:
+        return float(mood.get(tag, default_mood))
+
+    adjustments: dict[str, float] = {}
+    for rule in rules:
+        if rule.predicate(tags, mood_of):
+            rule.action(adjustments)
+    return {tag: max(value, 0.0) for tag, value in adjustments.items()}
@@ -1,26 +1,48 @@
-from pvrclawk.membank.core.rules.parser import parse_rule
+import json
+from pathlib import Path
+
+from pvrclawk.membank.core.rules.compiler import CompiledRule, compile_rule, tag_adjustments
 
 
 class RuleEngine:
-    def __init__(self, rules: list[str]):
+    def __init__(self, rules: list[str], strict: bool = True):
+        """Compile `rules` once; with `strict=False` malformed rules are skipped and kept in `errors`."""
         self.rules = rules
+        self.compiled: list[CompiledRule] = []
+        self.errors: dict[str, str] = {}
+        for rule in rules:
+            try:
+                self.compiled.append(compile_rule(rule))
+            except ValueError as exc:
+                if strict:
+                    raise
+                self.errors[rule] = str(exc)
 
     def validate(self) -> None:
         for rule in self.rules:
-            parse_rule(rule)
+            compile_rule(rule)
 
     def evaluate_multiplier(self, query_tags: list[str], mood: dict[str, float]) -> float:
+        """Query-wide multiplier: 1 plus the `weight +=/-=` amounts of every rule that fires."""
+        tags = frozenset(query_tags)
         multiplier = 1.0
-        for raw in self.rules:
-            parsed = parse_rule(raw)
-            pred = parsed["predicate"]
-            action = parsed["action"]
-            if "tag(" in pred:
-                found = any(f'tag("{tag}")' in pred for tag in query_tags)
-                if not found:
-                    continue
-            if "weight" in action and "+=" in action:
-                multiplier += float(action.split("+=", 1)[1].strip())
-            elif "weight" in action and "-=" in action:
-                multiplier -= float(action.split("-=", 1)[1].strip())
+        for rule in self.compiled:
+            if rule.predicate(tags, lambda tag: float(mood.get(tag, 0.5))):
+                multiplier += rule.delta
         return max(multiplier, 0.0)
+
+    def tag_adjustments(
+        self, query_tags: list[str], mood: dict[str, float], default_mood: float = 0.5
+    ) -> dict[str, float]:
+        """Per-tag `rule_adjustment` factors for links carrying each tag (tags not listed use 1.0)."""
+        return tag_adjustments(self.compiled, query_tags, mood, default_mood)
+
+
+def load_rule_engine(rules_file: Path) -> RuleEngine:
+    """Compile the rules of `rules_file` (a `{"rules": [...]}` JSON file); malformed rules land in `errors`."""
+    path = Path(rules_file)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8") or "{}")
+    except FileNotFoundError:
+        return RuleEngine([])
+    return RuleEngine(list(data.get("rules", [])), strict=False)
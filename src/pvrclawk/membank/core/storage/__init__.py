@@ -1 +1,7 @@
 """Membank storage package."""
+
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.factory import migrate_storage, open_storage
+from pvrclawk.membank.core.storage.sqlite import SqliteStorageEngine
+
+__all__ = ["SqliteStorageEngine", "StorageEngine", "migrate_storage", "open_storage"]
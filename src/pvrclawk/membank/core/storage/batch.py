@@ -0,0 +1,53 @@
+"""In-memory unit-of-work state for StorageEngine.batch()."""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pvrclawk.membank.core.storage.wal import WalOverlay
+from pvrclawk.membank.models.index import IndexData
+from pvrclawk.membank.models.session import Session
+
+
+@dataclass
+class BatchState:
+    depth: int = 1
+    files: dict[Path, Any] = field(default_factory=dict)
+    dirty_files: dict[Path, None] = field(default_factory=dict)
+    # Files to delete on flush unless written again first.
+    deleted_files: dict[Path, None] = field(default_factory=dict)
+    index: IndexData | None = None
+    index_dirty: bool = False
+    overlay: WalOverlay | None = None
+    wal_pending: list[dict] = field(default_factory=list)
+    wal_truncate: bool = False
+    packed: bytes | None = None
+    adjacency: bytes | None = None
+    sessions: dict[str, Session] = field(default_factory=dict)
+    dirty_sessions: dict[str, None] = field(default_factory=dict)
+    # Changed node texts (None: removed) that bring text_index.db to the folded log record
+    # `text_seq`; written on flush if `text_seq` is still index.wal_seq then.
+    text_rows: dict[str, str | None] | None = None
+    text_seq: int | None = None
+    # Set for changes not visible in the fields above (file deletions, SQLite writes).
+    mutated: bool = False
+    # SQLite rows changed by link usage write-back, which does not count as a mutation.
+    feedback_changes: int = 0
+
+    def mark_file(self, path: Path, data: Any) -> None:
+        self.files[path] = data
+        self.dirty_files[path] = None
+        self.deleted_files.pop(path, None)
+
+    def drop_file(self, path: Path) -> None:
+        self.files.pop(path, None)
+        self.dirty_files.pop(path, None)
+        self.deleted_files[path] = None
+
+    def mark_session(self, session: Session) -> None:
+        self.sessions[session.session_id] = session
+        self.dirty_sessions[session.session_id] = None
+
+    def drop_session(self, session_id: str) -> None:
+        self.sessions.pop(session_id, None)
+        self.dirty_sessions.pop(session_id, None)
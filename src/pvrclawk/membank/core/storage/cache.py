@@ -0,0 +1,71 @@
+"""On-disk cache of ranked query results (`.pvrclawk/cache/*.json`).
+
+Entries are keyed on the command, normalized query, limit, a hash of the effective config and
+the bank generation, which every storage mutation bumps; a write therefore makes all earlier
+entries unreachable without touching them. Stale and least-recently-used entries are evicted
+once the cache holds more than `cache.max_entries` files or `cache.max_bytes` bytes. A hit
+refreshes the entry's mtime, which is the LRU clock.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+from pvrclawk.utils.config import AppConfig, CacheConfig
+from pvrclawk.utils.json_io import DEFAULT_CODEC, JsonCodec, atomic_write_bytes
+
+
+def config_fingerprint(config: AppConfig) -> str:
+    """Stable hash of the config values that can change rankings."""
+    dumped = config.model_dump(mode="json", exclude={"cache"})
+    return hashlib.blake2b(DEFAULT_CODEC.dumps(dumped), digest_size=8).hexdigest()
+
+
+class QueryCache:
+    def __init__(self, directory: Path, config: CacheConfig, codec: JsonCodec = DEFAULT_CODEC):
+        self.directory = Path(directory)
+        self.config = config
+        self.codec = codec
+
+    def key(self, command: str, query, limit: int, config_hash: str, generation: int) -> str:
+        material = self.codec.dumps([command, query, limit, config_hash, generation])
+        return f"{generation}-{hashlib.blake2b(material, digest_size=16).hexdigest()}"
+
+    def get(self, key: str) -> dict | None:
+        if not self.config.enabled:
+            return None
+        path = self._path(key)
+        try:
+            entry = self.codec.loads(path.read_bytes())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        if not self.config.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(self._path(key), self.codec.dumps(entry))
+        self._evict(current_generation=key.split("-", 1)[0])
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _evict(self, current_generation: str) -> None:
+        entries: list[tuple[bool, int, int, Path]] = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            fresh = path.stem.split("-", 1)[0] == current_generation
+            entries.append((fresh, stat.st_mtime_ns, stat.st_size, path))
+        # Keep current-generation entries first, most recently used first.
+        entries.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        total = 0
+        for kept, (fresh, _, size, path) in enumerate(entries):
+            total += size
+            if fresh and kept < self.config.max_entries and total <= self.config.max_bytes:
+                continue
+            path.unlink(missing_ok=True)
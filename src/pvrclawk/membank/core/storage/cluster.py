@@ -15,14 +15,78 @@ def derive_cluster_name(tags: dict[str, float]) -> str:
     return "_".join(top) if top else "_inbox"
 
 
-def select_best_cluster(index: IndexData, tags: dict[str, float]) -> str:
+def select_best_cluster(index: IndexData, tags: dict[str, float], max_size: int = 0, needed: int = 1) -> str:
+    """Cluster whose top tags best match `tags`, or `_inbox` when none matches.
+
+    With `max_size` set, clusters without room for `needed` more nodes are skipped, and of equal
+    matches the fuller one wins, so partly filled `name-N` parts fill up before new ones start.
+    """
     best_name = "_inbox"
-    best_score = 0.0
+    best = (0.0, 0)
     for name, meta in index.clusters.items():
+        if max_size > 0 and meta.size + needed > max_size:
+            continue
         score = 0.0
         for tag in meta.top_tags:
             score += tags.get(tag, 0.0)
-        if score > best_score:
+        key = (score, meta.size if max_size > 0 else 0)
+        if score > 0 and key > best:
             best_name = name
-            best_score = score
+            best = key
     return best_name
+
+
+def cluster_with_room(index: IndexData, name: str, max_size: int, taken: set[str]) -> str:
+    """`name`, or the first of its `name-N` parts with room for one more node, or a new part."""
+    candidate = name
+    suffix = 1
+    while True:
+        meta = index.clusters.get(candidate)
+        if meta is None and candidate not in taken:
+            return candidate
+        if meta is not None and (max_size <= 0 or meta.size < max_size):
+            return candidate
+        suffix += 1
+        candidate = f"{name}-{suffix}"
+
+
+def cluster_family(name: str, names: set[str]) -> str:
+    """The cluster `name` was split from (`tcp` for `tcp-3`), or `name` itself."""
+    match = re.fullmatch(r"(.+)-(\d+)", name)
+    if match and match.group(1) in names:
+        return match.group(1)
+    return name
+
+
+def cluster_top_tags(payloads: dict[str, dict], limit: int = 3) -> list[str]:
+    weights: dict[str, float] = {}
+    for payload in payloads.values():
+        for tag, weight in payload.get("tags", {}).items():
+            weights[tag] = weights.get(tag, 0.0) + float(weight)
+    ordered = sorted(weights.items(), key=lambda x: (-x[1], x[0]))
+    return [name for name, _ in ordered[:limit]]
+
+
+def split_cluster(name: str, payloads: dict[str, dict], max_size: int, taken: set[str]) -> dict[str, dict[str, dict]]:
+    """Split an oversized cluster into parts of at most `max_size` nodes.
+
+    Nodes are ordered by their own derived cluster name so similar nodes stay together; the
+    first part keeps `name` and the others get the next free `name-N`.
+    """
+    if max_size <= 0 or len(payloads) <= max_size:
+        return {name: payloads}
+    ordered = sorted(
+        payloads.items(),
+        key=lambda item: (derive_cluster_name(item[1].get("tags", {})), item[1].get("created_at", ""), item[0]),
+    )
+    parts: dict[str, dict[str, dict]] = {}
+    suffix = 1
+    for start in range(0, len(ordered), max_size):
+        part_name = name
+        if parts:
+            suffix += 1
+            while f"{name}-{suffix}" in taken:
+                suffix += 1
+            part_name = f"{name}-{suffix}"
+        parts[part_name] = dict(ordered[start : start + max_size])
+    return parts
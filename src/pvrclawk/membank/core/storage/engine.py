@@ -1,9 +1,15 @@
+import atexit
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
 from pathlib import Path
 import re
+import sqlite3
+import struct
 from datetime import datetime, timedelta, timezone
 
 from pvrclawk.utils.config import AppConfig, load_config, write_config
-from pvrclawk.utils.json_io import read_json, write_json
+from pvrclawk.utils.json_io import JsonCodec, atomic_write_bytes
 from pvrclawk.utils.session_store import resolve_session_bucket
 from pvrclawk.membank.models.index import ClusterMeta, IndexData
 from pvrclawk.membank.models.link import Link
@@ -22,8 +28,46 @@ from pvrclawk.membank.models.nodes import (
     Task,
 )
 from pvrclawk.membank.models.session import Session, SessionIndex
-from pvrclawk.membank.core.storage.index import add_unique
-from pvrclawk.membank.core.storage.cluster import derive_cluster_name
+from pvrclawk.membank.models.text_index import TextStatistics
+from pvrclawk.membank.models.view import NodeView
+from pvrclawk.membank.core.forctx.scorer import node_to_searchable_text
+from pvrclawk.membank.core.graph.adjacency import Adjacency
+from pvrclawk.membank.core.storage.batch import BatchState
+from pvrclawk.membank.core.storage.writer import StorageWriter
+from pvrclawk.membank.core.storage.packed import PackedNodeStore, build_packed
+from pvrclawk.membank.core.storage.index import add_unique, ensure_cluster, rebuild_link_index
+from pvrclawk.membank.core.storage.text_index import TextIndex, open_text_index, stored_seq, write_rows
+from pvrclawk.membank.core.storage.wal import PENDING_CLUSTER, MutationLog, WalOverlay, replay_into_index
+from pvrclawk.membank.core.storage.cluster import (
+    cluster_family,
+    cluster_top_tags,
+    cluster_with_room,
+    derive_cluster_name,
+    select_best_cluster,
+    split_cluster,
+)
+
+# Cluster for inbox nodes without tags, which derive_cluster_name cannot name.
+UNTAGGED_CLUSTER = "untagged"
+# Changed payloads packed_delta.json may hold before compaction rebuilds _packed.bin.
+PACKED_DELTA_LIMIT = 1024
+# Distinct links with buffered usage that make record_link_usage write the buffer out.
+USAGE_BUFFER_LIMIT = 256
+
+NODE_CLASSES = {
+    "memory": Memory,
+    "memorylink": MemoryLink,
+    "story": Story,
+    "feature": Feature,
+    "active": Task,
+    "archive": SubTask,
+    "task": Task,
+    "subtask": SubTask,
+    "issue": Issue,
+    "bug": Bug,
+    "pattern": Pattern,
+    "progress": Progress,
+}
 
 
 class StorageEngine:
@@ -32,6 +76,7 @@ class StorageEngine:
         self.nodes_dir = self.root / "nodes"
         self.additional_memory_dir = self.root / "additional_memory"
         self.index_file = self.root / "index.json"
+        self.text_index_file = self.root / "text_index.db"
         self.links_file = self.root / "links.json"
         self.rules_file = self.root / "rules.json"
         self.mood_file = self.root / "mood.json"
@@ -39,14 +84,145 @@ class StorageEngine:
         self.sessions_dir = self.session_bucket
         self.session_index_file = self.session_bucket / "index.json"
         self.config_file = self.root / "config.toml"
+        self.codec = JsonCodec(load_config(self.config_file).storage.codec)
+        self.writer = StorageWriter(self.codec)
+        self.wal = MutationLog(self.nodes_dir / "_wal.jsonl", self.codec)
+        self.packed_file = self.nodes_dir / "_packed.bin"
+        self.packed_delta_file = self.root / "packed_delta.json"
+        self.adjacency_file = self.root / "adjacency.bin"
+        self.generation_file = self.root / "generation"
+        self.cache_dir = self.root / "cache"
+        self._batch: BatchState | None = None
+        self._text_db: sqlite3.Connection | None = None
+        # Link usage not written yet: link uid -> uses, last access stamp and tags (when known).
+        self._usage: Counter[str] = Counter()
+        self._usage_at: dict[str, str] = {}
+        self._usage_tags: dict[str, list[str]] = {}
+
+    @contextmanager
+    def batch(self) -> Iterator["StorageEngine"]:
+        """Unit of work: keep touched files in memory and write each dirty file once on exit.
+
+        Nested calls join the outermost batch. If the block raises, pending writes are discarded.
+        """
+        if self._batch is not None:
+            self._batch.depth += 1
+            try:
+                yield self
+            finally:
+                self._batch.depth -= 1
+            return
+        self._batch = BatchState()
+        try:
+            yield self
+        except BaseException:
+            self._batch = None
+            raise
+        state = self._batch
+        self._batch = None
+        self._flush_batch(state)
+
+    def generation(self) -> int:
+        """Counter bumped by every write to bank contents; keys the query cache."""
+        try:
+            return int(self.generation_file.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _bump_generation(self) -> None:
+        # Under the log lock so concurrent writers never read the same value and lose a bump.
+        self.nodes_dir.mkdir(parents=True, exist_ok=True)
+        with self.wal.locked():
+            atomic_write_bytes(self.generation_file, str(self.generation() + 1).encode())
+
+    def _keeps_generation(self, path: Path) -> bool:
+        # Session state never changes what queries return.
+        return path.is_relative_to(self.session_bucket)
+
+    def _flush_batch(self, state: BatchState) -> None:
+        # Link usage records and session state are read-side feedback; they keep cached rankings.
+        mutated = (
+            state.mutated
+            or state.wal_truncate
+            or state.index_dirty
+            or any(record.get("op") != "usage" for record in state.wal_pending)
+            or any(not self._keeps_generation(path) for path in state.dirty_files)
+        )
+        for path in state.dirty_files:
+            if path == self.index_file and state.index_dirty:
+                continue
+            self.writer.write_json(path, state.files[path])
+        for path in state.deleted_files:
+            self.writer.forget(path)
+            path.unlink(missing_ok=True)
+        for session_id in state.dirty_sessions:
+            session = state.sessions[session_id]
+            self.writer.write_json(self._session_path(session_id), session.model_dump(mode="json"))
+        if state.index_dirty and state.index is not None:
+            self.writer.write_json(self.index_file, state.index.model_dump())
+        if state.adjacency is not None and not _same_bytes(self.adjacency_file, state.adjacency):
+            atomic_write_bytes(self.adjacency_file, state.adjacency)
+        if state.packed is not None:
+            atomic_write_bytes(self.packed_file, state.packed)
+        if state.text_rows is not None and state.index is not None and state.text_seq == state.index.wal_seq:
+            write_rows(self._text_index_db(), state.text_rows, state.text_seq)
+        # The log goes last: folded records are already covered by index.wal_seq if we stop early.
+        if state.wal_truncate:
+            self.wal.rewrite(state.wal_pending, state.index.wal_seq if state.index is not None else 0)
+        else:
+            # Usage-only appends are feedback a crash may lose; they skip the fsync.
+            self.wal.append(state.wal_pending, durable=any(record.get("op") != "usage" for record in state.wal_pending))
+        if mutated:
+            self._bump_generation()
+        if state.wal_pending and not state.wal_truncate:
+            self._compact_if_due()
+
+    def _compact_if_due(self) -> None:
+        """Fold the log once it outgrows the configured record count or size, so reads stay cheap."""
+        config = load_config(self.config_file).storage
+        records, size = self.wal.stats()
+        if records > config.wal_max_records or size > config.wal_max_bytes:
+            with self.batch():
+                self._compact_wal()
 
     def _write_json(self, path: Path, data) -> None:
-        write_json(path, data)
+        if self._batch is not None:
+            self._batch.mark_file(path, data)
+            return
+        if self.writer.write_json(path, data) and path.parent == self.nodes_dir:
+            self.packed_file.unlink(missing_ok=True)
+        if not self._keeps_generation(path):
+            self._bump_generation()
 
     def _read_json(self, path: Path, default):
-        return read_json(path, default)
+        if self._batch is None:
+            return self.writer.read_json(path, default)
+        if path in self._batch.files:
+            return self._batch.files[path]
+        if path in self._batch.deleted_files:
+            return default
+        data = self.writer.read_json(path, default)
+        self._batch.files[path] = data
+        return data
+
+    def _unlink(self, path: Path) -> bool:
+        if self._batch is not None:
+            # Deleted on flush, after the files that replace it are written.
+            existed = path not in self._batch.deleted_files and (path in self._batch.dirty_files or path.exists())
+            self._batch.drop_file(path)
+            self._batch.mutated = True
+            return existed
+        self.writer.forget(path)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
 
     def init_db(self) -> None:
+        with self.batch():
+            self._init_db()
+
+    def _init_db(self) -> None:
         self.root.mkdir(parents=True, exist_ok=True)
         self.nodes_dir.mkdir(parents=True, exist_ok=True)
         self.additional_memory_dir.mkdir(parents=True, exist_ok=True)
@@ -109,6 +285,8 @@ class StorageEngine:
             sid = self.load_session_index().active_session_id
         if not sid:
             return None
+        if self._batch is not None and sid in self._batch.sessions:
+            return self._batch.sessions[sid]
         path = self._session_path(sid)
         if not path.exists():
             return None
@@ -116,36 +294,42 @@ class StorageEngine:
         if not isinstance(payload, dict) or not payload:
             return None
         try:
-            return Session.model_validate(payload)
+            session = Session.model_validate(payload)
         except Exception:
             return None
+        if self._batch is not None:
+            self._batch.sessions[sid] = session
+        return session
 
     def save_session(self, session: Session) -> None:
-        path = self._session_path(session.session_id)
-        self._write_json(path, session.model_dump(mode="json"))
+        if self._batch is not None:
+            self._batch.mark_session(session)
+        else:
+            self._write_json(self._session_path(session.session_id), session.model_dump(mode="json"))
         index = self.load_session_index()
         if session.session_id not in index.session_ids:
             index.session_ids.insert(0, session.session_id)
             self.save_session_index(index)
 
     def clear_session(self, session_id: str | None = None) -> bool:
-        index = self.load_session_index()
-        target_id = session_id or index.active_session_id
-        if target_id is None:
-            return False
-        removed = False
-        target_path = self._session_path(target_id)
-        if target_path.exists():
-            target_path.unlink()
-            removed = True
-        if target_id in index.session_ids:
-            index.session_ids.remove(target_id)
-            removed = True
-        if index.active_session_id == target_id:
-            index.active_session_id = index.session_ids[0] if index.session_ids else None
-            removed = True
-        self.save_session_index(index)
-        return removed
+        with self.batch():
+            index = self.load_session_index()
+            target_id = session_id or index.active_session_id
+            if target_id is None:
+                return False
+            removed = False
+            if self._batch is not None:
+                self._batch.drop_session(target_id)
+            if self._unlink(self._session_path(target_id)):
+                removed = True
+            if target_id in index.session_ids:
+                index.session_ids.remove(target_id)
+                removed = True
+            if index.active_session_id == target_id:
+                index.active_session_id = index.session_ids[0] if index.session_ids else None
+                removed = True
+            self.save_session_index(index)
+            return removed
 
     def is_session_expired(self, session: Session, max_age_days: int = 2) -> bool:
         return datetime.now(timezone.utc) - session.created_at > timedelta(days=max_age_days)
@@ -162,51 +346,52 @@ class StorageEngine:
             self.save_session(session)
             self._set_active_session_id(active_id)
             return session
-        if session is None:
-            return None
         if self.is_session_expired(session, max_age_days=max_age_days):
             self.clear_session(session.session_id)
             return None
         return session
 
     def activate_session(self, session_id: str | None = None) -> Session:
-        self.init_db()
-        if session_id:
-            existing = self.load_session(session_id)
-            if existing is not None and not self.is_session_expired(existing):
-                self._set_active_session_id(existing.session_id)
-                return existing
-            session = Session(session_id=session_id)
+        with self.batch():
+            self.init_db()
+            if session_id:
+                existing = self.load_session(session_id)
+                if existing is not None and not self.is_session_expired(existing):
+                    self._set_active_session_id(existing.session_id)
+                    return existing
+                session = Session(session_id=session_id)
+                self.save_session(session)
+                self._set_active_session_id(session.session_id)
+                return session
+
+            existing_active = self.load_active_session()
+            if existing_active is not None:
+                self._set_active_session_id(existing_active.session_id)
+                return existing_active
+
+            session = Session()
             self.save_session(session)
             self._set_active_session_id(session.session_id)
             return session
 
-        existing_active = self.load_active_session()
-        if existing_active is not None:
-            self._set_active_session_id(existing_active.session_id)
-            return existing_active
-
-        session = Session()
-        self.save_session(session)
-        self._set_active_session_id(session.session_id)
-        return session
-
     def reset_session(self, session_id: str | None = None) -> Session:
-        target_id = session_id or self.load_session_index().active_session_id
-        session = self.activate_session(session_id=target_id)
-        session.served_uids = []
-        self.save_session(session)
-        self._set_active_session_id(session.session_id)
-        return session
+        with self.batch():
+            target_id = session_id or self.load_session_index().active_session_id
+            session = self.activate_session(session_id=target_id)
+            session.served_uids = []
+            self.save_session(session)
+            self._set_active_session_id(session.session_id)
+            return session
 
     def record_session_served(self, session: Session, uids: list[str]) -> Session:
-        seen = set(session.served_uids)
-        for uid in uids:
-            if uid not in seen:
-                session.served_uids.append(uid)
-                seen.add(uid)
-        self.save_session(session)
-        return session
+        with self.batch():
+            seen = set(session.served_uids)
+            for uid in uids:
+                if uid not in seen:
+                    session.served_uids.append(uid)
+                    seen.add(uid)
+            self.save_session(session)
+            return session
 
     def _migrate_legacy_session_if_needed(self) -> None:
         # Legacy local files under .pvrclawk/ are migrated into user-level session storage.
@@ -259,105 +444,337 @@ class StorageEngine:
             self.save_session_index(index)
 
     def load_index(self) -> IndexData:
-        return IndexData.model_validate(self._read_json(self.index_file, {}))
+        return self._wal_state()[0]
+
+    def _wal_state(self) -> tuple[IndexData, WalOverlay]:
+        """Load index.json and replay unfolded mutation-log records into it and into an overlay."""
+        if self._batch is not None and self._batch.index is not None and self._batch.overlay is not None:
+            return self._batch.index, self._batch.overlay
+        raw = self._read_json(self.index_file, {})
+        index = IndexData.model_validate(raw)
+        if index.links_in and ("links_out" not in raw or "tag_link_counts" not in raw):
+            # Index written before links_out or the usage aggregates existed; derive them once.
+            rebuild_link_index(index, self._read_json(self.links_file, {}))
+        overlay = WalOverlay(last_seq=index.wal_seq)
+        for record in self.wal.read():
+            if int(record.get("seq", 0)) <= index.wal_seq:
+                continue
+            overlay.apply(record)
+            replay_into_index(index, record)
+        if self._batch is not None:
+            self._batch.index = index
+            self._batch.overlay = overlay
+        return index, overlay
+
+    def _text_index_db(self) -> sqlite3.Connection:
+        if self._text_db is None:
+            self._text_db = open_text_index(self.text_index_file)
+        return self._text_db
+
+    def _text_index(self) -> TextIndex:
+        """text_index.db with the texts of nodes changed by unfolded log records applied on top.
+
+        The tables follow the folded records: compaction writes the rows of the nodes it folds.
+        Tables that are missing or stale are brought up to date from the cluster files first.
+        """
+        if self._batch is None:
+            conn = self._text_index_db()
+            records = self.wal.read()
+            folded_seq = self.wal.folded_seq or 0
+            if stored_seq(conn) != folded_seq:
+                with self.batch():
+                    return self._text_index()
+            touched = _touched_uids(records, folded_seq)
+            texts = self._searchable_texts(touched) if touched else {}
+            return TextIndex(conn, {uid: _lower(texts.get(uid)) for uid in touched})
+        return TextIndex(self._text_index_db(), self._text_changes())
+
+    def _text_changes(self) -> dict[str, str | None]:
+        """Texts the tables do not reflect yet: unwritten folded rows plus unfolded records."""
+        state = self._batch
+        index, overlay = self._wal_state()
+        if state.text_seq is None:
+            if stored_seq(self._text_index_db()) == index.wal_seq:
+                state.text_rows, state.text_seq = {}, index.wal_seq
+            else:
+                self._sync_text_rows()
+        changes = dict(state.text_rows)
+        touched = _touched_uids(overlay.records, state.text_seq)
+        texts = self._searchable_texts([uid for uid in touched if uid in index.uid_file])
+        changes.update({uid: _lower(texts.get(uid)) for uid in touched})
+        return changes
+
+    def _sync_text_rows(self) -> None:
+        """Diff the tables against the folded cluster files; the changed rows are written on flush."""
+        index, _ = self._wal_state()
+        texts: dict[str, str] = {}
+        for path in self._cluster_paths():
+            for uid, payload in self._read_json(path, {}).items():
+                texts[uid] = node_to_searchable_text(self._node_from_payload(payload)).lower()
+        stored = dict(self._text_index_db().execute("SELECT uid, text FROM node_texts"))
+        rows: dict[str, str | None] = {uid: text for uid, text in texts.items() if stored.get(uid) != text}
+        rows.update({uid: None for uid in stored.keys() - texts.keys()})
+        self._batch.text_rows, self._batch.text_seq = rows, index.wal_seq
+
+    def _fold_text_changes(self, index: IndexData, overlay: WalOverlay) -> None:
+        """Queue the rows of nodes changed by pending log records for text_index.db."""
+        self._batch.text_rows = self._text_changes()
+        self._batch.text_seq = overlay.last_seq
+
+    def _searchable_texts(self, uids) -> dict[str, str]:
+        return {
+            payload["uid"]: node_to_searchable_text(self._node_from_payload(payload))
+            for payload in self._load_payloads(uids)
+        }
+
+    def load_search_texts(self, uids: Iterable[str]) -> dict[str, str]:
+        """Lowercased searchable text per uid, from the text index rather than the cluster files."""
+        return self._text_index().texts(uids)
+
+    def search_text(self, phrases: list[str]) -> list[set[str] | None]:
+        """Per phrase, the uids whose text may contain it (None: the phrase has no word to look up)."""
+        return self._text_index().search(phrases)
+
+    def text_statistics(self, phrases: list[str]) -> TextStatistics:
+        """BM25 collection statistics for the words of `phrases`."""
+        return self._text_index().statistics(phrases)
+
+    def _append_wal(self, op: str, **fields) -> None:
+        """Record one mutation; applied to the in-memory state now and appended on batch exit."""
+        assert self._batch is not None, "mutations must run inside StorageEngine.batch()"
+        index, overlay = self._wal_state()
+        record = {"seq": overlay.last_seq + 1, "op": op, **fields}
+        overlay.apply(record)
+        replay_into_index(index, record)
+        self._batch.wal_pending.append(record)
+
+    def _compact_wal(self) -> None:
+        """Fold pending log records into the cluster files, links.json and index.json."""
+        assert self._batch is not None, "compaction must run inside StorageEngine.batch()"
+        index, overlay = self._wal_state()
+        if not overlay.records:
+            return
+        self._fold_text_changes(index, overlay)
+        touched: dict[str, dict] = {}
+
+        def cluster_data(name: str) -> dict:
+            if name not in touched:
+                touched[name] = self._read_json(self.nodes_dir / f"{name}.json", {})
+            return touched[name]
+
+        for uid, cluster in overlay.removed.items():
+            cluster_data(cluster).pop(uid, None)
+        for uid, patch in overlay.patches.items():
+            cluster = index.uid_file.get(uid)
+            if cluster and uid in cluster_data(cluster):
+                cluster_data(cluster)[uid].update(patch)
+        for uid, payload in overlay.nodes.items():
+            cluster = index.uid_file.get(uid, "_inbox")
+            cluster_data(cluster)[uid] = payload
+        for name, data in touched.items():
+            self._write_json(self.nodes_dir / f"{name}.json", data)
+            ensure_cluster(index, name)
+            index.clusters[name].size = len(data)
+        self._fold_packed_changes(
+            index,
+            overlay,
+            lambda uid: cluster_data(index.uid_file[uid]).get(uid) if uid in index.uid_file else None,
+        )
+
+        if overlay.removed or overlay.links or overlay.usage:
+            links = self._read_json(self.links_file, {})
+            for uid in overlay.removed:
+                links.pop(uid, None)
+            for source in set(overlay.removed_links.values()):
+                kept = [item for item in links.get(source, []) if item.get("uid") not in overlay.removed_links]
+                if kept:
+                    links[source] = kept
+                else:
+                    links.pop(source, None)
+            for payload in overlay.links:
+                bucket = links.setdefault(payload["source"], [])
+                if all(item.get("uid") != payload.get("uid") for item in bucket):
+                    bucket.append(payload)
+            if overlay.usage:
+                for bucket in links.values():
+                    bucket[:] = [overlay.with_usage(item) for item in bucket]
+            self._write_json(self.links_file, links)
+            # links.json is in memory anyway: rebuild the link maps and aggregates from it, which
+            # also settles records logged without the link details the index needs.
+            rebuild_link_index(index, links)
+            if overlay.removed or overlay.links:
+                # Usage alone leaves the edges, and so adjacency.bin, as they are.
+                self._batch.adjacency = _adjacency_from_links(links).to_bytes()
+
+        index.wal_seq = overlay.last_seq
+        self.save_index(index)
+        self._batch.overlay = WalOverlay(last_seq=overlay.last_seq)
+        self._batch.wal_pending = []
+        self._batch.wal_truncate = True
+
+    def _load_payloads(self, uids) -> list[dict]:
+        """Return effective raw payloads for `uids` (cluster files plus the mutation-log overlay)."""
+        point = self._point_state()
+        if point is not None:
+            store, delta, overlay = point
+            try:
+                return [payload for uid in uids if (payload := _packed_payload(store, delta, overlay, uid))]
+            finally:
+                store.close()
+        index, overlay = self._wal_state()
+        out: list[dict] = []
+        by_cluster: dict[str, list[str]] = {}
+        packed = self._open_packed(index.wal_seq)
+        try:
+            for uid in uids:
+                if uid in overlay.nodes:
+                    out.append(overlay.nodes[uid])
+                    continue
+                cluster = index.uid_file.get(uid)
+                if not cluster:
+                    continue
+                if packed is not None:
+                    payload = _packed_payload(*packed, overlay, uid)
+                    if payload:
+                        out.append(payload)
+                    continue
+                by_cluster.setdefault(cluster, []).append(uid)
+        finally:
+            if packed is not None:
+                packed[0].close()
+        for cluster, cluster_uids in by_cluster.items():
+            data = self._read_json(self.nodes_dir / f"{cluster}.json", {})
+            for uid in cluster_uids:
+                payload = overlay.merge(uid, data.get(uid))
+                if payload:
+                    out.append(payload)
+        return out
+
+    def _open_packed(self, folded_seq: int) -> tuple[PackedNodeStore, dict[str, dict | None]] | None:
+        """Open the packed snapshot and its delta if together they match the log folded up to `folded_seq`."""
+        if self._batch is not None and self.packed_file in self._batch.deleted_files:
+            return None
+        store = PackedNodeStore.open(self.packed_file, self.codec)
+        if store is None:
+            return None
+        delta = self._read_json(self.packed_delta_file, None)
+        if isinstance(delta, dict) and delta.get("base") == store.generation:
+            if delta.get("wal_seq") == folded_seq:
+                return store, delta.get("nodes", {})
+        elif store.generation == folded_seq:
+            return store, {}
+        store.close()
+        return None
+
+    def _point_state(self) -> tuple[PackedNodeStore, dict[str, dict | None], WalOverlay] | None:
+        """Packed snapshot, its delta and the unfolded log records, read without index.json.
+
+        Used for reads outside a batch; None when the log was never compacted or the snapshot
+        does not match it, and callers fall back to the index.
+        """
+        if self._batch is not None:
+            return None
+        records = self.wal.read()
+        folded_seq = self.wal.folded_seq
+        packed = self._open_packed(folded_seq) if folded_seq is not None else None
+        if packed is None:
+            return None
+        overlay = WalOverlay(last_seq=folded_seq)
+        for record in records:
+            if int(record.get("seq", 0)) > folded_seq:
+                overlay.apply(record)
+        return packed[0], packed[1], overlay
+
+    def _fold_packed_changes(self, index: IndexData, overlay: WalOverlay, payload_of) -> None:
+        """Record payloads changed by pending log records in packed_delta.json.
+
+        Past `PACKED_DELTA_LIMIT` nodes the snapshot is rebuilt with the delta merged in instead.
+        """
+        packed = self._open_packed(index.wal_seq)
+        if packed is None:
+            return
+        store, delta = packed
+        try:
+            changed = dict(delta)
+            for uid in {*overlay.nodes, *overlay.patches, *overlay.removed}:
+                changed[uid] = payload_of(uid)
+            if len(changed) <= PACKED_DELTA_LIMIT:
+                self._write_json(
+                    self.packed_delta_file, {"base": store.generation, "wal_seq": overlay.last_seq, "nodes": changed}
+                )
+                return
+            payloads = store.payloads()
+        finally:
+            store.close()
+        for uid, payload in changed.items():
+            if payload is None:
+                payloads.pop(uid, None)
+            else:
+                payloads[uid] = payload
+        self._batch.packed = build_packed(payloads, overlay.last_seq, self.codec)
+        self._reset_packed_delta(overlay.last_seq)
+
+    def _reset_packed_delta(self, generation: int) -> None:
+        self._write_json(self.packed_delta_file, {"base": generation, "wal_seq": generation, "nodes": {}})
 
     def save_index(self, index: IndexData) -> None:
+        if self._batch is not None:
+            if self._batch.overlay is None:
+                self._wal_state()
+            self._batch.index = index
+            self._batch.index_dirty = True
+            return
         self._write_json(self.index_file, index.model_dump())
 
     def save_node(self, node, node_type: str) -> str:
-        index = self.load_index()
-
-        # Auto-archive existing active nodes if config allows
-        if node_type == "active":
+        with self.batch():
+            index = self.load_index()
             config = load_config(self.config_file)
-            if config.auto_archive_active:
+
+            # Auto-archive existing active nodes if config allows
+            if node_type == "active" and config.auto_archive_active:
                 self._archive_active_nodes(index)
 
-        cluster_name = "_inbox"
-        cluster_path = self.nodes_dir / f"{cluster_name}.json"
-        cluster_data = self._read_json(cluster_path, {})
-        payload = node.model_dump(mode="json")
-        payload["__type__"] = node_type
-        cluster_data[node.uid] = payload
-        self._write_json(cluster_path, cluster_data)
-
-        index.uid_file[node.uid] = cluster_name
-        add_unique(index.types, node_type, node.uid)
-        for tag in node.tags:
-            add_unique(index.tags, tag, node.uid)
-        if cluster_name not in index.clusters:
-            index.clusters[cluster_name] = ClusterMeta(top_tags=[], size=0)
-        index.clusters[cluster_name].size = len(cluster_data)
-        self._record_recent_uid(node.uid)
-        self.save_index(index)
-        return node.uid
+            payload = node.model_dump(mode="json")
+            payload["__type__"] = node_type
+            self._append_wal("node", payload=payload)
+            self._record_recent_uid(node.uid)
+            if self._inbox_size() > config.prune.auto_threshold:
+                self.flush_inbox()
+            return node.uid
+
+    def _inbox_size(self) -> int:
+        index, overlay = self._wal_state()
+        meta = index.clusters.get(PENDING_CLUSTER)
+        pending = sum(1 for uid in overlay.nodes if index.uid_file.get(uid) == PENDING_CLUSTER)
+        return (meta.size if meta else 0) + pending
 
     def _archive_active_nodes(self, index: IndexData) -> None:
         """Convert all existing active nodes to archive type."""
         active_uids = list(index.types.get("active", []))
-        if not active_uids:
-            return
-        # Group by cluster file
-        by_cluster: dict[str, list[str]] = {}
-        for uid in active_uids:
-            cluster = index.uid_file.get(uid)
-            if cluster:
-                by_cluster.setdefault(cluster, []).append(uid)
-        # Rewrite each affected cluster file
-        for cname, uids in by_cluster.items():
-            cluster_path = self.nodes_dir / f"{cname}.json"
-            data = self._read_json(cluster_path, {})
-            for uid in uids:
-                payload = data.get(uid)
-                if not payload:
-                    continue
-                payload["__type__"] = "archive"
-                payload["archived_from"] = payload.get("focus_area", "active")
-                payload["reason"] = "superseded by new active node"
-                data[uid] = payload
-            self._write_json(cluster_path, data)
-        # Update index types
-        for uid in active_uids:
-            if uid in index.types.get("active", []):
-                index.types["active"].remove(uid)
-            add_unique(index.types, "archive", uid)
-
-    def load_nodes(self, uids: list[str]):
-        index = self.load_index()
-        by_cluster: dict[str, list[str]] = {}
-        for uid in uids:
-            cluster = index.uid_file.get(uid)
-            if not cluster:
-                continue
-            by_cluster.setdefault(cluster, []).append(uid)
-
-        cls_map = {
-            "memory": Memory,
-            "memorylink": MemoryLink,
-            "story": Story,
-            "feature": Feature,
-            "active": Task,
-            "archive": SubTask,
-            "task": Task,
-            "subtask": SubTask,
-            "issue": Issue,
-            "bug": Bug,
-            "pattern": Pattern,
-            "progress": Progress,
-        }
-        out = []
-        for cluster, cluster_uids in by_cluster.items():
-            data = self._read_json(self.nodes_dir / f"{cluster}.json", {})
-            for uid in cluster_uids:
-                payload = data.get(uid)
-                if not payload:
-                    continue
-                node_type = self._normalized_node_type(payload)
-                payload = dict(payload)
-                payload.pop("__type__", None)
-                cls = cls_map.get(node_type, Memory)
-                out.append(cls.model_validate(payload))
-        return out
+        for payload in self._load_payloads(active_uids):
+            fields = {
+                "__type__": "archive",
+                "archived_from": payload.get("focus_area", "active"),
+                "reason": "superseded by new active node",
+            }
+            self._append_wal("patch", uid=payload["uid"], fields=fields, from_type="active")
+
+    def load_nodes(self, uids: list[str], lazy: bool = False):
+        """Load nodes by UID; `lazy=True` returns NodeViews that validate only on field access."""
+        return [self._hydrate(payload, lazy) for payload in self._load_payloads(uids)]
+
+    def _hydrate(self, payload: dict, lazy: bool):
+        if lazy:
+            return NodeView(payload, NODE_CLASSES.get(self._normalized_node_type(payload), Memory))
+        return self._node_from_payload(payload)
+
+    def _node_from_payload(self, payload: dict):
+        node_type = self._normalized_node_type(payload)
+        payload = dict(payload)
+        payload.pop("__type__", None)
+        cls = NODE_CLASSES.get(node_type, Memory)
+        return cls.model_validate(payload)
 
     def _normalized_node_type(self, payload: dict) -> str:
         raw = str(payload.get("__type__", "memory"))
@@ -388,40 +805,114 @@ class StorageEngine:
         return link.uid
 
     def save_links(self, links_to_save: list[Link]) -> int:
-        if not links_to_save:
-            return 0
-        links = self._read_json(self.links_file, {})
-        index = self.load_index()
-
-        for link in links_to_save:
-            links.setdefault(link.source, [])
-            links[link.source].append(link.model_dump(mode="json"))
-            add_unique(index.links_in, link.target, link.source)
-
-        self._write_json(self.links_file, links)
-        self.save_index(index)
-        return len(links_to_save)
+        with self.batch():
+            for link in links_to_save:
+                self._append_wal("link", payload=link.model_dump(mode="json"))
+            return len(links_to_save)
 
     def load_links(self, source_uids: list[str]) -> list[Link]:
+        return [Link.model_validate(payload) for payload in self._link_payloads(source_uids)]
+
+    def _link_payloads(self, source_uids: list[str] | None = None) -> list[dict]:
+        _, overlay = self._wal_state()
         links = self._read_json(self.links_file, {})
-        out: list[Link] = []
-        for source in source_uids:
-            for payload in links.get(source, []):
-                out.append(Link.model_validate(payload))
-        return out
+        if source_uids is None:
+            items = [payload for bucket in links.values() for payload in bucket]
+            pending = overlay.links
+        else:
+            items = [payload for source in source_uids for payload in links.get(source, [])]
+            wanted = set(source_uids)
+            pending = [payload for payload in overlay.links if payload.get("source") in wanted]
+        if overlay.removed:
+            items = [payload for payload in items if overlay.link_visible(payload)]
+        if overlay.usage:
+            return [overlay.with_usage(payload) for payload in items + pending]
+        return items + pending
+
+    def record_link_usage(
+        self,
+        link_uids: Iterable[str],
+        accessed_at: datetime | None = None,
+        link_tags: Mapping[str, Iterable[str]] | None = None,
+    ) -> int:
+        """Count one use per occurrence in `link_uids` and stamp `last_accessed`.
+
+        Uses are buffered in memory and written by `flush_link_usage`, which runs once
+        `USAGE_BUFFER_LIMIT` links are pending and at process exit. `link_tags` passes the tags of
+        links the caller already holds, so the write does not have to look them up.
+        """
+        counts = Counter(link_uids)
+        if not counts:
+            return 0
+        if not self._usage:
+            atexit.register(self.flush_link_usage)
+        stamp = (accessed_at or datetime.now(timezone.utc)).isoformat()
+        self._usage.update(counts)
+        self._usage_at.update(dict.fromkeys(counts, stamp))
+        for link_uid, tags in (link_tags or {}).items():
+            if link_uid in counts:
+                self._usage_tags[link_uid] = list(tags)
+        if len(self._usage) >= USAGE_BUFFER_LIMIT:
+            self.flush_link_usage()
+        return len(counts)
+
+    def flush_link_usage(self) -> int:
+        """Write buffered link usage; returns the number of links it covered."""
+        if not self._usage:
+            return 0
+        atexit.unregister(self.flush_link_usage)
+        by_stamp: dict[str, dict[str, int]] = {}
+        for link_uid, count in self._usage.items():
+            by_stamp.setdefault(self._usage_at[link_uid], {})[link_uid] = count
+        written = len(self._usage)
+        link_tags = self._usage_tags
+        self._usage = Counter()
+        self._usage_at = {}
+        self._usage_tags = {}
+        self._write_link_usage(by_stamp, link_tags)
+        return written
+
+    def _write_link_usage(self, by_stamp: dict[str, dict[str, int]], link_tags: dict[str, list[str]]) -> None:
+        """Append one log record per access stamp, folded into links.json by the next compaction.
+
+        Records carry each link's tags for the index aggregates. Tags the caller did not pass are
+        read from the links, and uses of links that no longer exist are dropped.
+        """
+        missing = {link_uid for counts in by_stamp.values() for link_uid in counts if link_uid not in link_tags}
+        if missing:
+            link_tags = dict(link_tags)
+            for payload in self._link_payloads():
+                if payload["uid"] in missing:
+                    link_tags[payload["uid"]] = list(payload.get("tags", ()))
+        records = []
+        for stamp, counts in by_stamp.items():
+            counts = {link_uid: count for link_uid, count in counts.items() if link_uid in link_tags}
+            if counts:
+                tags = {link_uid: link_tags[link_uid] for link_uid in counts}
+                records.append({"seq": 0, "op": "usage", "links": counts, "at": stamp, "tags": tags})
+        if self._batch is not None:
+            for record in records:
+                self._append_wal("usage", links=record["links"], at=record["at"], tags=record["tags"])
+            return
+        # Outside a batch nothing reads these records back, so index.json is not loaded to number
+        # them: the log numbers them after its last record.
+        self.wal.append(records, durable=False)
+        self._compact_if_due()
 
     def adjust_link_weights_by_tags(self, tags: list[str], delta: float) -> int:
-        links = self._read_json(self.links_file, {})
-        updated = 0
-        needed = set(tags)
-        for source, items in links.items():
-            for payload in items:
-                existing = set(payload.get("tags", []))
-                if needed.issubset(existing):
-                    payload["weight"] = float(payload.get("weight", 1.0)) + delta
-                    updated += 1
-        self._write_json(self.links_file, links)
-        return updated
+        with self.batch():
+            self._compact_wal()
+            links = self._read_json(self.links_file, {})
+            updated = 0
+            needed = set(tags)
+            for source, items in links.items():
+                for payload in items:
+                    existing = set(payload.get("tags", []))
+                    if needed.issubset(existing):
+                        payload["weight"] = float(payload.get("weight", 1.0)) + delta
+                        updated += 1
+            self._write_json(self.links_file, links)
+            return updated
 
     def load_node(self, uid: str):
         """Load a single node by UID. Returns None if not found."""
@@ -437,10 +928,21 @@ class StorageEngine:
 
     def resolve_uid_with_reason(self, uid_or_prefix: str) -> tuple[str | None, str]:
         """Resolve exact/prefix UID and return reason: exact|prefix|ambiguous|missing."""
-        index = self.load_index()
-        if uid_or_prefix in index.uid_file:
+        point = self._point_state()
+        if point is not None:
+            store, delta, overlay = point
+            try:
+                uids = [uid for uid in store.uids_with_prefix(uid_or_prefix) if uid not in delta]
+                uids.extend(uid for uid, payload in delta.items() if payload is not None)
+                uids = [uid for uid in uids if uid not in overlay.nodes and not overlay.is_removed(uid)]
+                uids.extend(overlay.nodes)
+            finally:
+                store.close()
+        else:
+            uids = list(self.load_index().uid_file)
+        if uid_or_prefix in uids:
             return uid_or_prefix, "exact"
-        matches = [uid for uid in index.uid_file if uid.startswith(uid_or_prefix)]
+        matches = [uid for uid in uids if uid.startswith(uid_or_prefix)]
         if len(matches) == 1:
             return matches[0], "prefix"
         if len(matches) > 1:
@@ -461,92 +963,67 @@ class StorageEngine:
 
     def update_node_status(self, uid: str, status: str) -> bool:
         """Update the status field of a node. Returns True if updated."""
-        index = self.load_index()
-        cluster_name = index.uid_file.get(uid)
-        if not cluster_name:
-            return False
-        cluster_path = self.nodes_dir / f"{cluster_name}.json"
-        data = self._read_json(cluster_path, {})
-        payload = data.get(uid)
-        if not payload:
-            return False
-        if "status" not in payload:
-            return False
-        payload["status"] = status
-        payload["updated_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        self._write_json(cluster_path, data)
-        self._touch_recent_uid(uid)
-        return True
+        with self.batch():
+            payloads = self._load_payloads([uid])
+            if not payloads or "status" not in payloads[0]:
+                return False
+            updated_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            self._append_wal("patch", uid=uid, fields={"status": status, "updated_at": updated_at})
+            self._touch_recent_uid(uid)
+            return True
 
     def remove_node(self, uid: str) -> bool:
         """Remove a node by UID and clean related index/link references."""
-        index = self.load_index()
-        cluster_name = index.uid_file.get(uid)
-        if not cluster_name:
-            return False
-
-        cluster_path = self.nodes_dir / f"{cluster_name}.json"
-        cluster_data = self._read_json(cluster_path, {})
-        payload = cluster_data.pop(uid, None)
-        if payload is None:
-            return False
-        self._write_json(cluster_path, cluster_data)
-
-        node_type = str(payload.get("__type__", "memory"))
-
-        index.uid_file.pop(uid, None)
-        self._remove_uid_from_all_session_recents(uid)
-
-        type_uids = index.types.get(node_type, [])
-        if uid in type_uids:
-            type_uids.remove(uid)
-        if not type_uids and node_type in index.types:
-            index.types.pop(node_type, None)
-
-        for tag in payload.get("tags", {}):
-            tagged_uids = index.tags.get(tag, [])
-            if uid in tagged_uids:
-                tagged_uids.remove(uid)
-            if not tagged_uids and tag in index.tags:
-                index.tags.pop(tag, None)
-
-        index.links_in.pop(uid, None)
-        for target_uid, source_uids in list(index.links_in.items()):
-            if uid in source_uids:
-                source_uids.remove(uid)
-            if not source_uids:
-                index.links_in.pop(target_uid, None)
-
-        if cluster_name in index.clusters:
-            index.clusters[cluster_name].size = len(cluster_data)
-
-        links = self._read_json(self.links_file, {})
-        links.pop(uid, None)
-        for source_uid, items in list(links.items()):
-            kept = [item for item in items if item.get("target") != uid]
-            if kept:
-                links[source_uid] = kept
-            else:
-                links.pop(source_uid, None)
-        self._write_json(self.links_file, links)
-
-        self.save_index(index)
-        return True
+        with self.batch():
+            index = self.load_index()
+            cluster_name = index.uid_file.get(uid)
+            payloads = self._load_payloads([uid])
+            if not cluster_name or not payloads:
+                return False
+            payload = payloads[0]
+            self._append_wal(
+                "remove",
+                uid=uid,
+                type=str(payload.get("__type__", "memory")),
+                tags=list(payload.get("tags", {})),
+                cluster=cluster_name,
+                links=self._incident_links(index, uid),
+            )
+            self._remove_uid_from_all_session_recents(uid)
+            return True
+
+    def _incident_links(self, index: IndexData, uid: str) -> dict[str, dict]:
+        """{link uid: source, target, tags, usage_count} of every link that starts or ends at `uid`.
+
+        Only the links.json buckets of `uid` and the nodes linking to it are consulted.
+        """
+        sources = [uid, *sorted(index.links_in.get(uid, ()))]
+        return {
+            payload["uid"]: {
+                "source": payload["source"],
+                "target": payload["target"],
+                "tags": list(payload.get("tags", ())),
+                "usage_count": int(payload.get("usage_count", 1)),
+            }
+            for payload in self._link_payloads(sources)
+            if uid in (payload["source"], payload["target"])
+        }
 
     def remove_nodes_by_type(self, node_type: str) -> int:
         """Remove all nodes of a given type."""
+        with self.batch():
+            index = self.load_index()
+            uids = list(index.types.get(node_type, []))
+            removed = 0
+            for uid in uids:
+                if self.remove_node(uid):
+                    removed += 1
+            return removed
+
+    def load_nodes_by_type(self, node_type: str, lazy: bool = False):
         index = self.load_index()
-        uids = list(index.types.get(node_type, []))
-        removed = 0
-        for uid in uids:
-            if self.remove_node(uid):
-                removed += 1
-        return removed
-
-    def load_nodes_by_type(self, node_type: str):
-        index = self.load_index()
-        uids = index.types.get(node_type, [])
-        return self.load_nodes(uids)
+        uids = sorted(index.types.get(node_type, ()))
+        return self.load_nodes(uids, lazy=lazy)
 
     def create_memory_file(self, title: str, content: str) -> Path:
         slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "memory"
@@ -555,49 +1032,162 @@ class StorageEngine:
             path.write_text(content, encoding="utf-8")
         return path
 
+    def flush_inbox(self) -> str:
+        """Move inbox nodes into their best-matching clusters; return the cluster that took the most."""
+        with self.batch():
+            self._compact_wal()
+            inbox_path = self.nodes_dir / f"{PENDING_CLUSTER}.json"
+            inbox = self._read_json(inbox_path, {})
+            if not inbox:
+                return PENDING_CLUSTER
+
+            index = self.load_index()
+            max_size = load_config(self.config_file).prune.max_cluster_size
+            taken = {path.stem for path in self._cluster_paths()}
+            placed: dict[str, dict] = {}
+            counts: dict[str, int] = {}
+            for uid, payload in inbox.items():
+                tags = {tag: float(weight) for tag, weight in payload.get("tags", {}).items()}
+                name = select_best_cluster(index, tags, max_size)
+                if name == PENDING_CLUSTER:
+                    name = derive_cluster_name(tags)
+                    if name == PENDING_CLUSTER:
+                        name = UNTAGGED_CLUSTER
+                    # No matching cluster has room; continue in the derived cluster's next part.
+                    name = cluster_with_room(index, name, max_size, taken)
+                if name not in placed:
+                    placed[name] = self._read_json(self.nodes_dir / f"{name}.json", {})
+                if name not in index.clusters:
+                    # Give a new cluster its tags now so later inbox nodes can select it.
+                    index.clusters[name] = ClusterMeta(top_tags=cluster_top_tags({uid: payload}))
+                index.clusters[name].size += 1
+                placed[name][uid] = payload
+                counts[name] = counts.get(name, 0) + 1
+
+            self._write_json(inbox_path, {})
+            index.clusters.pop(PENDING_CLUSTER, None)
+            for name, data in placed.items():
+                self._store_cluster(index, name, data, max_size)
+            self.save_index(index)
+            return max(counts, key=lambda name: counts[name])
+
+    def _store_cluster(self, index: IndexData, name: str, data: dict, max_size: int, write: bool = True) -> None:
+        """Write a cluster (split when larger than `max_size`) and refresh its index entries."""
+        parts = {name: data}
+        if len(data) > max_size > 0:
+            taken = set(index.clusters) | {path.stem for path in self._cluster_paths()}
+            parts = split_cluster(name, data, max_size, taken)
+        for part_name, part in parts.items():
+            if write or len(parts) > 1:
+                self._write_json(self.nodes_dir / f"{part_name}.json", part)
+            index.clusters[part_name] = ClusterMeta(top_tags=cluster_top_tags(part), size=len(part))
+            for uid in part:
+                index.uid_file[uid] = part_name
+
     def prune(self) -> str:
-        inbox_path = self.nodes_dir / "_inbox.json"
-        inbox = self._read_json(inbox_path, {})
-        if not inbox:
-            return "_inbox"
-
-        tag_weights: dict[str, float] = {}
-        for payload in inbox.values():
-            for tag, weight in payload.get("tags", {}).items():
-                tag_weights[tag] = tag_weights.get(tag, 0.0) + float(weight)
-        cluster_name = derive_cluster_name(tag_weights)
-        cluster_path = self.nodes_dir / f"{cluster_name}.json"
-        existing = self._read_json(cluster_path, {})
-        existing.update(inbox)
-        self._write_json(cluster_path, existing)
-        self._write_json(inbox_path, {})
-
-        # rebuild lightweight index maps from cluster files
-        index = IndexData()
-        for f in self.nodes_dir.glob("*.json"):
-            if f.name == "_inbox.json":
+        with self.batch():
+            cluster_name = self.flush_inbox()
+            wal_seq = self.load_index().wal_seq
+            config = load_config(self.config_file).prune
+            max_size = config.max_cluster_size
+            self._repack_clusters(max_size, config.min_cluster)
+
+            # rebuild lightweight index maps from cluster files
+            index = IndexData(wal_seq=wal_seq)
+            payloads: dict[str, dict] = {}
+            for f in self._cluster_paths():
+                data = self._read_json(f, {})
+                payloads.update(data)
+                if f.stem != PENDING_CLUSTER:
+                    self._store_cluster(index, f.stem, data, max_size, write=False)
+                for uid, payload in data.items():
+                    index.uid_file.setdefault(uid, f.stem)
+                    ntype = payload.get("__type__", "memory")
+                    add_unique(index.types, ntype, uid)
+                    for tag in payload.get("tags", {}):
+                        add_unique(index.tags, tag, uid)
+
+            # rebuild link maps and the adjacency file from links.json
+            raw_links = self._read_json(self.links_file, {})
+            rebuild_link_index(index, raw_links)
+            self._batch.adjacency = _adjacency_from_links(raw_links).to_bytes()
+
+            self.save_index(index)
+            # Compaction already queued the changed texts; this only catches up a missing index.
+            self._text_changes()
+            for legacy in (self.root / "text_index.json", self.root / "text_delta.json"):
+                if legacy.exists():
+                    self._unlink(legacy)
+            current = self._open_packed(wal_seq)
+            if current is None or current[1]:
+                self._batch.packed = build_packed(payloads, wal_seq, self.codec)
+                self._read_json(self.packed_delta_file, None)
+                self._reset_packed_delta(wal_seq)
+            if current is not None:
+                current[0].close()
+            self._prune_session_recent_uids(set(index.uid_file.keys()))
+            return cluster_name
+
+    def _repack_clusters(self, max_size: int, min_size: int) -> None:
+        """Merge the parts of split clusters into as few files as fit `max_size`, then move each
+        cluster smaller than `min_size` into the best-matching cluster with room for it."""
+        clusters = {
+            path.stem: self._read_json(path, {}) for path in self._cluster_paths() if path.stem != PENDING_CLUSTER
+        }
+        moved: set[str] = set()
+        families: dict[str, list[str]] = {}
+        for name in clusters:
+            families.setdefault(cluster_family(name, set(clusters)), []).append(name)
+        for family, names in families.items():
+            total = sum(len(clusters[name]) for name in names)
+            if len(names) < 2 or max_size <= 0 or len(names) <= -(-total // max_size):
                 continue
-            data = self._read_json(f, {})
-            cname = f.stem
-            index.clusters[cname] = ClusterMeta(top_tags=list(tag_weights.keys())[:3], size=len(data))
-            for uid, payload in data.items():
-                index.uid_file[uid] = cname
-                ntype = payload.get("__type__", "memory")
-                add_unique(index.types, ntype, uid)
-                for tag in payload.get("tags", {}):
-                    add_unique(index.tags, tag, uid)
-
-        # rebuild links_in from links.json
-        raw_links = self._read_json(self.links_file, {})
-        for source, items in raw_links.items():
-            for payload in items:
-                target = payload.get("target", "")
-                if target:
-                    add_unique(index.links_in, target, source)
+            names.sort(key=lambda name: (name != family, int(name.rsplit("-", 1)[-1]) if name != family else 0))
+            merged = {uid: payload for name in names for uid, payload in clusters[name].items()}
+            parts = split_cluster(family, merged, max_size, set(clusters) - set(names))
+            for name in names:
+                clusters.pop(name)
+                moved.add(name)
+            clusters.update(parts)
+            moved.update(parts)
+
+        if min_size > 1:
+            metas = IndexData(
+                clusters={name: ClusterMeta(top_tags=cluster_top_tags(data), size=len(data)) for name, data in clusters.items()}
+            )
+            for name in sorted(clusters, key=lambda name: (len(clusters[name]), name)):
+                data = clusters[name]
+                if len(data) >= min_size:
+                    continue
+                meta = metas.clusters.pop(name)
+                tags: dict[str, float] = {}
+                for payload in data.values():
+                    for tag, weight in payload.get("tags", {}).items():
+                        tags[tag] = tags.get(tag, 0.0) + float(weight)
+                target = select_best_cluster(metas, tags, max_size, needed=len(data))
+                if data and target == PENDING_CLUSTER:
+                    metas.clusters[name] = meta
+                    continue
+                if data:
+                    clusters[target].update(data)
+                    metas.clusters[target] = ClusterMeta(top_tags=cluster_top_tags(clusters[target]), size=len(clusters[target]))
+                    moved.add(target)
+                del clusters[name]
+                moved.add(name)
+
+        for name in moved:
+            path = self.nodes_dir / f"{name}.json"
+            if name in clusters:
+                self._write_json(path, clusters[name])
+            else:
+                self._unlink(path)
 
-        self.save_index(index)
-        self._prune_session_recent_uids(set(index.uid_file.keys()))
-        return cluster_name
+    def _cluster_paths(self) -> list[Path]:
+        paths = set(self.nodes_dir.glob("*.json"))
+        if self._batch is not None:
+            paths.update(p for p in self._batch.dirty_files if p.parent == self.nodes_dir and p.suffix == ".json")
+            paths.difference_update(self._batch.deleted_files)
+        return sorted(paths)
 
     def _touch_recent_uid(self, uid: str) -> None:
         index = self.load_index()
@@ -644,24 +1234,124 @@ class StorageEngine:
         # Session runtime state now lives in user-level config storage, not project files.
         return
 
-    def all_nodes(self):
+    def all_nodes(self, lazy: bool = False):
         index = self.load_index()
-        return self.load_nodes(list(index.uid_file.keys()))
+        return self.load_nodes(list(index.uid_file.keys()), lazy=lazy)
+
+    def load_adjacency(self) -> Adjacency:
+        """Return link adjacency: adjacency.bin with pending log records applied, or built from the links."""
+        _, overlay = self._wal_state()
+        blob = self._batch.adjacency if self._batch is not None else None
+        try:
+            adjacency = Adjacency.from_bytes(blob) if blob is not None else Adjacency.open(self.adjacency_file)
+        except (struct.error, ValueError):
+            adjacency = None
+        if adjacency is None:
+            return Adjacency.from_edges((payload["source"], payload["target"]) for payload in self._link_payloads())
+        for payload in overlay.links:
+            adjacency.add_edge(payload["source"], payload["target"])
+        for uid in overlay.removed:
+            adjacency.remove_node(uid)
+        return adjacency
 
     def all_links(self) -> list[Link]:
-        raw = self._read_json(self.links_file, {})
-        out: list[Link] = []
-        for items in raw.values():
-            for payload in items:
-                out.append(Link.model_validate(payload))
-        return out
+        return [Link.model_validate(payload) for payload in self._link_payloads()]
+
+    def tag_postings(self, tags: Iterable[str]) -> dict[str, set[str]]:
+        """Uids posted under each of `tags`; tags without nodes are left out."""
+        index = self.load_index()
+        return {tag: set(index.tags[tag]) for tag in set(tags) if tag in index.tags}
+
+    def links_with_tags(self, tags: Iterable[str]) -> list[dict]:
+        """Raw payloads of the links carrying any of `tags`, in storage order."""
+        wanted = set(tags)
+        # The index keeps per-tag link counts, so links are only read when some link can match.
+        if not any(self.load_index().tag_link_counts.get(tag) for tag in wanted):
+            return []
+        return [payload for payload in self._link_payloads() if wanted.intersection(payload.get("tags", ()))]
+
+    def total_link_usage(self) -> int:
+        """Bank-wide sum of link usage counts, as scoring normalizes frequency by."""
+        return self.load_index().total_usage
+
+    def bank_order(self, uids: Iterable[str] | None = None) -> list[str]:
+        """`uids` (default: every node) in the order `all_nodes()` returns them."""
+        order = self.load_index().uid_file
+        if uids is None:
+            return list(order)
+        wanted = set(uids)
+        return [uid for uid in order if uid in wanted]
+
+    def raw_node_payloads(self) -> dict[str, dict]:
+        """Return every stored node payload (including `__type__`) keyed by UID."""
+        index = self.load_index()
+        return {payload["uid"]: payload for payload in self._load_payloads(list(index.uid_file))}
+
+    def raw_link_payloads(self) -> list[dict]:
+        return self._link_payloads()
+
+    def replace_contents(self, node_payloads: Iterable[dict], link_payloads: Iterable[dict]) -> None:
+        """Replace all nodes and links (used by backend migration), then rebuild clusters and index."""
+        with self.batch():
+            _, overlay = self._wal_state()
+            self._batch.overlay = WalOverlay(last_seq=overlay.last_seq)
+            self._batch.wal_pending = []
+            self._batch.wal_truncate = True
+            for path in self._cluster_paths():
+                self._unlink(path)
+            self._unlink(self.packed_file)
+            self._write_json(self.nodes_dir / "_inbox.json", {payload["uid"]: payload for payload in node_payloads})
+            links: dict[str, list[dict]] = {}
+            for payload in link_payloads:
+                links.setdefault(payload["source"], []).append(payload)
+            self._write_json(self.links_file, links)
+            self.save_index(IndexData(wal_seq=overlay.last_seq))
+            self._sync_text_rows()
+            self.prune()
 
     def add_rule(self, rule: str) -> None:
-        data = self._read_json(self.rules_file, {"rules": []})
-        data.setdefault("rules", [])
-        data["rules"].append(rule)
-        self._write_json(self.rules_file, data)
+        with self.batch():
+            data = self._read_json(self.rules_file, {"rules": []})
+            data.setdefault("rules", [])
+            data["rules"].append(rule)
+            self._write_json(self.rules_file, data)
 
     def list_rules(self) -> list[str]:
         data = self._read_json(self.rules_file, {"rules": []})
         return list(data.get("rules", []))
+
+
+def _packed_payload(
+    store: PackedNodeStore, delta: dict[str, dict | None], overlay: WalOverlay, uid: str
+) -> dict | None:
+    if uid in overlay.nodes:
+        return overlay.nodes[uid]
+    return overlay.merge(uid, delta[uid] if uid in delta else store.get(uid))
+
+
+def _touched_uids(records: list[dict], after_seq: int) -> set[str]:
+    """Uids whose payload changed in `records` newer than `after_seq`."""
+    touched: set[str] = set()
+    for record in records:
+        if int(record.get("seq", 0)) <= after_seq:
+            continue
+        if record.get("op") == "node":
+            touched.add(record["payload"]["uid"])
+        elif record.get("op") in {"patch", "remove"}:
+            touched.add(record["uid"])
+    return touched
+
+
+def _lower(text: str | None) -> str | None:
+    return text.lower() if text is not None else None
+
+
+def _adjacency_from_links(links: dict[str, list[dict]]) -> Adjacency:
+    return Adjacency.from_edges((source, item["target"]) for source, items in links.items() for item in items)
+
+
+def _same_bytes(path: Path, blob: bytes) -> bool:
+    try:
+        return path.stat().st_size == len(blob) and path.read_bytes() == blob
+    except FileNotFoundError:
+        return False
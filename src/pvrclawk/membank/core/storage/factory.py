@@ -0,0 +1,39 @@
+"""Select the storage backend for a bank and migrate between backends."""
+
+from pathlib import Path
+
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.sqlite import SqliteStorageEngine
+from pvrclawk.utils.config import load_config, set_config_value
+
+BACKENDS: dict[str, type[StorageEngine]] = {
+    "json": StorageEngine,
+    "sqlite": SqliteStorageEngine,
+}
+
+
+def open_storage(root: Path) -> StorageEngine:
+    """Open a bank with the backend named in its `config.toml` (`storage.backend`, default json)."""
+    root = Path(root)
+    backend = load_config(root / "config.toml").storage.backend
+    return BACKENDS[backend](root)
+
+
+def migrate_storage(root: Path, backend: str) -> tuple[int, int]:
+    """Copy all nodes and links into `backend`, then switch the bank config to it.
+
+    Returns (node_count, link_count). The previous backend's files are left in place.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    source = open_storage(root)
+    target_cls = BACKENDS[backend]
+    if type(source) is target_cls:
+        raise ValueError(f"Bank already uses the {backend} backend.")
+    nodes = source.raw_node_payloads()
+    links = source.raw_link_payloads()
+    target = target_cls(Path(root))
+    target.init_db()
+    target.replace_contents(nodes.values(), links)
+    set_config_value(target.config_file, "storage.backend", backend)
+    return len(nodes), len(links)
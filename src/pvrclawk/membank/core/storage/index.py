@@ -1,20 +1,116 @@
 from pvrclawk.membank.models.index import ClusterMeta, IndexData
 
 
-def add_unique(mapping: dict[str, list[str]], key: str, value: str) -> None:
-    values = mapping.setdefault(key, [])
-    if value not in values:
-        values.append(value)
+def add_unique(mapping: dict[str, set[str]], key: str, value: str) -> None:
+    mapping.setdefault(key, set()).add(value)
 
 
-def remove_value(mapping: dict[str, list[str]], key: str, value: str) -> None:
-    values = mapping.get(key, [])
-    if value in values:
-        values.remove(value)
-    if not values and key in mapping:
+def remove_value(mapping: dict[str, set[str]], key: str, value: str) -> None:
+    values = mapping.get(key)
+    if values is None:
+        return
+    values.discard(value)
+    if not values:
         del mapping[key]
 
 
 def ensure_cluster(index: IndexData, cluster_name: str) -> None:
     if cluster_name not in index.clusters:
         index.clusters[cluster_name] = ClusterMeta(top_tags=[], size=0)
+
+
+def index_node(index: IndexData, uid: str, cluster_name: str, node_type: str, tags) -> None:
+    index.uid_file[uid] = cluster_name
+    add_unique(index.types, node_type, uid)
+    for tag in tags:
+        add_unique(index.tags, tag, uid)
+
+
+def unindex_node(index: IndexData, uid: str, node_type: str, tags, links=None) -> None:
+    """Drop a node and the links in `links` ({link uid: link details or, in older records, source uid})."""
+    index.uid_file.pop(uid, None)
+    remove_value(index.types, node_type, uid)
+    for tag in tags:
+        remove_value(index.tags, tag, uid)
+    for link_uid, link in (links or {}).items():
+        if isinstance(link, str):
+            # Logged without the link's details: the next compaction rebuilds the link maps.
+            remove_value(index.links_out, link, link_uid)
+            continue
+        unindex_link(
+            index, link_uid, link["source"], link["target"], link.get("tags", ()), link.get("usage_count", 1)
+        )
+    index.links_in.pop(uid, None)
+    index.links_out.pop(uid, None)
+
+
+def retype_node(index: IndexData, uid: str, old_type: str, new_type: str) -> None:
+    remove_value(index.types, old_type, uid)
+    add_unique(index.types, new_type, uid)
+
+
+def _add_count(counts: dict[str, int], key: str, delta: int) -> None:
+    value = counts.get(key, 0) + delta
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+def index_link(index: IndexData, link_uid: str, source: str, target: str, tags=(), usage_count: int = 0) -> None:
+    if link_uid in index.links_out.get(source, ()):
+        # Compaction keeps the first payload saved under a link uid, so a re-save changes nothing.
+        return
+    add_unique(index.links_in, target, source)
+    add_unique(index.links_out, source, link_uid)
+    for tag in dict.fromkeys(tags):
+        _add_count(index.tag_link_counts, tag, 1)
+    bump_link_usage(index, tags, usage_count)
+
+
+def bump_link_usage(index: IndexData, tags, count: int) -> None:
+    """Add `count` uses of a link carrying `tags` to the running usage totals."""
+    count = max(int(count), 0)
+    if count == 0:
+        return
+    index.total_usage += count
+    for tag in dict.fromkeys(tags):
+        _add_count(index.tag_usage, tag, count)
+
+
+def unindex_link(index: IndexData, link_uid: str, source: str, target: str, tags=(), usage_count: int = 0) -> None:
+    """Drop an indexed link and its share of the aggregates.
+
+    `links_in` only records node pairs, so the pair goes with the link; node removal drops every
+    link between the pair at once.
+    """
+    if link_uid not in index.links_out.get(source, ()):
+        return
+    remove_value(index.links_out, source, link_uid)
+    remove_value(index.links_in, target, source)
+    for tag in dict.fromkeys(tags):
+        _add_count(index.tag_link_counts, tag, -1)
+    count = max(int(usage_count), 0)
+    index.total_usage -= count
+    for tag in dict.fromkeys(tags):
+        _add_count(index.tag_usage, tag, -count)
+
+
+def rebuild_link_index(index: IndexData, raw_links: dict[str, list[dict]]) -> None:
+    index.links_in = {}
+    index.links_out = {}
+    index.total_usage = 0
+    index.tag_usage = {}
+    index.tag_link_counts = {}
+    for source, items in raw_links.items():
+        for payload in items:
+            target = payload.get("target", "")
+            if target:
+                index_link(
+                    index,
+                    str(payload.get("uid", "")),
+                    source,
+                    target,
+                    payload.get("tags", ()),
+                    payload.get("usage_count", 1),
+                )
@@ -0,0 +1,139 @@
+"""Packed, memory-mapped node store (`nodes/_packed.bin`).
+
+Layout (little endian):
+
+    header   magic "PVRPACK1", generation u64, count u32
+    entries  count x (uid offset u32, uid length u16, record offset u64, record length u32),
+             sorted by uid bytes
+    uids     concatenated UTF-8 uids
+    records  each a u32 length prefix followed by one encoded JSON payload
+
+`generation` is the `IndexData.wal_seq` the snapshot was built at. A lookup is a binary search
+over the fixed-size entry table plus one record decode.
+
+Compactions after the snapshot was built record the payloads they changed in
+`packed_delta.json`: {"base": snapshot generation, "wal_seq": last folded seq, "nodes": {uid:
+payload, or null once removed}}. Snapshot plus delta hold every folded node, so a point read
+needs only them and the unfolded log records.
+"""
+
+import mmap
+from pathlib import Path
+import struct
+
+from pvrclawk.utils.json_io import JsonCodec
+
+MAGIC = b"PVRPACK1"
+_HEADER = struct.Struct("<8sQI")
+_ENTRY = struct.Struct("<IHQI")
+_LENGTH = struct.Struct("<I")
+
+
+def build_packed(payloads: dict[str, dict], generation: int, codec: JsonCodec) -> bytes:
+    uids = sorted(payloads, key=lambda uid: uid.encode("utf-8"))
+    encoded_uids = [uid.encode("utf-8") for uid in uids]
+    uid_base = _HEADER.size + _ENTRY.size * len(uids)
+    record_base = uid_base + sum(len(raw) for raw in encoded_uids)
+
+    entries: list[bytes] = []
+    records: list[bytes] = []
+    uid_offset = uid_base
+    record_offset = record_base
+    for uid, raw_uid in zip(uids, encoded_uids):
+        blob = codec.dumps(payloads[uid])
+        entries.append(_ENTRY.pack(uid_offset, len(raw_uid), record_offset + _LENGTH.size, len(blob)))
+        records.append(_LENGTH.pack(len(blob)) + blob)
+        uid_offset += len(raw_uid)
+        record_offset += _LENGTH.size + len(blob)
+    header = _HEADER.pack(MAGIC, generation, len(uids))
+    return b"".join([header, *entries, *encoded_uids, *records])
+
+
+class PackedNodeStore:
+    def __init__(self, handle, view: mmap.mmap, codec: JsonCodec):
+        self._handle = handle
+        self._view = view
+        self.codec = codec
+        magic, self.generation, self.count = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("not a packed node store")
+
+    @classmethod
+    def open(cls, path: Path, codec: JsonCodec) -> "PackedNodeStore | None":
+        """Map the store at `path`; None when it is missing or unreadable."""
+        try:
+            handle = path.open("rb")
+        except FileNotFoundError:
+            return None
+        try:
+            view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            handle.close()
+            return None
+        try:
+            return cls(handle, view, codec)
+        except (struct.error, ValueError):
+            view.close()
+            handle.close()
+            return None
+
+    def close(self) -> None:
+        self._view.close()
+        self._handle.close()
+
+    def __enter__(self) -> "PackedNodeStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, position: int) -> tuple[int, int, int, int]:
+        return _ENTRY.unpack_from(self._view, _HEADER.size + position * _ENTRY.size)
+
+    def _uid(self, position: int) -> bytes:
+        uid_offset, uid_length, _, _ = self._entry(position)
+        return self._view[uid_offset : uid_offset + uid_length]
+
+    def _lower_bound(self, target: bytes) -> int:
+        """Position of the first entry whose uid is not below `target`."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._uid(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, uid: str) -> dict | None:
+        target = uid.encode("utf-8")
+        position = self._lower_bound(target)
+        if position == self.count:
+            return None
+        uid_offset, uid_length, record_offset, record_length = self._entry(position)
+        if self._view[uid_offset : uid_offset + uid_length] != target:
+            return None
+        return self.codec.loads(self._view[record_offset : record_offset + record_length])
+
+    def uids_with_prefix(self, prefix: str) -> list[str]:
+        """Stored uids starting with `prefix`, in uid order, read from the entry table only."""
+        target = prefix.encode("utf-8")
+        found: list[str] = []
+        for position in range(self._lower_bound(target), self.count):
+            uid = self._uid(position)
+            if not uid.startswith(target):
+                break
+            found.append(uid.decode("utf-8"))
+        return found
+
+    def payloads(self) -> dict[str, dict]:
+        """Every stored payload keyed by uid."""
+        out: dict[str, dict] = {}
+        for position in range(self.count):
+            uid_offset, uid_length, record_offset, record_length = self._entry(position)
+            uid = self._view[uid_offset : uid_offset + uid_length].decode("utf-8")
+            out[uid] = self.codec.loads(self._view[record_offset : record_offset + record_length])
+        return out
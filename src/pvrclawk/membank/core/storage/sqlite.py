@@ -0,0 +1,471 @@
+"""SQLite-backed StorageEngine (stdlib sqlite3) with indexed node/tag/type/link tables."""
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import sqlite3
+
+from pvrclawk.membank.core.forctx.scorer import node_to_searchable_text
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.models.index import ClusterMeta, IndexData
+from pvrclawk.membank.models.link import Link
+from pvrclawk.membank.core.storage.index import add_unique, index_link
+from pvrclawk.membank.core.storage.text_index import TEXT_SCHEMA, TEXT_TABLES, TextIndex, index_rows, unindex_rows
+from pvrclawk.utils.config import load_config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    uid TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS node_types (
+    type TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    PRIMARY KEY (type, uid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS node_types_uid ON node_types (uid);
+CREATE TABLE IF NOT EXISTS node_tags (
+    tag TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    weight REAL NOT NULL DEFAULT 1.0,
+    PRIMARY KEY (tag, uid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS node_tags_uid ON node_tags (uid);
+CREATE TABLE IF NOT EXISTS links (
+    uid TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    usage_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS links_source ON links (source);
+CREATE INDEX IF NOT EXISTS links_target ON links (target);
+CREATE TABLE IF NOT EXISTS link_tags (
+    tag TEXT NOT NULL,
+    link_uid TEXT NOT NULL,
+    PRIMARY KEY (tag, link_uid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS link_tags_link ON link_tags (link_uid);
+"""
+
+TABLES = ("nodes", "node_types", "node_tags", *TEXT_TABLES, "links", "link_tags")
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit.
+_CHUNK = 500
+# Upper bound for prefix range scans: sorts after every valid UTF-8 sequence.
+_PREFIX_END = chr(0x10FFFF)
+
+
+def _chunks(items: list[str]) -> Iterator[list[str]]:
+    for start in range(0, len(items), _CHUNK):
+        yield items[start : start + _CHUNK]
+
+
+def _placeholders(count: int) -> str:
+    return ",".join("?" for _ in range(count))
+
+
+def _upgrade_schema(conn: sqlite3.Connection) -> None:
+    """Add columns introduced after a database was created, backfilling them from the payloads."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(links)")}
+    if "usage_count" not in columns:
+        conn.execute("ALTER TABLE links ADD COLUMN usage_count INTEGER NOT NULL DEFAULT 1")
+        rows = conn.execute("SELECT uid, payload FROM links").fetchall()
+        conn.executemany(
+            "UPDATE links SET usage_count = ? WHERE uid = ?",
+            [(int(json.loads(raw).get("usage_count", 1)), uid) for uid, raw in rows],
+        )
+        conn.commit()
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(node_terms)")}
+    legacy = "positions" in columns or (
+        conn.execute("SELECT 1 FROM node_uid_chars LIMIT 1").fetchone() is None
+        and conn.execute("SELECT 1 FROM node_texts LIMIT 1").fetchone() is not None
+    )
+    if legacy:
+        # Older layouts kept term positions and indexed the uid too; reindex the stored texts.
+        conn.execute("DROP TABLE node_terms")
+        conn.executescript(TEXT_SCHEMA)
+        for uid, text in conn.execute("SELECT uid, text FROM node_texts").fetchall():
+            index_rows(conn, uid, text)
+        conn.commit()
+
+
+class LinkNeighbors:
+    """Adjacency answered from the indexed `links` table, one query per visited node."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._neighbors: dict[str, list[str]] = {}
+
+    def __contains__(self, uid: str) -> bool:
+        if uid in self._neighbors:
+            return True
+        row = self._conn.execute(
+            "SELECT 1 FROM links WHERE source = ? UNION ALL SELECT 1 FROM links WHERE target = ? LIMIT 1", (uid, uid)
+        ).fetchone()
+        return row is not None
+
+    def neighbors(self, uid: str) -> list[str]:
+        cached = self._neighbors.get(uid)
+        if cached is None:
+            rows = self._conn.execute(
+                "SELECT CASE WHEN source = ? THEN target ELSE source END FROM links "
+                "WHERE source = ? OR target = ? ORDER BY rowid",
+                (uid, uid, uid),
+            )
+            cached = self._neighbors[uid] = list(dict.fromkeys(other for (other,) in rows))
+        return cached
+
+
+class SqliteStorageEngine(StorageEngine):
+    """Same surface as StorageEngine, with nodes and links stored in `membank.db`."""
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.db_file = self.root / "membank.db"
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_file)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA + TEXT_SCHEMA)
+            _upgrade_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        self.flush_link_usage()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @contextmanager
+    def batch(self) -> Iterator["SqliteStorageEngine"]:
+        """Unit of work: one SQLite transaction plus the base session/file batch."""
+        outermost = self._batch is None
+        with super().batch():
+            if not outermost:
+                yield self
+                return
+            conn = self._connect()
+            changes = conn.total_changes
+            try:
+                yield self
+            except BaseException:
+                conn.rollback()
+                raise
+            if conn.total_changes - changes > self._batch.feedback_changes:
+                self._batch.mutated = True
+            conn.commit()
+
+    def _init_db(self) -> None:
+        super()._init_db()
+        self._connect()
+
+    def load_index(self) -> IndexData:
+        """Build an IndexData view from the tables (compatibility; internal paths query SQL directly)."""
+        conn = self._connect()
+        index = IndexData()
+        # uid order matches all_nodes(), so candidate lists rank ties the same way.
+        for node_type, uid in conn.execute("SELECT type, uid FROM node_types ORDER BY uid"):
+            index.uid_file[uid] = "sqlite"
+            add_unique(index.types, node_type, uid)
+        for tag, uid in conn.execute("SELECT tag, uid FROM node_tags"):
+            add_unique(index.tags, tag, uid)
+        rows = conn.execute("SELECT uid, source, target, payload FROM links ORDER BY rowid")
+        for link_uid, source, target, raw in rows:
+            payload = json.loads(raw)
+            index_link(index, link_uid, source, target, payload.get("tags", ()), payload.get("usage_count", 1))
+        index.clusters["sqlite"] = ClusterMeta(top_tags=[], size=len(index.uid_file))
+        return index
+
+    def save_index(self, index: IndexData) -> None:
+        # Indexes live in SQLite tables; nothing to persist separately.
+        return
+
+    def _insert_payload(self, payload: dict) -> None:
+        conn = self._connect()
+        uid = payload["uid"]
+        node_type = str(payload.get("__type__", "memory"))
+        conn.execute(
+            "INSERT OR REPLACE INTO nodes (uid, payload) VALUES (?, ?)",
+            (uid, json.dumps(payload, ensure_ascii=False)),
+        )
+        conn.execute("DELETE FROM node_types WHERE uid = ?", (uid,))
+        conn.execute("DELETE FROM node_tags WHERE uid = ?", (uid,))
+        conn.execute("INSERT INTO node_types (type, uid) VALUES (?, ?)", (node_type, uid))
+        conn.executemany(
+            "INSERT INTO node_tags (tag, uid, weight) VALUES (?, ?, ?)",
+            [(tag, uid, float(weight)) for tag, weight in payload.get("tags", {}).items()],
+        )
+        self._index_text(payload)
+
+    def _index_text(self, payload: dict) -> None:
+        index_rows(self._connect(), payload["uid"], node_to_searchable_text(self._node_from_payload(payload)))
+
+    def _insert_link_payload(self, payload: dict) -> None:
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO links (uid, source, target, payload, usage_count) VALUES (?, ?, ?, ?, ?)",
+            (
+                payload["uid"],
+                payload["source"],
+                payload["target"],
+                json.dumps(payload, ensure_ascii=False),
+                int(payload.get("usage_count", 1)),
+            ),
+        )
+        conn.execute("DELETE FROM link_tags WHERE link_uid = ?", (payload["uid"],))
+        conn.executemany(
+            "INSERT OR IGNORE INTO link_tags (tag, link_uid) VALUES (?, ?)",
+            [(tag, payload["uid"]) for tag in payload.get("tags", [])],
+        )
+
+    def _load_payload(self, uid: str) -> dict | None:
+        row = self._connect().execute("SELECT payload FROM nodes WHERE uid = ?", (uid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _uids_of_type(self, node_type: str) -> list[str]:
+        rows = self._connect().execute("SELECT uid FROM node_types WHERE type = ?", (node_type,))
+        return [uid for (uid,) in rows]
+
+    def save_node(self, node, node_type: str) -> str:
+        with self.batch():
+            if node_type == "active":
+                config = load_config(self.config_file)
+                if config.auto_archive_active:
+                    self._archive_active_nodes_sql()
+            payload = node.model_dump(mode="json")
+            payload["__type__"] = node_type
+            self._insert_payload(payload)
+            self._record_recent_uid(node.uid)
+            return node.uid
+
+    def _archive_active_nodes_sql(self) -> None:
+        for uid in self._uids_of_type("active"):
+            payload = self._load_payload(uid)
+            if payload is None:
+                continue
+            payload["__type__"] = "archive"
+            payload["archived_from"] = payload.get("focus_area", "active")
+            payload["reason"] = "superseded by new active node"
+            self._insert_payload(payload)
+
+    def load_nodes(self, uids: list[str], lazy: bool = False):
+        conn = self._connect()
+        wanted = list(dict.fromkeys(uids))
+        by_uid: dict[str, dict] = {}
+        for chunk in _chunks(wanted):
+            rows = conn.execute(f"SELECT uid, payload FROM nodes WHERE uid IN ({_placeholders(len(chunk))})", chunk)
+            for uid, raw in rows:
+                by_uid[uid] = json.loads(raw)
+        return [self._hydrate(by_uid[uid], lazy) for uid in wanted if uid in by_uid]
+
+    def load_nodes_by_type(self, node_type: str, lazy: bool = False):
+        return self.load_nodes(self._uids_of_type(node_type), lazy=lazy)
+
+    def all_nodes(self, lazy: bool = False):
+        rows = self._connect().execute("SELECT payload FROM nodes ORDER BY uid")
+        return [self._hydrate(json.loads(raw), lazy) for (raw,) in rows]
+
+    def save_links(self, links_to_save: list[Link]) -> int:
+        if not links_to_save:
+            return 0
+        with self.batch():
+            for link in links_to_save:
+                self._insert_link_payload(link.model_dump(mode="json"))
+            return len(links_to_save)
+
+    def load_links(self, source_uids: list[str]) -> list[Link]:
+        conn = self._connect()
+        out: list[Link] = []
+        for source in source_uids:
+            for (raw,) in conn.execute("SELECT payload FROM links WHERE source = ? ORDER BY rowid", (source,)):
+                out.append(Link.model_validate_json(raw))
+        return out
+
+    def load_adjacency(self) -> "LinkNeighbors":
+        return LinkNeighbors(self._connect())
+
+    def all_links(self) -> list[Link]:
+        rows = self._connect().execute("SELECT payload FROM links")
+        return [Link.model_validate_json(raw) for (raw,) in rows]
+
+    def tag_postings(self, tags: Iterable[str]) -> dict[str, set[str]]:
+        wanted = sorted(set(tags))
+        postings: dict[str, set[str]] = {}
+        for chunk in _chunks(wanted):
+            rows = self._connect().execute(
+                f"SELECT tag, uid FROM node_tags WHERE tag IN ({_placeholders(len(chunk))})", chunk
+            )
+            for tag, uid in rows:
+                postings.setdefault(tag, set()).add(uid)
+        return postings
+
+    def links_with_tags(self, tags: Iterable[str]) -> list[dict]:
+        wanted = sorted(set(tags))
+        if not wanted:
+            return []
+        rows = self._connect().execute(
+            "SELECT payload FROM links WHERE uid IN "
+            f"(SELECT link_uid FROM link_tags WHERE tag IN ({_placeholders(len(wanted))})) ORDER BY rowid",
+            wanted,
+        )
+        return [json.loads(raw) for (raw,) in rows]
+
+    def total_link_usage(self) -> int:
+        (total,) = self._connect().execute("SELECT COALESCE(SUM(MAX(usage_count, 0)), 0) FROM links").fetchone()
+        return int(total)
+
+    def bank_order(self, uids: Iterable[str] | None = None) -> list[str]:
+        conn = self._connect()
+        if uids is None:
+            return [uid for (uid,) in conn.execute("SELECT uid FROM nodes ORDER BY uid")]
+        found: list[str] = []
+        for chunk in _chunks(list(set(uids))):
+            rows = conn.execute(f"SELECT uid FROM nodes WHERE uid IN ({_placeholders(len(chunk))})", chunk)
+            found.extend(uid for (uid,) in rows)
+        return sorted(found)
+
+    def adjust_link_weights_by_tags(self, tags: list[str], delta: float) -> int:
+        needed = sorted(set(tags))
+        with self.batch():
+            conn = self._connect()
+            if needed:
+                rows = conn.execute(
+                    f"SELECT l.uid, l.payload FROM links l JOIN link_tags t ON t.link_uid = l.uid "
+                    f"WHERE t.tag IN ({_placeholders(len(needed))}) GROUP BY l.uid HAVING COUNT(*) = ?",
+                    [*needed, len(needed)],
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT uid, payload FROM links").fetchall()
+            for uid, raw in rows:
+                payload = json.loads(raw)
+                payload["weight"] = float(payload.get("weight", 1.0)) + delta
+                conn.execute("UPDATE links SET payload = ? WHERE uid = ?", (json.dumps(payload, ensure_ascii=False), uid))
+            return len(rows)
+
+    def _write_link_usage(self, by_stamp: dict[str, dict[str, int]], link_tags: dict[str, list[str]]) -> None:
+        with self.batch():
+            conn = self._connect()
+            changes = conn.total_changes
+            for stamp, counts in by_stamp.items():
+                for link_uid, count in counts.items():
+                    row = conn.execute("SELECT payload FROM links WHERE uid = ?", (link_uid,)).fetchone()
+                    if row is None:
+                        continue
+                    payload = json.loads(row[0])
+                    payload["usage_count"] = int(payload.get("usage_count", 1)) + count
+                    payload["last_accessed"] = stamp
+                    conn.execute(
+                        "UPDATE links SET payload = ?, usage_count = ? WHERE uid = ?",
+                        (json.dumps(payload, ensure_ascii=False), payload["usage_count"], link_uid),
+                    )
+            self._batch.feedback_changes += conn.total_changes - changes
+
+    def resolve_uid_with_reason(self, uid_or_prefix: str) -> tuple[str | None, str]:
+        """Resolve exact/prefix UID and return reason: exact|prefix|ambiguous|missing."""
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM nodes WHERE uid = ?", (uid_or_prefix,)).fetchone():
+            return uid_or_prefix, "exact"
+        rows = conn.execute(
+            "SELECT uid FROM nodes WHERE uid >= ? AND uid < ? ORDER BY uid LIMIT 2",
+            (uid_or_prefix, uid_or_prefix + _PREFIX_END),
+        ).fetchall()
+        if len(rows) == 1:
+            return rows[0][0], "prefix"
+        if len(rows) > 1:
+            return None, "ambiguous"
+        return None, "missing"
+
+    def update_node_status(self, uid: str, status: str) -> bool:
+        """Update the status field of a node. Returns True if updated."""
+        with self.batch():
+            payload = self._load_payload(uid)
+            if not payload or "status" not in payload:
+                return False
+            payload["status"] = status
+            payload["updated_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            self._connect().execute(
+                "UPDATE nodes SET payload = ? WHERE uid = ?", (json.dumps(payload, ensure_ascii=False), uid)
+            )
+            self._index_text(payload)
+            self._record_recent_uid(uid)
+            return True
+
+    def remove_node(self, uid: str) -> bool:
+        """Remove a node by UID and clean related tag/type/link rows."""
+        with self.batch():
+            conn = self._connect()
+            if conn.execute("DELETE FROM nodes WHERE uid = ?", (uid,)).rowcount == 0:
+                return False
+            conn.execute("DELETE FROM node_types WHERE uid = ?", (uid,))
+            conn.execute("DELETE FROM node_tags WHERE uid = ?", (uid,))
+            unindex_rows(conn, uid)
+            conn.execute(
+                "DELETE FROM link_tags WHERE link_uid IN (SELECT uid FROM links WHERE source = ? OR target = ?)",
+                (uid, uid),
+            )
+            conn.execute("DELETE FROM links WHERE source = ? OR target = ?", (uid, uid))
+            self._remove_uid_from_all_session_recents(uid)
+            return True
+
+    def remove_nodes_by_type(self, node_type: str) -> int:
+        """Remove all nodes of a given type."""
+        with self.batch():
+            return sum(1 for uid in self._uids_of_type(node_type) if self.remove_node(uid))
+
+    def prune(self) -> str:
+        with self.batch():
+            conn = self._connect()
+            conn.execute("ANALYZE")
+            valid = {uid for (uid,) in conn.execute("SELECT uid FROM nodes")}
+            self._prune_session_recent_uids(valid)
+        return "sqlite"
+
+    def _text_index(self) -> TextIndex:
+        """The text tables in membank.db, which every write keeps current."""
+        self._ensure_text_terms()
+        return TextIndex(self._connect())
+
+    def _ensure_text_terms(self) -> None:
+        conn = self._connect()
+        indexed = all(
+            conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
+            for table in ("node_texts", "node_trigrams")
+        )
+        if not indexed:
+            # Databases created before the text tables existed are indexed on first use.
+            with self.batch():
+                changes = conn.total_changes
+                for (raw,) in conn.execute("SELECT payload FROM nodes").fetchall():
+                    self._index_text(json.loads(raw))
+                # Derived rows only; cached rankings stay valid.
+                self._batch.feedback_changes += conn.total_changes - changes
+
+    def _touch_recent_uid(self, uid: str) -> None:
+        if self._connect().execute("SELECT 1 FROM nodes WHERE uid = ?", (uid,)).fetchone():
+            self._record_recent_uid(uid)
+
+    def raw_node_payloads(self) -> dict[str, dict]:
+        rows = self._connect().execute("SELECT uid, payload FROM nodes")
+        return {uid: json.loads(raw) for uid, raw in rows}
+
+    def raw_link_payloads(self) -> list[dict]:
+        rows = self._connect().execute("SELECT payload FROM links ORDER BY rowid")
+        return [json.loads(raw) for (raw,) in rows]
+
+    def replace_contents(self, node_payloads: Iterable[dict], link_payloads: Iterable[dict]) -> None:
+        with self.batch():
+            conn = self._connect()
+            for table in TABLES:
+                conn.execute(f"DELETE FROM {table}")
+            for payload in node_payloads:
+                self._insert_payload(payload)
+            for payload in link_payloads:
+                self._insert_link_payload(payload)
@@ -0,0 +1,322 @@
+"""Token-level inverted index over node searchable text, kept in SQLite tables.
+
+The JSON backend keeps these tables in the `text_index.db` sidecar; the SQLite backend keeps
+them in `membank.db`. `node_texts` holds each node's lowercased searchable text, which forctx
+matches phrases against, and its token count. Text is lowercased and split into `\\w+` runs;
+`node_terms` maps each term to the uids containing it and how often it occurs there.
+
+The text after the node's uid is also split into overlapping character trigrams
+(`node_trigrams`). forctx phrases match by substring, and a phrase of three or more characters
+can only occur in nodes posted under all of its trigrams, which covers matches inside words,
+across word boundaries and in punctuation. Shorter phrases hold a single word, which resolves
+against every term containing it. Uids are left out of the terms and trigrams: they are
+random, so they would add a posting per node and nearly a new trigram per character. A phrase
+that can start inside a uid (its leading characters all occur in uids and run into the space
+after one, or make up the whole phrase) is also checked against the uid prefix of every text.
+Either way that yields a superset of the nodes whose text contains the phrase; callers
+confirm the phrase on those nodes only.
+
+Per-node token counts are kept alongside the postings, and a word's document frequency is
+the number of uids posted under the terms containing it; together they are the collection
+statistics `forctx --rank bm25` scores with.
+"""
+
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+import re
+import sqlite3
+
+from pvrclawk.membank.models.text_index import TextStatistics
+
+TOKEN_RE = re.compile(r"\w+")
+TRIGRAM = 3
+
+TEXT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS node_terms (
+    term TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    frequency INTEGER NOT NULL,
+    PRIMARY KEY (term, uid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS node_terms_uid ON node_terms (uid);
+CREATE TABLE IF NOT EXISTS node_trigrams (
+    trigram TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    PRIMARY KEY (trigram, uid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS node_trigrams_uid ON node_trigrams (uid);
+CREATE TABLE IF NOT EXISTS node_texts (
+    uid TEXT PRIMARY KEY,
+    length INTEGER NOT NULL,
+    text TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS node_vocabulary (
+    term TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS node_uid_chars (
+    ch TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+# Sidecar only: the sequence number of the last folded mutation-log record the tables reflect.
+META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS text_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+TEXT_TABLES = ("node_terms", "node_trigrams", "node_texts", "node_vocabulary", "node_uid_chars")
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit.
+_CHUNK = 500
+
+# word -> uid -> occurrences of the terms containing `word`.
+PostingLookup = Callable[[str], dict[str, int]]
+# trigram -> uids whose text contains it.
+TrigramLookup = Callable[[str], set[str]]
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def trigrams(text: str) -> list[str]:
+    """Distinct character trigrams of `text` (already lowercased), in first-seen order."""
+    return list(dict.fromkeys(text[start : start + TRIGRAM] for start in range(len(text) - TRIGRAM + 1)))
+
+
+def term_frequencies(text: str) -> dict[str, int]:
+    return dict(Counter(tokenize(text)))
+
+
+def text_body(uid: str, text: str) -> str:
+    """The part of a node's lowercased text after its uid, which terms and trigrams are built from."""
+    prefix = uid.lower()
+    return text[len(prefix) :] if text.startswith(prefix) else text
+
+
+def open_text_index(path: Path) -> sqlite3.Connection:
+    """Connect to the text index sidecar, creating its tables on first use."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(TEXT_SCHEMA + META_SCHEMA)
+    return conn
+
+
+def stored_seq(conn: sqlite3.Connection) -> int | None:
+    """The log sequence number the sidecar tables reflect; None when they were never written."""
+    row = conn.execute("SELECT value FROM text_meta WHERE key = 'wal_seq'").fetchone()
+    return int(row[0]) if row else None
+
+
+def index_rows(conn: sqlite3.Connection, uid: str, text: str) -> None:
+    """Replace the rows of `uid` with those of its searchable `text`."""
+    unindex_rows(conn, uid)
+    text = text.lower()
+    body = text_body(uid, text)
+    frequencies = term_frequencies(body)
+    conn.executemany(
+        "INSERT INTO node_terms (term, uid, frequency) VALUES (?, ?, ?)",
+        [(term, uid, count) for term, count in frequencies.items()],
+    )
+    conn.executemany("INSERT INTO node_trigrams (trigram, uid) VALUES (?, ?)", [(gram, uid) for gram in trigrams(body)])
+    conn.execute(
+        "INSERT INTO node_texts (uid, length, text) VALUES (?, ?, ?)", (uid, sum(frequencies.values()), text)
+    )
+    # These only ever grow: a stale term has no postings, and a superset of the uid characters
+    # just widens which phrases check uids.
+    conn.executemany("INSERT OR IGNORE INTO node_vocabulary (term) VALUES (?)", [(term,) for term in frequencies])
+    conn.executemany("INSERT OR IGNORE INTO node_uid_chars (ch) VALUES (?)", [(ch,) for ch in set(uid.lower())])
+
+
+def unindex_rows(conn: sqlite3.Connection, uid: str) -> None:
+    for table in ("node_terms", "node_trigrams", "node_texts"):
+        conn.execute(f"DELETE FROM {table} WHERE uid = ?", (uid,))
+
+
+def write_rows(conn: sqlite3.Connection, changes: Mapping[str, str | None], seq: int) -> None:
+    """Apply changed texts (None: removed) and record `seq`, in one transaction."""
+    if not changes and stored_seq(conn) == seq:
+        return
+    with conn:
+        for uid, text in changes.items():
+            if text is None:
+                unindex_rows(conn, uid)
+            else:
+                index_rows(conn, uid, text)
+        conn.execute("INSERT OR REPLACE INTO text_meta (key, value) VALUES ('wal_seq', ?)", (seq,))
+
+
+def _chunks(items: list[str]) -> Iterable[list[str]]:
+    for start in range(0, len(items), _CHUNK):
+        yield items[start : start + _CHUNK]
+
+
+class TextIndex:
+    """Reads over the text tables, with `changes` (uid -> lowercased text, None once removed)
+    they do not reflect yet applied on top."""
+
+    def __init__(self, conn: sqlite3.Connection, changes: Mapping[str, str | None] | None = None):
+        self._conn = conn
+        self._changes = dict(changes or {})
+        self._uid_chars: set[str] | None = None
+
+    def _stored_texts(self, uids: Iterable[str]) -> dict[str, str]:
+        texts: dict[str, str] = {}
+        for chunk in _chunks(list(dict.fromkeys(uids))):
+            placeholders = ",".join("?" for _ in chunk)
+            texts.update(self._conn.execute(f"SELECT uid, text FROM node_texts WHERE uid IN ({placeholders})", chunk))
+        return texts
+
+    def texts(self, uids: Iterable[str]) -> dict[str, str]:
+        wanted = list(dict.fromkeys(uids))
+        stored = self._stored_texts(uid for uid in wanted if uid not in self._changes)
+        texts: dict[str, str] = {}
+        for uid in wanted:
+            text = self._changes[uid] if uid in self._changes else stored.get(uid)
+            if text is not None:
+                texts[uid] = text
+        return texts
+
+    def search(self, phrases: list[str]) -> list[set[str] | None]:
+        """Per phrase, the uids whose text may contain it (None: the phrase has no word to look up)."""
+        return [self._search(phrase) for phrase in phrases]
+
+    def _search(self, phrase: str) -> set[str] | None:
+        candidates = search_candidates(phrase, self._stored_postings, self._trigram_holders)
+        if candidates is None:
+            return None
+        needle = phrase.lower()
+        if self._may_start_in_uid(needle):
+            candidates |= self._uid_matches(needle)
+        candidates.difference_update(self._changes)
+        candidates.update(uid for uid, text in self._changes.items() if text is not None and needle in text)
+        return candidates
+
+    def _may_start_in_uid(self, phrase: str) -> bool:
+        # A match starting inside a uid runs over uid characters up to the space after the uid.
+        if self._uid_chars is None:
+            self._uid_chars = {ch for (ch,) in self._conn.execute("SELECT ch FROM node_uid_chars")}
+        run = 0
+        while run < len(phrase) and phrase[run] in self._uid_chars:
+            run += 1
+        return run > 0 and (run == len(phrase) or " " in phrase[1 : run + 1])
+
+    def _uid_matches(self, phrase: str) -> set[str]:
+        rows = self._conn.execute(
+            "SELECT uid FROM node_texts WHERE instr(substr(text, 1, length(uid) + ?), ?) > 0",
+            (len(phrase) - 1, phrase),
+        )
+        return {uid for (uid,) in rows}
+
+    def _trigram_holders(self, gram: str) -> set[str]:
+        return {uid for (uid,) in self._conn.execute("SELECT uid FROM node_trigrams WHERE trigram = ?", (gram,))}
+
+    def _stored_postings(self, word: str) -> dict[str, int]:
+        # Scan the distinct terms for the word, then read only their postings.
+        rows = self._conn.execute("SELECT term FROM node_vocabulary WHERE instr(term, ?) > 0", (word,))
+        postings: dict[str, int] = {}
+        for chunk in _chunks([term for (term,) in rows]):
+            placeholders = ",".join("?" for _ in chunk)
+            for uid, count in self._conn.execute(
+                f"SELECT uid, SUM(frequency) FROM node_terms WHERE term IN ({placeholders}) GROUP BY uid", chunk
+            ):
+                postings[uid] = postings.get(uid, 0) + int(count)
+        return postings
+
+    def _postings(self, word: str) -> dict[str, int]:
+        postings = {uid: count for uid, count in self._stored_postings(word).items() if uid not in self._changes}
+        for uid, text in self._changes.items():
+            if text is None:
+                continue
+            count = sum(n for term, n in term_frequencies(text_body(uid, text)).items() if word in term)
+            if count:
+                postings[uid] = count
+        return postings
+
+    def statistics(self, phrases: list[str]) -> TextStatistics:
+        """BM25 collection statistics for the words of `phrases`."""
+        doc_count, total_length = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM node_texts"
+        ).fetchone()
+        lengths: dict[str, int] = {}
+        changed = list(self._changes)
+        for chunk in _chunks(changed):
+            placeholders = ",".join("?" for _ in chunk)
+            for uid, length in self._conn.execute(
+                f"SELECT uid, length FROM node_texts WHERE uid IN ({placeholders})", chunk
+            ):
+                doc_count -= 1
+                total_length -= length
+        for uid, text in self._changes.items():
+            if text is not None:
+                lengths[uid] = len(tokenize(text_body(uid, text)))
+                doc_count += 1
+                total_length += lengths[uid]
+
+        def doc_length(uid: str) -> int:
+            if uid in lengths:
+                return lengths[uid]
+            row = self._conn.execute("SELECT length FROM node_texts WHERE uid = ?", (uid,)).fetchone()
+            return int(row[0]) if row else 0
+
+        return phrase_statistics(phrases, self._postings, int(doc_count), int(total_length), doc_length)
+
+
+def trigram_candidates(phrase: str, lookup: TrigramLookup) -> set[str] | None:
+    """Uids posted under every trigram of `phrase`; None when it is shorter than a trigram."""
+    grams = trigrams(phrase.lower())
+    if not grams:
+        return None
+    result: set[str] | None = None
+    for gram in grams:
+        holders = lookup(gram)
+        result = set(holders) if result is None else result & holders
+        if not result:
+            break
+    return result or set()
+
+
+def search_candidates(phrase: str, lookup: PostingLookup, grams: TrigramLookup) -> set[str] | None:
+    """Candidates for `phrase` from its trigrams, or from its words when it is too short."""
+    candidates = trigram_candidates(phrase, grams)
+    return candidates if candidates is not None else phrase_candidates(phrase, lookup)
+
+
+def phrase_candidates(phrase: str, lookup: PostingLookup) -> set[str] | None:
+    """Uids with a term containing each word of `phrase`; None when it has no word to look up.
+
+    Only phrases shorter than a trigram get here, and those hold at most one word.
+    """
+    words = tokenize(phrase)
+    if not words:
+        return None
+    result: set[str] | None = None
+    for word in words:
+        holders = set(lookup(word))
+        result = holders if result is None else result & holders
+    return result
+
+
+def phrase_statistics(
+    phrases: list[str], lookup: PostingLookup, doc_count: int, total_length: int, doc_length: Callable[[str], int]
+) -> TextStatistics:
+    """Gather BM25 inputs for the words of `phrases` (matched by substring, as phrases are)."""
+    phrase_words = {phrase.lower(): tokenize(phrase) for phrase in phrases}
+    frequencies: dict[str, dict[str, int]] = {}
+    for words in phrase_words.values():
+        for word in words:
+            if word not in frequencies:
+                frequencies[word] = lookup(word)
+    uids = {uid for counts in frequencies.values() for uid in counts}
+    return TextStatistics(
+        doc_count=doc_count,
+        average_length=total_length / doc_count if doc_count else 0.0,
+        phrase_words=phrase_words,
+        frequencies=frequencies,
+        doc_lengths={uid: doc_length(uid) for uid in uids},
+    )
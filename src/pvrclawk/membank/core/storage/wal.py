@@ -0,0 +1,284 @@
+"""Append-only mutation log (`nodes/_wal.jsonl`) and its read-side overlay.
+
+Each record is one JSON line with a monotonically increasing `seq` and an `op`:
+
+- `node`:   {"payload": {...}}                       insert or replace a node payload
+- `patch`:  {"uid", "fields": {...}, "from_type"?}   update payload fields (status, retype)
+- `remove`: {"uid", "type", "tags", "cluster", "links"} delete a node and its incident links
+                                                       (`links` maps link uid -> its source,
+                                                       target, tags and usage_count)
+- `link`:   {"payload": {...}}                       add a link
+- `usage`:  {"links": {link uid: count}, "at", "tags"} link usage from focus results (bumps
+                                                       `usage_count`, sets `last_accessed`;
+                                                       `tags` maps link uid -> its tags)
+
+Readers replay records newer than `IndexData.wal_seq` on top of `index.json`, the cluster
+files and `links.json`; compaction folds them into those files and rewrites the log, starting
+it with a `fold` marker carrying the folded seq so the next seq is known from the log alone.
+
+Appends, rewrites and bank generation bumps hold an exclusive lock on `nodes/_wal.lock`. Records another process
+appended after this one read the log are kept: an append numbers its records after them and a
+rewrite carries them over, renumbered after the folded seq.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from pvrclawk.utils.json_io import DEFAULT_CODEC, JsonCodec, atomic_write_bytes
+from pvrclawk.membank.models.index import IndexData
+from pvrclawk.membank.core.storage.index import bump_link_usage, index_link, index_node, retype_node, unindex_node
+
+# Cluster name recorded in the index for nodes that only exist in the log so far.
+PENDING_CLUSTER = "_inbox"
+# Op of the first record of a rewritten log; its seq is the seq folded into the snapshot files.
+FOLD_OP = "fold"
+
+
+class MutationLog:
+    def __init__(self, path: Path, codec: JsonCodec = DEFAULT_CODEC):
+        self.path = Path(path)
+        self.codec = codec
+        self.lock_path = self.path.with_name(f"{self.path.stem}.lock")
+        # (inode, bytes of complete records) of the log as last read or written by this process.
+        self._seen: tuple[int, int] | None = None
+        self._count = 0
+        # Seq of the fold marker as last read or written; None for a log that was never rewritten.
+        self.folded_seq: int | None = None
+
+    def read(self) -> list[dict]:
+        records, self._seen = self._scan()
+        self.folded_seq = _folded_seq(records)
+        return [record for record in records if record.get("op") != FOLD_OP]
+
+    def stats(self) -> tuple[int, int]:
+        """(record count, byte size) of the log as last read or written by this process."""
+        if self._seen is None:
+            self.read()
+        return self._count, (self._seen[1] if self._seen else 0)
+
+    def append(self, records: list[dict], durable: bool = True) -> None:
+        """Append `records`; `durable=False` skips the fsync (for records that may be lost on a crash).
+
+        Records numbered at or below the log's last seq (because another process appended or
+        compacted since we read, or because the caller left numbering to the log) are renumbered
+        to follow it.
+        """
+        if not records:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.locked():
+            current, seen = self._scan()
+            _renumber(records, _last_seq(current) + 1)
+            self.folded_seq = _folded_seq(current)
+            with self.path.open("r+b" if self.path.exists() else "wb") as handle:
+                # Drop a torn trailing line left by an interrupted append.
+                handle.truncate(seen[1])
+                handle.seek(seen[1])
+                handle.write(self._encode(records))
+                handle.flush()
+                if durable:
+                    os.fsync(handle.fileno())
+            self._count = len(current) + len(records)
+            self._seen = (seen[0], seen[1] + len(self._encode(records)))
+
+    def rewrite(self, records: list[dict], folded_seq: int = 0) -> None:
+        """Replace the log with a fold marker for `folded_seq` followed by `records`.
+
+        Records appended by other processes since our last read are carried over after ours.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.locked():
+            current, seen = self._scan()
+            foreign = self._unseen(current, seen)
+            _renumber(foreign, max(folded_seq, _last_seq(records)) + 1)
+            kept = [{"seq": folded_seq, "op": FOLD_OP}, *records, *foreign]
+            blob = self._encode(kept)
+            atomic_write_bytes(self.path, blob)
+            self.folded_seq = folded_seq
+            self._count = len(kept)
+            self._seen = (self.path.stat().st_ino, len(blob))
+
+    def _unseen(self, current: list[dict], seen: tuple[int, int]) -> list[dict]:
+        """Records in `current` that this process has not read yet."""
+        if self._seen is None or seen == self._seen:
+            return []
+        if seen[0] != self._seen[0]:
+            # Replaced by another compaction: everything left in it is still unfolded.
+            return [record for record in current if record.get("op") != FOLD_OP]
+        known, _ = self._scan(limit=self._seen[1])
+        return current[len(known) :]
+
+    def _scan(self, limit: int | None = None) -> tuple[list[dict], tuple[int, int]]:
+        """Parse the log; return its records and (inode, bytes of complete records)."""
+        try:
+            with self.path.open("rb") as handle:
+                inode = os.fstat(handle.fileno()).st_ino
+                blob = handle.read() if limit is None else handle.read(limit)
+        except FileNotFoundError:
+            self._count = 0
+            return [], (0, 0)
+        records: list[dict] = []
+        consumed = 0
+        for line in blob.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                try:
+                    records.append(self.codec.loads(line))
+                except ValueError:
+                    # A torn trailing line from an interrupted append; later lines cannot exist.
+                    break
+            consumed += len(line)
+        self._count = len(records)
+        return records, (inode, consumed)
+
+    @contextmanager
+    def locked(self):
+        """Hold the exclusive lock on `nodes/_wal.lock` (also taken for bank generation bumps)."""
+        if fcntl is None:  # pragma: no cover - single-process fallback
+            yield
+            return
+        with self.lock_path.open("a") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _encode(self, records: list[dict]) -> bytes:
+        return b"".join(self.codec.dumps(record) + b"\n" for record in records)
+
+
+def _folded_seq(records: list[dict]) -> int | None:
+    if records and records[0].get("op") == FOLD_OP:
+        return int(records[0].get("seq", 0))
+    return None
+
+
+def _last_seq(records: list[dict]) -> int:
+    return max((int(record.get("seq", 0)) for record in records), default=0)
+
+
+def _renumber(records: list[dict], first: int) -> None:
+    """Shift `records` so the first one gets seq `first`, if they would not follow it already."""
+    if not records or int(records[0].get("seq", 0)) >= first:
+        return
+    shift = first - int(records[0]["seq"])
+    for record in records:
+        record["seq"] = int(record["seq"]) + shift
+
+
+@dataclass
+class WalOverlay:
+    """Net effect of unfolded log records, applied by readers on top of the compacted files."""
+
+    last_seq: int = 0
+    records: list[dict] = field(default_factory=list)
+    nodes: dict[str, dict] = field(default_factory=dict)
+    patches: dict[str, dict] = field(default_factory=dict)
+    removed: dict[str, str] = field(default_factory=dict)
+    removed_links: dict[str, str] = field(default_factory=dict)
+    links: list[dict] = field(default_factory=list)
+    usage: dict[str, int] = field(default_factory=dict)
+    usage_at: dict[str, str] = field(default_factory=dict)
+
+    def apply(self, record: dict) -> None:
+        self.records.append(record)
+        self.last_seq = max(self.last_seq, int(record.get("seq", 0)))
+        op = record.get("op")
+        if op == "node":
+            payload = dict(record["payload"])
+            uid = payload["uid"]
+            self.nodes[uid] = payload
+            self.patches.pop(uid, None)
+            self.removed.pop(uid, None)
+        elif op == "patch":
+            uid = record["uid"]
+            if uid in self.nodes:
+                self.nodes[uid].update(record["fields"])
+            else:
+                self.patches.setdefault(uid, {}).update(record["fields"])
+        elif op == "remove":
+            uid = record["uid"]
+            self.nodes.pop(uid, None)
+            self.patches.pop(uid, None)
+            self.removed[uid] = str(record.get("cluster") or PENDING_CLUSTER)
+            for link_uid, link in record.get("links", {}).items():
+                self.removed_links[link_uid] = link if isinstance(link, str) else link["source"]
+            self.links = [item for item in self.links if item.get("source") != uid and item.get("target") != uid]
+        elif op == "link":
+            self.links.append(dict(record["payload"]))
+        elif op == "usage":
+            for link_uid, count in record.get("links", {}).items():
+                self.usage[link_uid] = self.usage.get(link_uid, 0) + int(count)
+                self.usage_at[link_uid] = str(record["at"])
+
+    def is_removed(self, uid: str) -> bool:
+        return uid in self.removed
+
+    def merge(self, uid: str, payload: dict | None) -> dict | None:
+        """Return the effective payload for `uid` given its compacted payload (or None)."""
+        if uid in self.nodes:
+            return self.nodes[uid]
+        if payload is None or self.is_removed(uid):
+            return None
+        patch = self.patches.get(uid)
+        if patch:
+            payload = {**payload, **patch}
+        return payload
+
+    def with_usage(self, payload: dict) -> dict:
+        """Return a link payload with pending usage increments applied."""
+        link_uid = payload.get("uid")
+        if link_uid not in self.usage:
+            return payload
+        return {
+            **payload,
+            "usage_count": int(payload.get("usage_count", 1)) + self.usage[link_uid],
+            "last_accessed": self.usage_at[link_uid],
+        }
+
+    def link_visible(self, payload: dict) -> bool:
+        return not self.is_removed(str(payload.get("source", ""))) and not self.is_removed(
+            str(payload.get("target", ""))
+        )
+
+
+def replay_into_index(index: IndexData, record: dict) -> None:
+    op = record.get("op")
+    if op == "node":
+        payload = record["payload"]
+        uid = payload["uid"]
+        # A re-saved node keeps its cluster so compaction replaces it in place.
+        cluster = index.uid_file.get(uid, PENDING_CLUSTER)
+        index_node(index, uid, cluster, str(payload.get("__type__", "memory")), payload.get("tags", {}))
+    elif op == "patch":
+        new_type = record["fields"].get("__type__")
+        if new_type and record.get("from_type"):
+            retype_node(index, record["uid"], record["from_type"], new_type)
+    elif op == "remove":
+        unindex_node(
+            index, record["uid"], record.get("type", "memory"), record.get("tags", []), record.get("links", {})
+        )
+    elif op == "link":
+        payload = record["payload"]
+        index_link(
+            index,
+            payload["uid"],
+            payload["source"],
+            payload["target"],
+            payload.get("tags", ()),
+            payload.get("usage_count", 1),
+        )
+    elif op == "usage":
+        # Records written before `tags` was logged only reach the total until the next compaction.
+        tags = record.get("tags", {})
+        for link_uid, count in record.get("links", {}).items():
+            bump_link_usage(index, tags.get(link_uid, ()), count)
@@ -0,0 +1,44 @@
+"""Digest-tracking JSON file writer for StorageEngine."""
+
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any
+
+from pvrclawk.utils.json_io import JsonCodec, atomic_write_bytes
+
+
+def _digest(blob: bytes) -> bytes:
+    return blake2b(blob, digest_size=16).digest()
+
+
+class StorageWriter:
+    """Remember the digest of every file read or written and only rewrite files whose bytes change.
+
+    Changed files are committed with a temp file, fsync and `os.replace`.
+    """
+
+    def __init__(self, codec: JsonCodec):
+        self.codec = codec
+        self._digests: dict[Path, bytes] = {}
+
+    def read_json(self, path: Path, default: Any) -> Any:
+        if not path.exists():
+            self._digests.pop(path, None)
+            return default
+        blob = path.read_bytes()
+        self._digests[path] = _digest(blob)
+        return self.codec.loads(blob)
+
+    def write_json(self, path: Path, data: Any) -> bool:
+        """Write data to path; return False when the encoded bytes match what is already there."""
+        blob = self.codec.dumps(data)
+        digest = _digest(blob)
+        if self._digests.get(path) == digest and path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, blob)
+        self._digests[path] = digest
+        return True
+
+    def forget(self, path: Path) -> None:
+        self._digests.pop(path, None)
@@ -17,6 +17,7 @@ from pvrclawk.membank.models.nodes import (
     Task,
 )
 from pvrclawk.membank.models.session import Session
+from pvrclawk.membank.models.text_index import TextStatistics
 from pvrclawk.membank.models.types import NodeType, Status
 
 __all__ = [
@@ -40,4 +41,5 @@ __all__ = [
     "Story",
     "SubTask",
     "Task",
+    "TextStatistics",
 ]
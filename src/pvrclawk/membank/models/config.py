@@ -2,6 +2,7 @@
 
 from pvrclawk.utils.config import (  # noqa: F401
     AppConfig,
+    CacheConfig,
     DecayConfig,
     FederationConfig,
     FederationDiscoveryConfig,
@@ -9,6 +10,7 @@ from pvrclawk.utils.config import (  # noqa: F401
     MoodConfig,
     PruneConfig,
     RetrievalConfig,
+    StorageConfig,
     load_config,
     set_config_value,
     write_config,
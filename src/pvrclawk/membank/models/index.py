@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
 
 
 class ClusterMeta(BaseModel):
@@ -7,8 +7,22 @@ class ClusterMeta(BaseModel):
 
 
 class IndexData(BaseModel):
-    tags: dict[str, list[str]] = Field(default_factory=dict)
-    types: dict[str, list[str]] = Field(default_factory=dict)
+    # Posting maps are sets in memory and sorted lists on disk.
+    tags: dict[str, set[str]] = Field(default_factory=dict)
+    types: dict[str, set[str]] = Field(default_factory=dict)
     uid_file: dict[str, str] = Field(default_factory=dict)
-    links_in: dict[str, list[str]] = Field(default_factory=dict)
+    links_in: dict[str, set[str]] = Field(default_factory=dict)
+    # source uid -> uids of its outgoing links; the links themselves live in links.json.
+    links_out: dict[str, set[str]] = Field(default_factory=dict)
+    # Link usage aggregates, kept as running totals so scoring normalizes frequency without
+    # reading every link.
+    total_usage: int = 0
+    tag_usage: dict[str, int] = Field(default_factory=dict)
+    tag_link_counts: dict[str, int] = Field(default_factory=dict)
     clusters: dict[str, ClusterMeta] = Field(default_factory=dict)
+    # Sequence number of the last mutation-log record folded into this index and the cluster files.
+    wal_seq: int = 0
+
+    @field_serializer("tags", "types", "links_in", "links_out")
+    def _serialize_postings(self, postings: dict[str, set[str]]) -> dict[str, list[str]]:
+        return {key: sorted(values) for key, values in postings.items()}
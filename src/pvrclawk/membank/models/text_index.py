@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class TextStatistics(BaseModel):
+    """Collection statistics for the words of a forctx query, as BM25 needs them."""
+
+    doc_count: int = 0
+    average_length: float = 0.0
+    # lowercased phrase -> its words.
+    phrase_words: dict[str, list[str]] = Field(default_factory=dict)
+    # word -> uid -> number of tokens in the node that contain the word; its size is the word's
+    # document frequency.
+    frequencies: dict[str, dict[str, int]] = Field(default_factory=dict)
+    # Token counts of the nodes listed in `frequencies`.
+    doc_lengths: dict[str, int] = Field(default_factory=dict)
@@ -0,0 +1,62 @@
+"""Lazy, read-only node views over stored payloads."""
+
+from datetime import datetime
+
+from pvrclawk.membank.models.base import BaseNode
+
+
+def _parse_timestamp(value) -> datetime | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+class NodeView:
+    """Node backed by its stored payload dict.
+
+    `uid`, `tags`, `created_at` and `updated_at` are read from the payload directly. Any other
+    attribute validates the payload into `node_class` once and delegates to that model.
+    """
+
+    __slots__ = ("payload", "node_class", "_node")
+
+    def __init__(self, payload: dict, node_class: type[BaseNode]):
+        self.payload = payload
+        self.node_class = node_class
+        self._node: BaseNode | None = None
+
+    @property
+    def uid(self) -> str:
+        return self.payload["uid"]
+
+    @property
+    def tags(self) -> dict[str, float]:
+        return self.payload.get("tags", {})
+
+    @property
+    def created_at(self) -> datetime:
+        return _parse_timestamp(self.payload.get("created_at")) or self.materialize().created_at
+
+    @property
+    def updated_at(self) -> datetime:
+        return _parse_timestamp(self.payload.get("updated_at")) or self.materialize().updated_at
+
+    def materialize(self) -> BaseNode:
+        if self._node is None:
+            payload = {key: value for key, value in self.payload.items() if key != "__type__"}
+            self._node = self.node_class.model_validate(payload)
+        return self._node
+
+    def __getattr__(self, name: str):
+        return getattr(self.materialize(), name)
+
+    def __repr__(self) -> str:
+        return f"NodeView({self.node_class.__name__}, uid={self.uid!r})"
+
+
+def materialize(node):
+    """Return the pydantic model behind `node`, which may be a NodeView or already a model."""
+    return node.materialize() if isinstance(node, NodeView) else node
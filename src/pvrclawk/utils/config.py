@@ -2,6 +2,7 @@
 
 from pathlib import Path
 import tomllib
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -9,6 +10,7 @@ from pydantic import BaseModel, Field
 class PruneConfig(BaseModel):
     auto_threshold: int = 20
     max_cluster_size: int = 100
+    min_cluster: int = 3
 
 
 class DecayConfig(BaseModel):
@@ -49,9 +51,41 @@ class FederationConfig(BaseModel):
 
 
 class RetrievalConfig(BaseModel):
-    """Resistance factor: nodes with score below this threshold are excluded from focus results."""
+    """Resistance factor: nodes with score below this threshold are excluded from focus results.
+
+    `engine` selects the focus scorer: "python" or "numpy" (vectorized; needs numpy installed).
+    `mode` picks neighbor expansion: "one_hop" (half the score to direct neighbors) or "ppr"
+    (personalized PageRank from the scored seeds, at most `ppr_depth` hops).
+    """
 
     resistance_threshold: float = 0.37
+    engine: Literal["python", "numpy"] = "python"
+    mode: Literal["one_hop", "ppr"] = "one_hop"
+    ppr_depth: int = 3
+    ppr_damping: float = 0.5
+    ppr_tolerance: float = 1e-4
+
+
+class StorageConfig(BaseModel):
+    """Node/link storage backend: "json" (cluster files) or "sqlite" (membank.db).
+
+    `codec` picks the JSON library for storage files: "auto" prefers orjson, then msgspec,
+    then the standard library. The mutation log is compacted once it holds more than
+    `wal_max_records` records or `wal_max_bytes` bytes.
+    """
+
+    backend: Literal["json", "sqlite"] = "json"
+    codec: Literal["auto", "orjson", "msgspec", "stdlib"] = "auto"
+    wal_max_records: int = 1000
+    wal_max_bytes: int = 1_048_576
+
+
+class CacheConfig(BaseModel):
+    """On-disk cache of `focus`/`forctx` rankings under `.pvrclawk/cache/`, evicted LRU-first."""
+
+    enabled: bool = True
+    max_entries: int = 256
+    max_bytes: int = 1_048_576
 
 
 class AppConfig(BaseModel):
@@ -60,6 +94,8 @@ class AppConfig(BaseModel):
     mood: MoodConfig = MoodConfig()
     federation: FederationConfig = FederationConfig()
     retrieval: RetrievalConfig = RetrievalConfig()
+    storage: StorageConfig = StorageConfig()
+    cache: CacheConfig = CacheConfig()
     auto_archive_active: bool = True
 
 
@@ -82,14 +118,29 @@ def write_config(path: Path, config: AppConfig) -> None:
         f"auto_archive_active = {str(dumped['auto_archive_active']).lower()}\n\n"
         "[prune]\n"
         f"auto_threshold = {dumped['prune']['auto_threshold']}\n"
-        f"max_cluster_size = {dumped['prune']['max_cluster_size']}\n\n"
+        f"max_cluster_size = {dumped['prune']['max_cluster_size']}\n"
+        f"min_cluster = {dumped['prune']['min_cluster']}\n\n"
         "[decay]\n"
         f"half_life_days = {dumped['decay']['half_life_days']}\n\n"
         "[mood]\n"
         f"default = {dumped['mood']['default']}\n"
         f"smoothing = {dumped['mood']['smoothing']}\n\n"
         "[retrieval]\n"
-        f"resistance_threshold = {dumped['retrieval']['resistance_threshold']}\n\n"
+        f"resistance_threshold = {dumped['retrieval']['resistance_threshold']}\n"
+        f'engine = "{dumped["retrieval"]["engine"]}"\n'
+        f'mode = "{dumped["retrieval"]["mode"]}"\n'
+        f"ppr_depth = {dumped['retrieval']['ppr_depth']}\n"
+        f"ppr_damping = {dumped['retrieval']['ppr_damping']}\n"
+        f"ppr_tolerance = {dumped['retrieval']['ppr_tolerance']}\n\n"
+        "[storage]\n"
+        f'backend = "{dumped["storage"]["backend"]}"\n'
+        f'codec = "{dumped["storage"]["codec"]}"\n'
+        f"wal_max_records = {dumped['storage']['wal_max_records']}\n"
+        f"wal_max_bytes = {dumped['storage']['wal_max_bytes']}\n\n"
+        "[cache]\n"
+        f"enabled = {str(dumped['cache']['enabled']).lower()}\n"
+        f"max_entries = {dumped['cache']['max_entries']}\n"
+        f"max_bytes = {dumped['cache']['max_bytes']}\n\n"
         "[federation]\n"
         f"enabled_default = {str(dumped['federation']['enabled_default']).lower()}\n"
         f"dsl_rules = [{dsl_rules}]\n\n"
@@ -1,17 +1,87 @@
-"""Universal JSON read/write utilities."""
+"""Universal JSON read/write utilities.
+
+Storage files are written compactly. orjson or msgspec are used when installed (`codec="auto"`),
+with the standard library as the fallback; every codec reads any other codec's output.
+"""
 
 import json
+import os
 from pathlib import Path
+import tempfile
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+CODECS = ("auto", "orjson", "msgspec", "stdlib")
+
+
+class JsonCodec:
+    """Encode/decode JSON documents as UTF-8 bytes with one backend."""
+
+    def __init__(self, name: str = "auto"):
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec: {name} (expected one of {', '.join(CODECS)})")
+        if name == "auto":
+            name = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "stdlib"
+        if name == "orjson" and orjson is None:
+            name = "stdlib"
+        if name == "msgspec" and msgspec is None:
+            name = "stdlib"
+        self.name = name
+
+    def dumps(self, data: Any, pretty: bool = False) -> bytes:
+        if self.name == "orjson":
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+        if self.name == "msgspec":
+            blob = msgspec.json.encode(data)
+            return msgspec.json.format(blob, indent=2) if pretty else blob
+        if pretty:
+            return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
-def read_json(path: Path, default: Any) -> Any:
+    def loads(self, blob: bytes) -> Any:
+        if self.name == "orjson":
+            return orjson.loads(blob)
+        if self.name == "msgspec":
+            try:
+                return msgspec.json.decode(blob)
+            except msgspec.DecodeError as exc:
+                raise ValueError(str(exc)) from exc
+        return json.loads(blob)
+
+
+DEFAULT_CODEC = JsonCodec()
+
+
+def read_json(path: Path, default: Any, codec: JsonCodec | None = None) -> Any:
     """Read JSON from path, returning default if file doesn't exist."""
     if not path.exists():
         return default
-    return json.loads(path.read_text(encoding="utf-8"))
+    return (codec or DEFAULT_CODEC).loads(path.read_bytes())
+
+
+def write_json(path: Path, data: Any, codec: JsonCodec | None = None, pretty: bool = False) -> None:
+    """Write data as JSON to path; compact unless `pretty`."""
+    atomic_write_bytes(path, (codec or DEFAULT_CODEC).dumps(data, pretty=pretty))
 
 
-def write_json(path: Path, data: Any) -> None:
-    """Write data as indented JSON to path."""
-    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+def atomic_write_bytes(path: Path, blob: bytes) -> None:
+    """Replace path with blob via a fsynced temp file, so readers never see a torn file."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(blob)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,30 @@
+import json
+
+from pvrclawk.app import main
+
+
+def test_export_dumps_nodes_and_links(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    runner.invoke(main, ["membank", "--path", str(db_path), "init"])
+    uids = []
+    for content in ["tcp notes", "dns notes"]:
+        added = runner.invoke(
+            main,
+            ["membank", "--path", str(db_path), "node", "add", "memory", "--content", content, "--tags", "net:1.0"],
+        )
+        uids.append(added.output.strip().splitlines()[-1])
+    runner.invoke(main, ["membank", "--path", str(db_path), "link", "add", uids[0], uids[1], "--tags", "net"])
+
+    compact = runner.invoke(main, ["membank", "--path", str(db_path), "export"])
+    assert compact.exit_code == 0
+    document = json.loads(compact.output)
+    assert sorted(node["uid"] for node in document["nodes"]) == sorted(uids)
+    assert document["links"][0]["source"] == uids[0]
+    assert "\n  " not in compact.output
+
+    out_file = tmp_path / "export.json"
+    pretty = runner.invoke(main, ["membank", "--path", str(db_path), "export", "--pretty", "--output", str(out_file)])
+    assert pretty.exit_code == 0
+    text = out_file.read_text(encoding="utf-8")
+    assert "\n  " in text
+    assert json.loads(text) == document
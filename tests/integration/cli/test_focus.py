@@ -1,4 +1,5 @@
 from pvrclawk.app import main
+from pvrclawk.membank.core.storage.factory import open_storage
 
 
 def test_focus_returns_ranked_nodes(runner, tmp_path):
@@ -36,6 +37,10 @@ def test_focus_returns_ranked_nodes(runner, tmp_path):
     assert focus.exit_code == 0
     assert "tcp method" in focus.output
 
+    storage = open_storage(db_path)
+    (link,) = storage.all_links()
+    assert link.usage_count == 2
+
 
 def test_focus_federated_reads_other_banks(runner, tmp_path):
     repo = tmp_path / "repo"
@@ -66,3 +71,103 @@ def test_focus_federated_reads_other_banks(runner, tmp_path):
     assert focus.exit_code == 0
     assert "host federation" in focus.output
     assert "remote federation" in focus.output
+
+
+def test_focus_reuses_cached_ranking_until_the_bank_changes(runner, tmp_path, monkeypatch):
+    from pvrclawk.membank.commands import focus as focus_module
+
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    runner.invoke(main, [*base, "node", "add", "memory", "--content", "tcp setup", "--tags", "tcp:1.0"])
+    calls: list[list[str]] = []
+    gather = focus_module.gather_focus_candidates
+
+    def counting(storage, tags):
+        calls.append(tags)
+        return gather(storage, tags)
+
+    monkeypatch.setattr(focus_module, "gather_focus_candidates", counting)
+    first = runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    second = runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    assert first.output == second.output
+    assert len(calls) == 1
+
+    runner.invoke(main, [*base, "node", "add", "memory", "--content", "tcp tuning", "--tags", "tcp:1.0"])
+    third = runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    assert len(calls) == 2
+    assert "tcp tuning" in third.output
+
+
+def test_focus_cache_expires_with_the_decay_time_bucket(runner, tmp_path, monkeypatch):
+    from pvrclawk.membank.commands import focus as focus_module
+
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    runner.invoke(main, [*base, "node", "add", "memory", "--content", "tcp setup", "--tags", "tcp:1.0"])
+    calls: list[list[str]] = []
+    gather = focus_module.gather_focus_candidates
+
+    def counting(storage, tags):
+        calls.append(tags)
+        return gather(storage, tags)
+
+    clock = [1_000 * focus_module.DECAY_BUCKET_SECONDS]
+    monkeypatch.setattr(focus_module, "gather_focus_candidates", counting)
+    monkeypatch.setattr(focus_module.time, "time", lambda: clock[0])
+    runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    clock[0] += focus_module.DECAY_BUCKET_SECONDS - 1
+    runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    assert len(calls) == 1
+    clock[0] += 1
+    runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    assert len(calls) == 2
+
+    runner.invoke(main, [*base, "config", "set", "decay.half_life_days", "0"])
+    runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    clock[0] += 10 * focus_module.DECAY_BUCKET_SECONDS
+    runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    assert len(calls) == 3
+
+
+def test_focus_cache_hit_reads_the_index_at_most_once(runner, tmp_path, monkeypatch):
+    from pvrclawk.membank.core.storage.engine import StorageEngine
+
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    uids = [
+        runner.invoke(main, [*base, "node", "add", "memory", "--content", content, "--tags", "tcp:1.0"]).output.split()[-1]
+        for content in ("tcp setup", "tcp tuning", "tcp retries")
+    ]
+    runner.invoke(main, [*base, "link", "add", uids[0], uids[1], "--tags", "tcp"])
+    first = runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    index_reads: list[None] = []
+    wal_state = StorageEngine._wal_state
+
+    def counting(self):
+        index_reads.append(None)
+        return wal_state(self)
+
+    monkeypatch.setattr(StorageEngine, "_wal_state", counting)
+    second = runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+
+    assert second.output == first.output
+    assert len(index_reads) <= 1
+    assert open_storage(db_path).all_links()[0].usage_count == 3
+
+
+def test_focus_reports_missing_numpy_when_the_numpy_engine_is_selected(runner, tmp_path, monkeypatch):
+    import sys
+
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    runner.invoke(main, [*base, "node", "add", "memory", "--content", "tcp setup", "--tags", "tcp:1.0"])
+    runner.invoke(main, [*base, "config", "set", "retrieval.engine", "numpy"])
+    monkeypatch.setitem(sys.modules, "pvrclawk.membank.core.graph.vectorized", None)
+
+    result = runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    assert result.exit_code != 0
+    assert "pvrclawk[numpy]" in result.output
@@ -46,3 +46,87 @@ def test_forctx_session_truncation(runner, tmp_path):
     assert second.exit_code == 0
     assert "session task" not in second.output
     assert "(Task)" in second.output
+
+
+def test_forctx_cache_is_invalidated_by_writes(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    runner.invoke(main, [*base, "node", "add", "task", "--content", "auth flow", "--tags", "task"])
+
+    first = runner.invoke(main, [*base, "forctx", "#task [auth]"])
+    assert len(list((db_path / "cache").glob("*.json"))) == 1
+    second = runner.invoke(main, [*base, "forctx", "[AUTH] #task"])
+    assert second.output == first.output
+    assert len(list((db_path / "cache").glob("*.json"))) == 1
+
+    runner.invoke(main, [*base, "node", "add", "task", "--content", "auth tokens", "--tags", "task"])
+    third = runner.invoke(main, [*base, "forctx", "#task [auth]"])
+    assert "auth tokens" in third.output
+
+
+def test_forctx_bm25_rank_favors_rare_phrase_words(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    notes_content = "deploy notes deploy notes deploy notes"
+    runner.invoke(main, [*base, "node", "add", "memory", "--content", notes_content, "--tags", "x"])
+    runner.invoke(main, [*base, "node", "add", "memory", "--content", "rollback on deploy", "--tags", "x"])
+    for i in range(4):
+        runner.invoke(main, [*base, "node", "add", "memory", "--content", f"deploy step {i}", "--tags", "x"])
+
+    flat = runner.invoke(main, [*base, "forctx", "[deploy] [rollback]", "--top", "1"])
+    bm25 = runner.invoke(main, [*base, "forctx", "[deploy] [rollback]", "--top", "1", "--rank", "bm25"])
+    assert bm25.exit_code == 0, bm25.output
+    assert "rollback on deploy" in bm25.output
+    assert "rollback on deploy" in flat.output
+
+    notes = runner.invoke(main, [*base, "forctx", "[deploy] [notes]", "--top", "2", "--rank", "bm25"])
+    assert notes.output.split("\n")[1].strip().startswith("deploy notes")
+    assert len(list((db_path / "cache").glob("*.json"))) == 3
+
+
+def test_forctx_hydrates_only_the_top_k_in_one_load(runner, tmp_path, monkeypatch):
+    from pvrclawk.membank.core.storage.engine import StorageEngine
+
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    for i in range(5):
+        runner.invoke(main, [*base, "node", "add", "memory", "--content", f"deploy step {i}", "--tags", "x"])
+    calls: list[list[str]] = []
+    load_nodes = StorageEngine.load_nodes
+
+    def counting(self, uids, lazy=False):
+        calls.append(list(uids))
+        return load_nodes(self, uids, lazy=lazy)
+
+    monkeypatch.setattr(StorageEngine, "load_nodes", counting)
+    result = runner.invoke(main, [*base, "forctx", "[deploy]", "--top", "2"])
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count("deploy step") == 2
+    assert [len(uids) for uids in calls] == [2]
+
+
+def test_forctx_cache_hit_reads_the_index_at_most_once(runner, tmp_path, monkeypatch):
+    from pvrclawk.membank.core.storage.engine import StorageEngine
+
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    for i in range(3):
+        runner.invoke(main, [*base, "node", "add", "memory", "--content", f"deploy step {i}", "--tags", "x"])
+    first = runner.invoke(main, [*base, "forctx", "#x [deploy]"])
+    index_reads: list[None] = []
+    wal_state = StorageEngine._wal_state
+
+    def counting(self):
+        index_reads.append(None)
+        return wal_state(self)
+
+    monkeypatch.setattr(StorageEngine, "_wal_state", counting)
+    second = runner.invoke(main, [*base, "forctx", "#x [deploy]"])
+
+    assert second.output == first.output
+    assert len(index_reads) <= 1
@@ -0,0 +1,28 @@
+from pvrclawk.app import main
+
+
+def test_migrate_to_sqlite_keeps_cli_behavior(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    runner.invoke(main, ["membank", "--path", str(db_path), "init"])
+    added = runner.invoke(
+        main,
+        ["membank", "--path", str(db_path), "node", "add", "memory", "--content", "tcp notes", "--tags", "tcp:1.0"],
+    )
+    uid = added.output.strip().splitlines()[-1]
+
+    result = runner.invoke(main, ["membank", "--path", str(db_path), "migrate", "--to", "sqlite"])
+    assert result.exit_code == 0
+    assert "Migrated 1 node(s) and 0 link(s) to sqlite" in result.output
+    assert (db_path / "membank.db").exists()
+
+    focus = runner.invoke(main, ["membank", "--path", str(db_path), "focus", "--tags", "tcp"])
+    assert focus.exit_code == 0
+    assert "tcp notes" in focus.output
+
+    status = runner.invoke(main, ["membank", "--path", str(db_path), "node", "get", uid[:8]])
+    assert status.exit_code == 0
+    assert uid in status.output
+
+    again = runner.invoke(main, ["membank", "--path", str(db_path), "migrate", "--to", "sqlite"])
+    assert again.exit_code != 0
+    assert "already uses the sqlite backend" in again.output
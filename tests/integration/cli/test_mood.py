@@ -7,3 +7,36 @@ def test_report_mood_updates_value(runner, tmp_path):
     result = runner.invoke(main, ["membank", "--path", str(db_path), "report", "mood", "tcp", "0.2"])
     assert result.exit_code == 0
     assert "tcp" in result.output
+
+
+def test_report_mood_reads_batch_from_stdin(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    runner.invoke(main, ["membank", "--path", str(db_path), "init"])
+    result = runner.invoke(
+        main,
+        ["membank", "--path", str(db_path), "report", "mood", "--stdin"],
+        input="tcp 1.0\n# comment\n\ndns=0.0\ntcp,1.0\n",
+    )
+    assert result.exit_code == 0
+    values = dict(line.split("=") for line in result.output.strip().splitlines())
+    assert list(values) == ["tcp", "dns"]
+    assert float(values["tcp"]) > 0.59
+    assert float(values["dns"]) < 0.5
+
+
+def test_report_mood_stdin_rejects_bad_lines(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    runner.invoke(main, ["membank", "--path", str(db_path), "init"])
+    result = runner.invoke(
+        main, ["membank", "--path", str(db_path), "report", "mood", "--stdin"], input="tcp 1.0\ndns high\n"
+    )
+    assert result.exit_code != 0
+    assert "line 2" in result.output
+    assert not (db_path / "mood.json").read_text(encoding="utf-8").strip("{}\n ")
+
+
+def test_report_mood_requires_tag_and_value_without_stdin(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    runner.invoke(main, ["membank", "--path", str(db_path), "init"])
+    result = runner.invoke(main, ["membank", "--path", str(db_path), "report", "mood", "tcp"])
+    assert result.exit_code != 0
@@ -1,3 +1,5 @@
+import json
+
 from pvrclawk.app import main
 
 
@@ -13,3 +15,48 @@ def test_rule_add_and_list(runner, tmp_path):
     listed = runner.invoke(main, ["membank", "--path", str(db_path), "rule", "list"])
     assert listed.exit_code == 0
     assert 'tag("tcp")' in listed.output
+
+
+def test_rule_add_rejects_malformed_rule(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    runner.invoke(main, ["membank", "--path", str(db_path), "init"])
+    add = runner.invoke(main, ["membank", "--path", str(db_path), "rule", "add", 'if tag("tcp") then explode'])
+    assert add.exit_code != 0
+    assert "Invalid DSL rule" in add.output
+
+
+def test_rules_adjust_focus_ranking(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    runner.invoke(main, [*base, "config", "set", "retrieval.resistance_threshold", "0"])
+    uids = {}
+    for content in ("hub", "alpha note", "beta note"):
+        added = runner.invoke(main, [*base, "node", "add", "memory", "--content", content, "--tags", "misc"])
+        uids[content] = added.output.strip().splitlines()[-1]
+    runner.invoke(main, [*base, "link", "add", uids["hub"], uids["alpha note"], "--tags", "tcp"])
+    runner.invoke(main, [*base, "link", "add", uids["hub"], uids["beta note"], "--tags", "tcp,beta"])
+
+    runner.invoke(main, [*base, "rule", "add", 'if tag("tcp") then weight("beta") *= 3'])
+    focus = runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+
+    assert focus.exit_code == 0
+    assert focus.output.index("beta note") < focus.output.index("alpha note")
+
+
+def test_legacy_rules_that_no_longer_compile_are_reported(runner, tmp_path):
+    db_path = tmp_path / ".pvrclawk"
+    base = ["membank", "--path", str(db_path)]
+    runner.invoke(main, [*base, "init"])
+    runner.invoke(main, [*base, "node", "add", "memory", "--content", "tcp setup", "--tags", "tcp:1.0"])
+    legacy = 'if tag("tcp") then weight += 0.1'
+    (db_path / "rules.json").write_text(json.dumps({"rules": [legacy]}), encoding="utf-8")
+
+    focus = runner.invoke(main, [*base, "focus", "--tags", "tcp"])
+    assert focus.exit_code == 0
+    assert "tcp setup" in focus.stdout
+    assert f"warning: skipping rule {legacy!r}" in focus.stderr
+
+    listed = runner.invoke(main, [*base, "rule", "list"])
+    assert listed.stdout.strip() == legacy
+    assert "warning: skipping rule" in listed.stderr
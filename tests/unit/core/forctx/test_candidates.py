@@ -0,0 +1,57 @@
+"""Unit tests for forctx candidate generation."""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from pvrclawk.membank.core.forctx.candidates import gather_forctx_documents
+from pvrclawk.membank.core.forctx.scorer import score_nodes_forctx
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.sqlite import SqliteStorageEngine
+from pvrclawk.membank.models.nodes import Memory, Task
+
+
+def _fill(storage: StorageEngine) -> None:
+    rng = random.Random(3)
+    words = ["auth", "flow", "token", "cache", "retry", "timeout"]
+    for i in range(40):
+        content = " ".join(rng.choice(words) for _ in range(4))
+        tags = {rng.choice(["net", "db", "ui"]): 1.0}
+        node = Task(content=content, tags=tags) if i % 3 else Memory(content=content, tags=tags)
+        storage.save_node(node, "task" if i % 3 else "memory")
+        if i == 20:
+            storage.prune()
+
+
+def test_candidates_rank_like_a_full_scan(tmp_path: Path):
+    for storage in (StorageEngine(tmp_path / "json"), SqliteStorageEngine(tmp_path / "sqlite")):
+        storage.init_db()
+        _fill(storage)
+        queries = [
+            (["net"], ["auth"]),
+            ([], ["token cache", "ret"]),
+            (["net"], ["n ca", "y-"]),
+            (["ui", "db"], []),
+            ([], ["--"]),
+        ]
+        for tags, phrases in queries:
+            full = score_nodes_forctx(storage.all_nodes(lazy=True), tags, phrases, top=10)
+            documents = gather_forctx_documents(storage, tags, phrases)
+            assert score_nodes_forctx(documents, tags, phrases, top=10) == full
+
+
+def test_documents_are_built_without_hydrating_nodes(tmp_path: Path, monkeypatch):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    uid = storage.save_node(Task(content="Auth Flow", tags={"net": 1.0, "db": 1.0}), "task")
+    storage.save_node(Memory(content="other", tags={"ui": 1.0}), "memory")
+    storage.prune()
+
+    reopened = StorageEngine(storage.root)
+    monkeypatch.setattr(reopened, "_node_from_payload", lambda payload: pytest.fail("hydrated a node"))
+    monkeypatch.setattr(reopened, "_load_payloads", lambda uids: pytest.fail("read cluster files"))
+    documents = gather_forctx_documents(reopened, ["net"], ["auth"])
+
+    assert [(document.uid, document.tags) for document in documents] == [(uid, frozenset({"net"}))]
+    assert documents[0].text.startswith(f"{uid} auth flow")
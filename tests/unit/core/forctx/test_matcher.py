@@ -0,0 +1,44 @@
+"""Unit tests for the forctx phrase matcher."""
+
+import random
+
+from pvrclawk.membank.core.forctx.matcher import AhoCorasick, PhraseMatcher
+from pvrclawk.membank.core.forctx.scorer import score_nodes_forctx
+from pvrclawk.membank.core.forctx import scorer as scorer_module
+from pvrclawk.membank.models.nodes import Task
+
+
+def test_automaton_finds_overlapping_and_nested_patterns():
+    patterns = ["he", "she", "his", "hers", "e", "xyz", "hers"]
+    automaton = AhoCorasick(patterns)
+
+    assert automaton.matched("ushers") == {0, 1, 3, 4, 6}
+    assert automaton.matched("") == set()
+    assert AhoCorasick(["", "a"]).matched("b") == {0}
+
+
+def test_automaton_agrees_with_substring_checks():
+    rng = random.Random(5)
+    patterns = ["".join(rng.choice("abc ") for _ in range(rng.randint(1, 5))) for _ in range(40)]
+    automaton = AhoCorasick(patterns)
+    for _ in range(200):
+        text = "".join(rng.choice("abcd ") for _ in range(rng.randint(0, 30)))
+        assert automaton.matched(text) == {i for i, pattern in enumerate(patterns) if pattern in text}
+
+
+def test_phrase_matcher_switches_to_the_automaton_at_the_threshold():
+    assert PhraseMatcher(["a", "b"], min_automaton_phrases=3).automaton is None
+    matcher = PhraseMatcher(["a", "b", "zz"], min_automaton_phrases=3)
+    assert matcher.automaton is not None
+    assert matcher.matched("bab") == {0, 1}
+
+
+def test_scoring_is_unchanged_when_the_automaton_is_used(monkeypatch):
+    rng = random.Random(9)
+    words = ["auth", "flow", "cache", "retry", "token"]
+    nodes = [Task(content=" ".join(rng.choice(words) for _ in range(5)), uid=f"n{i}") for i in range(30)]
+    phrases = words + ["h fl", "y t", "missing"]
+
+    expected = score_nodes_forctx(nodes, [], phrases, top=30)
+    monkeypatch.setattr(scorer_module, "PhraseMatcher", lambda phrases: PhraseMatcher(phrases, 1))
+    assert score_nodes_forctx(nodes, [], phrases, top=30) == expected
@@ -1,6 +1,11 @@
 """Unit tests for forctx scorer."""
 
-from pvrclawk.membank.core.forctx.scorer import score_nodes_forctx
+import random
+import sqlite3
+
+from pvrclawk.membank.core.forctx import scorer as scorer_module
+from pvrclawk.membank.core.forctx.scorer import rank_nodes_bm25, rank_nodes_forctx, score_nodes_forctx
+from pvrclawk.membank.core.storage.text_index import TEXT_SCHEMA, TextIndex, index_rows
 from pvrclawk.membank.models.nodes import Task
 
 
@@ -63,3 +68,88 @@ def test_scorer_zero_score_excluded():
     node = Task(content="unrelated", uid="n1")
     ranked = score_nodes_forctx([node], ["task"], ["auth"], top=10)
     assert len(ranked) == 0
+
+
+def test_scorer_matches_full_sort_including_ties():
+    rng = random.Random(7)
+    nodes = []
+    for i in range(200):
+        node = Task(content=rng.choice(["auth flow", "db pool", "auth db", "ui"]), uid=f"n{i:03d}")
+        for tag in rng.sample(["task", "auth", "db"], rng.randint(0, 2)):
+            node.add_tag(tag, 1.0)
+        nodes.append(node)
+
+    expected = []
+    for node in nodes:
+        text = scorer_module.node_to_searchable_text(node).lower()
+        score = len({"task", "db"} & set(node.tags)) * 2.0 + sum(1.0 for p in ["auth", "pool"] if p in text)
+        if score > 0:
+            expected.append((node.uid, score))
+    expected.sort(key=lambda item: item[1], reverse=True)
+
+    assert score_nodes_forctx(nodes, ["task", "db"], ["auth", "pool"], top=15) == expected[:15]
+
+
+def test_scorer_skips_text_for_nodes_that_cannot_enter_top(monkeypatch):
+    nodes = [Task(content="auth", uid=f"hi{i}", tags={"task": 1.0}) for i in range(3)]
+    nodes += [Task(content="auth", uid=f"lo{i}") for i in range(50)]
+    seen: list[str] = []
+    original = scorer_module.node_to_searchable_text
+
+    def tracking(node):
+        seen.append(node.uid)
+        return original(node)
+
+    monkeypatch.setattr(scorer_module, "node_to_searchable_text", tracking)
+    ranked = rank_nodes_forctx(nodes, ["task"], ["auth"], top=3)
+
+    assert [node.uid for node, _ in ranked] == ["hi0", "hi1", "hi2"]
+    assert seen == ["hi0", "hi1", "hi2"]
+
+
+def _statistics(nodes, phrases):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(TEXT_SCHEMA)
+    for node in nodes:
+        index_rows(conn, node.uid, scorer_module.node_to_searchable_text(node))
+    return TextIndex(conn).statistics(phrases)
+
+
+def test_bm25_prefers_rare_words_and_short_nodes():
+    nodes = [Task(content="cache " * 8 + "retry", uid="long"), Task(content="cache retry", uid="short")]
+    nodes += [Task(content=f"cache note {i}", uid=f"c{i}") for i in range(6)]
+    phrases = ["cache", "retry"]
+
+    ranked = rank_nodes_bm25(nodes, [], phrases, _statistics(nodes, phrases), top=3)
+    assert [node.uid for node, _ in ranked[:2]] == ["short", "long"]
+    # A match on the rare word outweighs any number of matches on the common one.
+    assert ranked[2][1] < ranked[1][1] / 2
+
+
+def test_bm25_adds_tag_bonus_and_ignores_phrases_not_in_text():
+    tagged = Task(content="auth flow", uid="t1")
+    tagged.add_tag("task", 1.0)
+    other = Task(content="auth-flow", uid="t2")
+    nodes = [other, tagged]
+    statistics = _statistics(nodes, ["auth flow"])
+
+    ranked = rank_nodes_bm25(nodes, ["task"], ["auth flow"], statistics, top=5)
+    assert [node.uid for node, _ in ranked] == ["t1"]
+    assert ranked[0][1] > scorer_module.TAG_WEIGHT
+
+
+def test_bm25_pruned_ranking_matches_full_sort():
+    rng = random.Random(11)
+    words = ["auth", "flow", "cache", "retry", "token", "x"]
+    nodes = []
+    for i in range(80):
+        node = Task(content=" ".join(rng.choice(words) for _ in range(rng.randint(1, 12))), uid=f"n{i:02d}")
+        if i % 4 == 0:
+            node.add_tag("net", 1.0)
+        nodes.append(node)
+    phrases = ["auth", "cache retry"]
+    statistics = _statistics(nodes, phrases)
+
+    full = rank_nodes_bm25(nodes, ["net"], phrases, statistics, top=len(nodes))
+    for top in (1, 5, 20):
+        assert rank_nodes_bm25(nodes, ["net"], phrases, statistics, top=top) == full[:top]
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from pvrclawk.membank.core.graph.adjacency import Adjacency
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.models.link import Link
+from pvrclawk.membank.models.nodes import Memory
+
+
+def test_adjacency_round_trips_through_bytes():
+    adjacency = Adjacency.from_edges([("a", "b"), ("a", "c"), ("b", "a"), ("c", "ü")])
+    loaded = Adjacency.from_bytes(adjacency.to_bytes())
+
+    assert loaded.uids == ["a", "b", "c", "ü"]
+    assert loaded.neighbors("a") == ["b", "c"]
+    assert loaded.neighbors("c") == ["a", "ü"]
+    assert loaded.neighbors("missing") == []
+    assert Adjacency.from_bytes(Adjacency.from_edges([]).to_bytes()).uids == []
+
+
+def test_adjacency_layers_pending_edges_and_removals():
+    adjacency = Adjacency.from_edges([("a", "b"), ("b", "c")])
+    adjacency.add_edge("a", "d")
+    adjacency.remove_node("c")
+
+    assert adjacency.neighbors("a") == ["b", "d"]
+    assert adjacency.neighbors("b") == ["a"]
+    assert "c" not in adjacency
+    assert "d" in adjacency
+
+
+def test_storage_adjacency_follows_log_and_prune(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    a, b, c = (storage.save_node(Memory(content=x, tags={"t": 1.0}), "memory") for x in "abc")
+    storage.save_links([Link(source=a, target=b)])
+    storage.prune()
+    assert storage.adjacency_file.exists()
+
+    storage.save_links([Link(source=b, target=c)])
+    assert StorageEngine(storage.root).load_adjacency().neighbors(b) == [a, c]
+
+    storage.remove_node(a)
+    assert StorageEngine(storage.root).load_adjacency().neighbors(b) == [c]
+
+    storage.prune()
+    reloaded = Adjacency.from_bytes(storage.adjacency_file.read_bytes())
+    assert reloaded.neighbors(b) == [c]
+    assert a not in reloaded
+
+
+def test_adjacency_open_maps_file_and_rejects_foreign_files(tmp_path: Path):
+    path = tmp_path / "adjacency.bin"
+    path.write_bytes(Adjacency.from_edges([("b", "a"), ("b", "c")]).to_bytes())
+
+    mapped = Adjacency.open(path)
+    assert mapped.neighbors("b") == ["a", "c"]
+    assert "c" in mapped and "d" not in mapped
+    assert Adjacency.open(tmp_path / "missing.bin") is None
+    path.write_bytes(b"PVRADJ01 from an older release")
+    assert Adjacency.open(path) is None
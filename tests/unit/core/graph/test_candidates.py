@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from pvrclawk.membank.core.graph.candidates import gather_focus_candidates
+from pvrclawk.membank.core.graph.engine import GraphEngine
+from pvrclawk.membank.core.graph.scorer import VectorScorer
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.models.config import AppConfig
+from pvrclawk.membank.models.link import Link
+from pvrclawk.membank.models.nodes import Memory
+
+
+def _bank(tmp_path: Path) -> tuple[StorageEngine, dict[str, str]]:
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    uids = {
+        "tcp": storage.save_node(Memory(content="tcp", tags={"tcp": 1.0}), "memory"),
+        "tcp2": storage.save_node(Memory(content="tcp2", tags={"tcp": 0.8}), "memory"),
+        "dns": storage.save_node(Memory(content="dns", tags={"dns": 1.0}), "memory"),
+        "ui": storage.save_node(Memory(content="ui", tags={"ui": 1.0}), "memory"),
+    }
+    storage.prune()
+    storage.save_links(
+        [
+            Link(source=uids["dns"], target=uids["tcp2"], tags=["tcp"], usage_count=3),
+            Link(source=uids["tcp"], target=uids["dns"], tags=["misc"], usage_count=5),
+        ]
+    )
+    return storage, uids
+
+
+def test_candidates_rank_like_the_full_bank(tmp_path: Path):
+    storage, uids = _bank(tmp_path)
+    engine = GraphEngine(VectorScorer(AppConfig()))
+
+    candidates = gather_focus_candidates(storage, ["tcp"])
+    assert {node.uid for node in candidates.nodes} == {uids["tcp"], uids["tcp2"]}
+    assert [link.target for link in candidates.links] == [uids["tcp2"]]
+    assert candidates.total_frequency == 8
+
+    now = datetime.now(timezone.utc)
+    expected = engine.retrieve(storage.all_nodes(), storage.all_links(), ["tcp"], now=now)
+    actual = engine.retrieve(
+        candidates.nodes,
+        candidates.links,
+        ["tcp"],
+        adjacency=storage.load_adjacency(),
+        total_frequency=candidates.total_frequency,
+        now=now,
+    )
+    assert actual == expected
+    assert uids["dns"] in [uid for uid, _ in actual]
+
+
+def test_candidates_skip_clusters_without_matches(tmp_path: Path, monkeypatch):
+    storage, _ = _bank(tmp_path)
+    storage.packed_file.unlink()
+    reopened = StorageEngine(storage.root)
+    opened: list[str] = []
+    original = reopened._read_json
+
+    def recording_read(path, default):
+        opened.append(path.name)
+        return original(path, default)
+
+    monkeypatch.setattr(reopened, "_read_json", recording_read)
+    gather_focus_candidates(reopened, ["tcp"])
+
+    assert "ui.json" not in opened
+    assert "dns.json" not in opened
+    assert "tcp.json" in opened
+
+
+def test_candidates_skip_links_when_no_link_carries_a_query_tag(tmp_path: Path, monkeypatch):
+    storage, uids = _bank(tmp_path)
+    monkeypatch.setattr(storage, "raw_link_payloads", lambda: pytest.fail("links should not be read"))
+
+    candidates = gather_focus_candidates(storage, ["ui"])
+
+    assert [node.uid for node in candidates.nodes] == [uids["ui"]]
+    assert candidates.links == []
+    assert candidates.total_frequency == 8
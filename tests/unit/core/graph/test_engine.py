@@ -1,4 +1,9 @@
-from pvrclawk.membank.core.graph.engine import GraphEngine
+import sys
+
+import pytest
+
+from pvrclawk.membank.core.graph.adjacency import Adjacency
+from pvrclawk.membank.core.graph.engine import GraphEngine, build_graph_engine
 from pvrclawk.membank.core.graph.scorer import VectorScorer
 from pvrclawk.membank.models.config import AppConfig, RetrievalConfig
 from pvrclawk.membank.models.link import Link
@@ -122,3 +127,130 @@ def test_graph_engine_resistance_threshold_filters_low_scores():
     uids = [uid for uid, _ in ranked]
     assert high.uid in uids
     assert low.uid not in uids
+
+
+def test_graph_engine_expands_with_supplied_adjacency():
+    engine = GraphEngine(VectorScorer(AppConfig()))
+    n1 = Memory(content="tcp", tags={"tcp": 1.0})
+    n2 = Memory(content="neighbor")
+
+    ranked = engine.retrieve([n1, n2], [], ["tcp"], adjacency=Adjacency.from_edges([(n1.uid, n2.uid)]))
+
+    assert [uid for uid, _ in ranked] == [n1.uid, n2.uid]
+
+
+def test_graph_engine_skips_neighbors_that_cannot_enter_a_full_result():
+    engine = GraphEngine(VectorScorer(AppConfig()))
+    strong = Memory(content="strong", tags={"tcp": 3.0})
+    weak = Memory(content="weak", tags={"tcp": 1.0})
+    asked: list[str] = []
+
+    class Tracking(Adjacency):
+        def neighbors(self, uid):
+            asked.append(uid)
+            return super().neighbors(uid)
+
+    adjacency = Tracking(Adjacency.from_edges([(strong.uid, "a"), (weak.uid, "b")]).to_bytes())
+    ranked = engine.retrieve([strong, weak], [], ["tcp"], limit=2, adjacency=adjacency)
+
+    assert ranked == [(strong.uid, 3.0), ("a", 1.5)]
+    assert asked == [strong.uid]
+
+
+def _ppr_engine(**overrides) -> GraphEngine:
+    retrieval = RetrievalConfig(mode="ppr", resistance_threshold=0.0, **overrides)
+    return GraphEngine(VectorScorer(AppConfig(retrieval=retrieval)))
+
+
+def test_graph_engine_ppr_reaches_multi_hop_chain():
+    story = Memory(content="story", tags={"checkout": 1.0})
+    feature = Memory(content="feature")
+    task = Memory(content="task")
+    unrelated = Memory(content="unrelated")
+    adjacency = Adjacency.from_edges([(story.uid, feature.uid), (feature.uid, task.uid)])
+
+    one_hop = GraphEngine(VectorScorer(AppConfig(retrieval=RetrievalConfig(resistance_threshold=0.0))))
+    shallow = [uid for uid, _ in one_hop.retrieve([story, feature, task, unrelated], [], ["checkout"], adjacency=adjacency)]
+    ranked = _ppr_engine().retrieve([story, feature, task, unrelated], [], ["checkout"], adjacency=adjacency)
+
+    assert task.uid not in shallow
+    assert [uid for uid, _ in ranked] == [story.uid, feature.uid, task.uid]
+
+
+def test_graph_engine_ppr_depth_bounds_hops():
+    story = Memory(content="story", tags={"checkout": 1.0})
+    feature = Memory(content="feature")
+    task = Memory(content="task")
+    adjacency = Adjacency.from_edges([(story.uid, feature.uid), (feature.uid, task.uid)])
+
+    ranked = _ppr_engine(ppr_depth=1).retrieve([story, feature, task], [], ["checkout"], adjacency=adjacency)
+
+    assert [uid for uid, _ in ranked] == [story.uid, feature.uid]
+
+
+def test_graph_engine_ppr_stops_once_top_k_is_stable():
+    seed = Memory(content="seed", tags={"tcp": 1.0})
+    adjacency = Adjacency.from_edges([])
+    engine = _ppr_engine(ppr_depth=50)
+
+    activated = engine.personalized_pagerank({seed.uid: 1.0}, adjacency, limit=5)
+
+    assert activated == {seed.uid: 1.0}
+
+
+def test_graph_engine_ppr_builds_adjacency_from_links():
+    n1 = Memory(content="tcp", tags={"tcp": 1.0})
+    n2 = Memory(content="neighbor")
+    link = Link(source=n1.uid, target=n2.uid, tags=["misc"], weight=0.0)
+
+    ranked = _ppr_engine().retrieve([n1, n2], [link], ["tcp"])
+
+    assert [uid for uid, _ in ranked] == [n1.uid, n2.uid]
+
+
+def test_graph_engine_reports_links_feeding_returned_nodes():
+    engine = GraphEngine(VectorScorer(AppConfig()))
+    n1 = Memory(content="a", tags={"tcp": 1.0})
+    n2 = Memory(content="b")
+    n3 = Memory(content="c")
+    hit = Link(source=n1.uid, target=n2.uid, tags=["tcp"], usage_count=5)
+    miss = Link(source=n1.uid, target=n3.uid, tags=["dns"], usage_count=5)
+
+    engine.retrieve([n1, n2, n3], [hit, miss], ["tcp"], limit=1)
+    assert engine.contributing_links == []
+
+    engine.retrieve([n1, n2, n3], [hit, miss], ["tcp"], limit=5)
+    assert engine.contributing_links == [hit.uid]
+
+
+def test_graph_engine_applies_per_tag_rule_adjustments():
+    engine = GraphEngine(VectorScorer(AppConfig(retrieval=RetrievalConfig(resistance_threshold=0.0))))
+    source = Memory(content="source")
+    tcp_target = Memory(content="tcp")
+    dns_target = Memory(content="dns")
+    links = [
+        Link(source=source.uid, target=tcp_target.uid, tags=["tcp"]),
+        Link(source=source.uid, target=dns_target.uid, tags=["tcp", "dns"]),
+    ]
+
+    plain = dict(engine.retrieve([source, tcp_target, dns_target], links, ["tcp"], adjacency=Adjacency.from_edges([])))
+    adjusted = dict(
+        engine.retrieve(
+            [source, tcp_target, dns_target],
+            links,
+            ["tcp"],
+            adjacency=Adjacency.from_edges([]),
+            rule_adjustments={"dns": 3.0},
+        )
+    )
+
+    assert plain[tcp_target.uid] == pytest.approx(plain[dns_target.uid])
+    assert adjusted[dns_target.uid] == pytest.approx(3 * adjusted[tcp_target.uid])
+
+
+def test_numpy_engine_without_numpy_is_an_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pvrclawk.membank.core.graph.vectorized", None)
+
+    assert type(build_graph_engine(AppConfig())) is GraphEngine
+    with pytest.raises(ValueError, match="pvrclawk\\[numpy\\]"):
+        build_graph_engine(AppConfig(retrieval=RetrievalConfig(engine="numpy")))
@@ -1,5 +1,9 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
 from pvrclawk.membank.core.graph.scorer import VectorScorer
-from pvrclawk.membank.models.config import AppConfig
+from pvrclawk.membank.models.config import AppConfig, DecayConfig
 from pvrclawk.membank.models.link import Link
 
 
@@ -21,3 +25,36 @@ def test_decay_relative_to_total_frequency():
     low = scorer.compute_decay(link_frequency=1, total_frequency=10)
     assert high > low
     assert 0.0 <= low <= 1.0
+
+
+def test_time_decay_halves_every_half_life():
+    scorer = VectorScorer(AppConfig(decay=DecayConfig(half_life_days=7)))
+    now = datetime(2026, 1, 15, tzinfo=timezone.utc)
+    assert scorer.compute_time_decay(now, now) == 1.0
+    assert scorer.compute_time_decay(now - timedelta(days=7), now) == pytest.approx(0.5)
+    assert scorer.compute_time_decay(now - timedelta(days=14), now) == pytest.approx(0.25)
+    # Naive timestamps from older banks are read as UTC.
+    assert scorer.compute_time_decay(datetime(2026, 1, 8), now) == pytest.approx(0.5)
+
+
+def test_time_decay_disabled_with_zero_half_life():
+    scorer = VectorScorer(AppConfig(decay=DecayConfig(half_life_days=0)))
+    now = datetime(2026, 1, 15, tzinfo=timezone.utc)
+    assert scorer.compute_time_decay(now - timedelta(days=365), now) == 1.0
+
+
+def test_score_link_applies_time_decay():
+    scorer = VectorScorer(AppConfig())
+    now = datetime(2026, 1, 15, tzinfo=timezone.utc)
+    fresh = Link(source="a", target="b", tags=["tcp"], last_accessed=now)
+    stale = Link(source="a", target="b", tags=["tcp"], last_accessed=now - timedelta(days=7))
+    fresh_score = scorer.score_link(fresh, ["tcp"], total_frequency=2, now=now)
+    assert scorer.score_link(stale, ["tcp"], total_frequency=2, now=now) == pytest.approx(fresh_score / 2)
+
+
+def test_mood_factors_are_neutral_at_default_mood():
+    scorer = VectorScorer(AppConfig())
+    factors = scorer.mood_factors({"tcp": 0.5, "dns": 0.9, "ui": -1.0})
+    assert factors == {"tcp": 1.0, "dns": pytest.approx(1.4), "ui": 0.0}
+    assert scorer.mood_factor(["tcp", "dns", "misc"], ["tcp", "dns"], factors) == pytest.approx(1.2)
+    assert scorer.mood_factor(["misc"], ["tcp"], factors) == 1.0
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pvrclawk.membank.core.graph.engine import GraphEngine, build_graph_engine  # noqa: E402
+from pvrclawk.membank.core.graph.scorer import VectorScorer  # noqa: E402
+from pvrclawk.membank.core.graph.vectorized import NumpyGraphEngine  # noqa: E402
+from pvrclawk.membank.models.config import AppConfig, RetrievalConfig  # noqa: E402
+from pvrclawk.membank.models.link import Link  # noqa: E402
+from pvrclawk.membank.models.nodes import Memory  # noqa: E402
+
+TAGS = ["tcp", "dns", "auth", "db", "ui", "cache"]
+NOW = datetime(2026, 1, 31, tzinfo=timezone.utc)
+
+
+def _bank(seed: int):
+    rng = random.Random(seed)
+    nodes = [
+        Memory(content=str(i), tags={tag: round(rng.uniform(0.1, 1.0), 2) for tag in rng.sample(TAGS, rng.randint(0, 3))})
+        for i in range(60)
+    ]
+    links = [
+        Link(
+            source=rng.choice(nodes).uid,
+            target=rng.choice(nodes).uid if rng.random() < 0.9 else "dangling",
+            tags=rng.sample(TAGS, rng.randint(0, 2)),
+            weight=rng.uniform(0.5, 3.0),
+            decay=rng.uniform(0.5, 1.0),
+            usage_count=rng.randint(0, 20),
+            last_accessed=NOW - timedelta(days=rng.uniform(0, 30)),
+        )
+        for _ in range(200)
+    ]
+    return nodes, links
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("query", [["tcp"], ["dns", "auth"], ["missing"]])
+def test_numpy_engine_matches_python_engine(seed, query):
+    config = AppConfig(retrieval=RetrievalConfig(resistance_threshold=0.2))
+    nodes, links = _bank(seed)
+    multipliers = {nodes[0].uid: 2.0, nodes[5].uid: 0.5}
+
+    python_engine = GraphEngine(VectorScorer(config))
+    numpy_engine = NumpyGraphEngine(VectorScorer(config))
+    mood = {"tcp": 0.9, "dns": 0.2, "ui": 0.7}
+    expected = python_engine.retrieve(nodes, links, query, limit=10, node_multipliers=multipliers, now=NOW, mood=mood)
+    actual = numpy_engine.retrieve(nodes, links, query, limit=10, node_multipliers=multipliers, now=NOW, mood=mood)
+
+    assert [uid for uid, _ in actual] == [uid for uid, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+    assert numpy_engine.contributing_links == python_engine.contributing_links
+
+
+def test_build_graph_engine_honors_retrieval_engine():
+    assert type(build_graph_engine(AppConfig())) is GraphEngine
+    assert type(build_graph_engine(AppConfig(retrieval=RetrievalConfig(engine="numpy")))) is NumpyGraphEngine
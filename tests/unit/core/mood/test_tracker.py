@@ -14,3 +14,33 @@ def test_mood_report_ema(tmp_path: Path):
     updated = tracker.report("tcp", 1.0)
     assert updated > 0.5
     assert tracker.get("tcp") == updated
+
+
+def test_mood_report_many_writes_once(tmp_path: Path, monkeypatch):
+    tracker = MoodTracker(tmp_path / "mood.json", AppConfig())
+    writes: list[dict] = []
+    original = tracker._write
+    monkeypatch.setattr(tracker, "_write", lambda data: (writes.append(dict(data)), original(data)))
+
+    updated = tracker.report_many([("tcp", 1.0), ("dns", 0.0), ("tcp", 1.0)])
+
+    assert len(writes) == 1
+    assert updated["tcp"] == tracker.get("tcp") == 0.5 * 0.9 * 0.9 + 0.1 * 0.9 + 0.1
+    assert tracker.values() == updated
+
+
+def test_mood_is_written_atomically_with_the_storage_codec(tmp_path: Path, monkeypatch):
+    from pvrclawk.membank.core.mood import tracker as tracker_module
+    from pvrclawk.utils.json_io import JsonCodec
+
+    mood_file = tmp_path / "mood.json"
+    atomic: list[Path] = []
+    write = tracker_module.atomic_write_bytes
+    monkeypatch.setattr(tracker_module, "atomic_write_bytes", lambda path, blob: (atomic.append(path), write(path, blob)))
+    codec = JsonCodec("stdlib")
+
+    MoodTracker(mood_file, AppConfig(), codec).report("tcp", 1.0)
+
+    assert atomic == [mood_file]
+    assert mood_file.read_bytes() == codec.dumps({"tcp": 0.55})
+    assert MoodTracker(mood_file, AppConfig()).get("tcp") == 0.55
@@ -0,0 +1,49 @@
+import pytest
+
+from pvrclawk.membank.core.rules.compiler import compile_rule, tag_adjustments
+
+
+def _mood(values: dict[str, float]):
+    return lambda tag: values.get(tag, 0.5)
+
+
+def test_compile_tag_and_mood_predicates():
+    rule = compile_rule('if tag("tcp") and mood("tcp") < 0.3 then weight("tcp") -= 0.05')
+
+    assert rule.predicate(frozenset({"tcp"}), _mood({"tcp": 0.1}))
+    assert not rule.predicate(frozenset({"tcp"}), _mood({"tcp": 0.4}))
+    assert not rule.predicate(frozenset({"dns"}), _mood({"tcp": 0.1}))
+    assert rule.delta == -0.05
+
+
+def test_compile_boolean_operators_and_parentheses():
+    rule = compile_rule('if not (tag("a") or tag == b) then weight("c") *= 2')
+
+    assert rule.predicate(frozenset({"c"}), _mood({}))
+    assert not rule.predicate(frozenset({"b"}), _mood({}))
+
+
+def test_tag_adjustments_combine_fired_rules_per_tag():
+    rules = [
+        compile_rule('if tag("tcp") then weight("tcp") += 0.5'),
+        compile_rule("if tag == tcp then boost 2"),
+        compile_rule('if tag("dns") then weight("dns") += 9'),
+        compile_rule('if true then weight("ui") -= 3'),
+    ]
+
+    assert tag_adjustments(rules, ["tcp"], {}, 0.5) == {"tcp": 3.0, "ui": 0.0}
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "if tag(tcp then boost 2",
+        'if mood("tcp") 0.3 then boost 2',
+        'if tag("tcp") then weight("tcp") = 1',
+        'if tag("tcp") then explode',
+        'if tag("tcp") extra then boost 2',
+    ],
+)
+def test_compile_rejects_malformed_rules(rule):
+    with pytest.raises(ValueError):
+        compile_rule(rule)
@@ -1,4 +1,6 @@
-from pvrclawk.membank.core.rules.engine import RuleEngine
+import json
+
+from pvrclawk.membank.core.rules.engine import RuleEngine, load_rule_engine
 
 
 def test_rule_validate():
@@ -10,3 +12,19 @@ def test_rule_multiplier_changes():
     engine = RuleEngine(['if tag("tcp") then weight("tcp") += 0.1'])
     mul = engine.evaluate_multiplier(["tcp"], {})
     assert mul > 1.0
+
+
+def test_rule_multiplier_respects_mood_predicates():
+    engine = RuleEngine(['if mood("tcp") < 0.3 then weight("tcp") -= 0.5'])
+    assert engine.evaluate_multiplier(["tcp"], {"tcp": 0.9}) == 1.0
+    assert engine.evaluate_multiplier(["tcp"], {"tcp": 0.1}) == 0.5
+
+
+def test_load_rule_engine_compiles_the_rules_file(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    assert load_rule_engine(rules_file).compiled == []
+
+    rules_file.write_text(json.dumps({"rules": ['if tag("tcp") then weight("tcp") += 1', "broken"]}), encoding="utf-8")
+    engine = load_rule_engine(rules_file)
+    assert engine.tag_adjustments(["tcp"], {}) == {"tcp": 2.0}
+    assert list(engine.errors) == ["broken"]
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from pvrclawk.membank.core.storage import writer as writer_module
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.models.link import Link
+from pvrclawk.membank.models.nodes import Memory
+
+
+def _count_writes(monkeypatch) -> list[Path]:
+    written: list[Path] = []
+    original = writer_module.atomic_write_bytes
+
+    def recording_write(path, blob):
+        written.append(Path(path))
+        original(path, blob)
+
+    monkeypatch.setattr(writer_module, "atomic_write_bytes", recording_write)
+    return written
+
+
+def test_batch_writes_each_dirty_file_once(tmp_path: Path, monkeypatch):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    storage.activate_session(session_id="batch-session")
+    written = _count_writes(monkeypatch)
+
+    with storage.batch():
+        uids = [storage.save_node(Memory(content=f"n{i}", tags={"tcp": 1.0}), "memory") for i in range(5)]
+        storage.save_links([Link(source=uids[0], target=uids[1], tags=["tcp"])])
+        storage.update_node_status(uids[0], "done")
+        assert written == []
+
+    # Node, link and status writes land in the mutation log; the snapshot files stay untouched.
+    assert storage.index_file not in written
+    assert storage.links_file not in written
+    assert storage.nodes_dir / "_inbox.json" not in written
+    assert [record["op"] for record in storage.wal.read()] == ["node"] * 5 + ["link"]
+    assert written.count(storage.sessions_dir / "batch-session.json") == 1
+    assert len(storage.load_nodes(uids)) == 5
+    assert storage.resolve_recent_uid(1) == uids[-1]
+
+
+def test_batch_discards_pending_writes_on_error(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            uid = storage.save_node(Memory(content="lost"), "memory")
+            raise RuntimeError("boom")
+
+    assert storage.load_node(uid) is None
+    assert uid not in storage.load_index().uid_file
+
+
+def test_nested_batch_joins_outer_batch(tmp_path: Path, monkeypatch):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    written = _count_writes(monkeypatch)
+
+    with storage.batch():
+        with storage.batch():
+            storage.save_node(Memory(content="inner"), "memory")
+        assert written == []
+        storage.save_node(Memory(content="outer"), "memory")
+
+    assert storage.index_file not in written
+    assert [record["seq"] for record in storage.wal.read()] == [1, 2]
+    assert len(storage.all_nodes()) == 2
@@ -0,0 +1,125 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pvrclawk.membank.core.storage.cache import QueryCache, config_fingerprint
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.sqlite import SqliteStorageEngine
+from pvrclawk.membank.models.config import AppConfig, CacheConfig, RetrievalConfig
+from pvrclawk.membank.models.link import Link
+from pvrclawk.membank.models.nodes import Memory
+
+
+def _age(cache: QueryCache, key: str, seconds: int) -> None:
+    path = cache.directory / f"{key}.json"
+    stamp = path.stat().st_mtime - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_cache_roundtrip_and_key_components(tmp_path: Path):
+    cache = QueryCache(tmp_path / "cache", CacheConfig())
+    key = cache.key("focus", ["tcp"], 5, "abc", 3)
+    cache.put(key, {"ranked": [["u1", 1.5]]})
+
+    assert cache.get(key) == {"ranked": [["u1", 1.5]]}
+    assert cache.get(cache.key("focus", ["tcp"], 5, "abc", 4)) is None
+    assert cache.get(cache.key("focus", ["tcp"], 6, "abc", 3)) is None
+    assert cache.get(cache.key("forctx", ["tcp"], 5, "abc", 3)) is None
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path: Path):
+    cache = QueryCache(tmp_path / "cache", CacheConfig(max_entries=2))
+    first, second, third = (cache.key("focus", [tag], 5, "abc", 1) for tag in ("a", "b", "c"))
+    cache.put(first, {"ranked": []})
+    cache.put(second, {"ranked": []})
+    _age(cache, first, 20)
+    _age(cache, second, 10)
+    cache.get(first)
+
+    cache.put(third, {"ranked": []})
+
+    assert cache.get(first) is not None
+    assert cache.get(second) is None
+    assert cache.get(third) is not None
+
+
+def test_cache_evicts_by_size_and_drops_stale_generations(tmp_path: Path):
+    cache = QueryCache(tmp_path / "cache", CacheConfig(max_bytes=60))
+    old = cache.key("focus", ["a"], 5, "abc", 1)
+    cache.put(old, {"ranked": []})
+    assert cache.get(old) is not None
+
+    small = cache.key("focus", ["c"], 5, "abc", 2)
+    cache.put(small, {"ranked": [["y", 1.0]]})
+    _age(cache, small, 10)
+    big = cache.key("focus", ["b"], 5, "abc", 2)
+    cache.put(big, {"ranked": [["x" * 30, 1.0]]})
+
+    # The stale generation goes first; then the most recent entries fill the byte budget.
+    assert sorted(path.stem for path in cache.directory.glob("*.json")) == [big]
+
+
+def test_disabled_cache_stores_nothing(tmp_path: Path):
+    cache = QueryCache(tmp_path / "cache", CacheConfig(enabled=False))
+    key = cache.key("focus", ["a"], 5, "abc", 1)
+    cache.put(key, {"ranked": []})
+    assert cache.get(key) is None
+    assert not cache.directory.exists()
+
+
+def test_config_fingerprint_ignores_cache_settings():
+    base = config_fingerprint(AppConfig())
+    assert config_fingerprint(AppConfig(cache=CacheConfig(max_entries=3))) == base
+    assert config_fingerprint(AppConfig(retrieval=RetrievalConfig(resistance_threshold=0.1))) != base
+
+
+def test_generation_bumps_on_mutations_only(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    start = storage.generation()
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    assert storage.generation() == start + 2
+    link = Link(source=a, target=b, tags=["tcp"])
+    storage.save_link(link)
+    storage.add_rule("prefer tcp")
+    assert storage.generation() == start + 4
+
+    session = storage.activate_session()
+    storage.record_session_served(session, [a])
+    storage.record_link_usage([link.uid])
+    assert storage.generation() == start + 4
+
+    storage.remove_node(b)
+    assert storage.generation() == start + 5
+
+
+def test_concurrent_generation_bumps_are_not_lost(tmp_path: Path):
+    root = tmp_path / ".pvrclawk"
+    StorageEngine(root).init_db()
+    start = StorageEngine(root).generation()
+
+    def bump(_):
+        storage = StorageEngine(root)
+        for _ in range(25):
+            storage._bump_generation()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(bump, range(4)))
+    assert StorageEngine(root).generation() == start + 100
+
+
+def test_sqlite_generation_ignores_usage_write_back(tmp_path: Path):
+    storage = SqliteStorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    link = Link(source=a, target=b, tags=["tcp"])
+    storage.save_link(link)
+    before = storage.generation()
+
+    storage.record_link_usage([link.uid])
+    assert storage.generation() == before
+
+    storage.remove_node(b)
+    assert storage.generation() == before + 1
@@ -1,4 +1,10 @@
-from pvrclawk.membank.core.storage.cluster import derive_cluster_name, select_best_cluster
+from pvrclawk.membank.core.storage.cluster import (
+    cluster_top_tags,
+    cluster_with_room,
+    derive_cluster_name,
+    select_best_cluster,
+    split_cluster,
+)
 from pvrclawk.membank.models.index import ClusterMeta, IndexData
 
 
@@ -22,3 +28,36 @@ def test_select_best_cluster_prefers_overlap():
     )
     selected = select_best_cluster(idx, {"tcp": 1.0})
     assert selected == "tcp_timeout"
+
+
+def test_select_best_cluster_skips_full_clusters_and_prefers_fuller_parts():
+    idx = IndexData(
+        clusters={
+            "tcp": ClusterMeta(top_tags=["tcp"], size=5),
+            "tcp-2": ClusterMeta(top_tags=["tcp"], size=1),
+            "tcp-3": ClusterMeta(top_tags=["tcp"], size=3),
+        }
+    )
+    assert select_best_cluster(idx, {"tcp": 1.0}) == "tcp"
+    assert select_best_cluster(idx, {"tcp": 1.0}, max_size=5) == "tcp-3"
+    assert select_best_cluster(idx, {"tcp": 1.0}, max_size=5, needed=3) == "tcp-2"
+    assert select_best_cluster(idx, {"tcp": 1.0}, max_size=5, needed=5) == "_inbox"
+
+
+def test_cluster_with_room_continues_in_the_next_part():
+    idx = IndexData(clusters={"tcp": ClusterMeta(size=2), "tcp-2": ClusterMeta(size=1)})
+    assert cluster_with_room(idx, "tcp", 2, taken={"tcp", "tcp-2"}) == "tcp-2"
+    assert cluster_with_room(idx, "tcp", 1, taken={"tcp", "tcp-2"}) == "tcp-3"
+    assert cluster_with_room(idx, "dns", 2, taken=set()) == "dns"
+
+
+def test_cluster_top_tags_sums_weights():
+    payloads = {"a": {"tags": {"tcp": 1.0, "dns": 0.2}}, "b": {"tags": {"dns": 0.5, "auth": 0.1}}}
+    assert cluster_top_tags(payloads, limit=2) == ["tcp", "dns"]
+
+
+def test_split_cluster_keeps_name_and_skips_taken_suffixes():
+    payloads = {f"u{i}": {"tags": {"tcp": 1.0}} for i in range(5)}
+    parts = split_cluster("tcp", payloads, 2, taken={"tcp", "tcp-2"})
+    assert list(parts) == ["tcp", "tcp-3", "tcp-4"]
+    assert [len(part) for part in parts.values()] == [2, 2, 1]
@@ -1,14 +1,73 @@
-from pvrclawk.membank.core.storage.index import add_unique, remove_value
+from pvrclawk.membank.core.storage.index import (
+    add_unique,
+    bump_link_usage,
+    index_link,
+    remove_value,
+    unindex_node,
+)
+from pvrclawk.membank.models.index import IndexData
 
 
 def test_add_unique_deduplicates():
     data = {}
     add_unique(data, "tcp", "u1")
     add_unique(data, "tcp", "u1")
-    assert data["tcp"] == ["u1"]
+    assert data["tcp"] == {"u1"}
 
 
 def test_remove_value_cleans_empty_key():
-    data = {"tcp": ["u1"]}
+    data = {"tcp": {"u1"}}
     remove_value(data, "tcp", "u1")
     assert "tcp" not in data
+
+
+def test_index_postings_serialize_as_sorted_lists():
+    index = IndexData()
+    for uid in ["u3", "u1", "u2"]:
+        add_unique(index.tags, "tcp", uid)
+
+    dumped = index.model_dump()
+
+    assert dumped["tags"] == {"tcp": ["u1", "u2", "u3"]}
+    assert IndexData.model_validate(dumped).tags == {"tcp": {"u1", "u2", "u3"}}
+
+
+def _link(source: str, target: str, tags=(), usage_count: int = 1) -> dict:
+    return {"source": source, "target": target, "tags": list(tags), "usage_count": usage_count}
+
+
+def test_unindex_node_drops_only_incident_links():
+    index = IndexData()
+    index_link(index, "l1", "a", "b")
+    index_link(index, "l2", "b", "c")
+    index_link(index, "l3", "c", "a")
+    index_link(index, "l4", "c", "d")
+
+    unindex_node(index, "b", "memory", [], {"l1": _link("a", "b"), "l2": _link("b", "c")})
+
+    assert index.links_out == {"c": {"l3", "l4"}}
+    assert index.links_in == {"a": {"c"}, "d": {"c"}}
+
+
+def test_link_aggregates_follow_index_unindex_and_usage():
+    index = IndexData()
+    index_link(index, "l1", "a", "b", ["tcp", "dns"], 3)
+    index_link(index, "l2", "b", "c", ["tcp"], 2)
+
+    assert index.total_usage == 5
+    assert index.tag_usage == {"tcp": 5, "dns": 3}
+    assert index.tag_link_counts == {"tcp": 2, "dns": 1}
+    assert "link_usage" not in index.model_dump()
+
+    bump_link_usage(index, ["tcp"], 4)
+    assert index.total_usage == 9
+    assert index.tag_usage["tcp"] == 9
+
+    # A re-saved link keeps its first contribution, as compaction keeps its first payload.
+    index_link(index, "l2", "b", "c", ["tcp"], 1)
+    assert index.total_usage == 9
+
+    unindex_node(index, "a", "memory", [], {"l1": _link("a", "b", ["tcp", "dns"], 3)})
+    assert index.total_usage == 6
+    assert index.tag_usage == {"tcp": 6}
+    assert index.tag_link_counts == {"tcp": 1}
@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.packed import PackedNodeStore, build_packed
+from pvrclawk.membank.models.nodes import Memory, Task
+from pvrclawk.utils.json_io import JsonCodec
+
+
+def test_packed_store_point_lookups(tmp_path: Path):
+    codec = JsonCodec("stdlib")
+    payloads = {uid: {"uid": uid, "content": uid * 3} for uid in ["c", "a", "é", "b"]}
+    path = tmp_path / "_packed.bin"
+    path.write_bytes(build_packed(payloads, generation=7, codec=codec))
+
+    with PackedNodeStore.open(path, codec) as store:
+        assert store.generation == 7
+        assert len(store) == 4
+        for uid, payload in payloads.items():
+            assert store.get(uid) == payload
+        assert store.get("missing") is None
+
+
+def test_packed_store_open_rejects_missing_or_foreign_files(tmp_path: Path):
+    codec = JsonCodec("stdlib")
+    assert PackedNodeStore.open(tmp_path / "nope.bin", codec) is None
+    foreign = tmp_path / "foreign.bin"
+    foreign.write_bytes(b"not a pack at all, but long enough")
+    assert PackedNodeStore.open(foreign, codec) is None
+
+
+def test_prune_builds_pack_used_by_reads_and_kept_current_by_compaction(tmp_path: Path, monkeypatch):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    uid = storage.save_node(Task(content="t", tags={"tcp": 1.0}), "task")
+    other = storage.save_node(Memory(content="m", tags={"tcp": 1.0}), "memory")
+    storage.prune()
+    assert storage.packed_file.exists()
+
+    reopened = StorageEngine(storage.root)
+    original = reopened._read_json
+
+    def no_cluster_reads(path, default):
+        assert path.parent != reopened.nodes_dir, f"unexpected cluster read: {path.name}"
+        return original(path, default)
+
+    monkeypatch.setattr(reopened, "_read_json", no_cluster_reads)
+    assert reopened.load_node(uid).content == "t"
+
+    # Overlay records still apply on top of the pack.
+    assert storage.update_node_status(uid, "done") is True
+    assert storage.remove_node(other) is True
+    assert StorageEngine(storage.root).load_node(uid).status.value == "done"
+    assert StorageEngine(storage.root).load_node(other) is None
+
+    storage.prune()
+    assert storage.packed_file.exists()
+    packed = storage.packed_file.read_bytes()
+    storage.flush_inbox()
+    added = storage.save_node(Memory(content="n", tags={"dns": 1.0}), "memory")
+    storage.update_node_status(uid, "todo")
+    storage.flush_inbox()
+    assert storage.packed_file.read_bytes() == packed
+    assert set(json.loads(storage.packed_delta_file.read_text(encoding="utf-8"))["nodes"]) == {added, uid}
+
+    reopened = StorageEngine(storage.root)
+    monkeypatch.setattr(reopened, "_read_json", no_cluster_reads)
+    assert reopened.load_node(added).content == "n"
+    assert reopened.load_node(uid).status.value == "todo"
+    assert len(StorageEngine(storage.root).all_nodes()) == 2
+
+
+def test_point_reads_skip_the_index(tmp_path: Path, monkeypatch):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    uid = storage.save_node(Memory(content="kept"), "memory")
+    gone = storage.save_node(Memory(content="gone"), "memory")
+    storage.prune()
+    pending = storage.save_node(Memory(uid=uid[:4] + "0" * 32, content="pending"), "memory")
+    storage.remove_node(gone)
+
+    reopened = StorageEngine(storage.root)
+
+    def no_index():
+        raise AssertionError("index.json should not be loaded")
+
+    monkeypatch.setattr(reopened, "_wal_state", no_index)
+    assert reopened.resolve_uid_with_reason(uid) == (uid, "exact")
+    assert reopened.resolve_uid_with_reason(uid[:8]) == (uid, "prefix")
+    assert reopened.resolve_uid_with_reason(uid[:4]) == (None, "ambiguous")
+    assert reopened.resolve_uid_with_reason(gone) == (None, "missing")
+    assert [node.content for node in reopened.load_nodes([uid, pending, gone])] == ["kept", "pending"]
@@ -1,8 +1,10 @@
+import json
 from pathlib import Path
 
 from pvrclawk.membank.core.storage.engine import StorageEngine
 from pvrclawk.membank.models.link import Link
 from pvrclawk.membank.models.nodes import Memory
+from pvrclawk.utils.config import set_config_value
 
 
 def test_prune_rebalances_inbox_to_named_cluster(tmp_path: Path):
@@ -40,3 +42,86 @@ def test_prune_rebuilds_links_in(tmp_path: Path):
     # links_in should map target -> [source]
     assert n2.uid in idx.links_in
     assert n1.uid in idx.links_in[n2.uid]
+
+
+def test_save_node_flushes_inbox_past_auto_threshold(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    set_config_value(storage.config_file, "prune.auto_threshold", "2")
+    uids = [storage.save_node(Memory(content=c, tags={"tcp": 1.0}), "memory") for c in ["a", "b", "c"]]
+
+    idx = storage.load_index()
+    assert {idx.uid_file[uid] for uid in uids} == {"tcp"}
+    assert storage.wal.read() == []
+    assert "_inbox" not in idx.clusters
+
+    # A later node with overlapping tags joins the existing cluster.
+    uid = storage.save_node(Memory(content="d", tags={"tcp": 0.5, "dns": 1.0}), "memory")
+    storage.prune()
+    assert storage.load_index().uid_file[uid] == "tcp"
+
+
+def test_prune_splits_clusters_over_max_cluster_size(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    set_config_value(storage.config_file, "prune.max_cluster_size", "2")
+    for content in ["a", "b", "c", "d", "e"]:
+        storage.save_node(Memory(content=content, tags={"tcp": 1.0}), "memory")
+
+    storage.prune()
+
+    idx = storage.load_index()
+    assert {name: meta.size for name, meta in idx.clusters.items()} == {"tcp": 2, "tcp-2": 2, "tcp-3": 1}
+    assert all(meta.top_tags == ["tcp"] for meta in idx.clusters.values())
+    assert len(storage.all_nodes()) == 5
+
+
+def test_prune_places_untagged_nodes(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    uid = storage.save_node(Memory(content="plain"), "memory")
+
+    assert storage.prune() == "untagged"
+    assert storage.load_node(uid).content == "plain"
+
+
+def test_inbox_flushes_fill_clusters_up_to_max_cluster_size(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    set_config_value(storage.config_file, "prune.max_cluster_size", "5")
+    set_config_value(storage.config_file, "prune.auto_threshold", "2")
+    for i in range(40):
+        storage.save_node(Memory(content=f"n{i}", tags={"tcp": 1.0}), "memory")
+    storage.prune()
+
+    sizes = {name: meta.size for name, meta in storage.load_index().clusters.items()}
+    assert sorted(sizes.values()) == [5] * 8
+    assert set(sizes) == {"tcp"} | {f"tcp-{n}" for n in range(2, 9)}
+
+
+def test_prune_repacks_split_parts_and_merges_undersized_clusters(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    set_config_value(storage.config_file, "prune.max_cluster_size", "5")
+
+    def write_cluster(name: str, count: int, tags: dict[str, float]) -> None:
+        payloads = {}
+        for i in range(count):
+            node = Memory(content=f"{name} {i}", tags=tags)
+            payloads[node.uid] = {**node.model_dump(mode="json"), "__type__": "memory"}
+        (storage.nodes_dir / f"{name}.json").write_text(json.dumps(payloads), encoding="utf-8")
+
+    write_cluster("tcp", 5, {"tcp": 1.0})
+    for name, count in [("tcp-2", 1), ("tcp-3", 3), ("tcp-4", 2)]:
+        write_cluster(name, count, {"tcp": 1.0})
+    write_cluster("dns", 3, {"dns": 1.0})
+    write_cluster("dns_tcp", 1, {"dns": 1.0, "tcp": 0.5})
+    write_cluster("auth", 1, {"auth": 1.0})
+
+    storage.prune()
+
+    sizes = {name: meta.size for name, meta in storage.load_index().clusters.items()}
+    # The lone tcp node left after repacking joins dns, which took a tcp-tagged node first.
+    assert sizes == {"tcp": 5, "tcp-2": 5, "dns": 5, "auth": 1}
+    assert sorted(path.stem for path in storage.nodes_dir.glob("*.json")) == sorted([*sizes, "_inbox"])
+    assert len(storage.all_nodes()) == 16
@@ -0,0 +1,153 @@
+from pathlib import Path
+
+from pvrclawk.membank.core.storage.factory import migrate_storage, open_storage
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.sqlite import SqliteStorageEngine
+from pvrclawk.membank.models.link import Link
+from pvrclawk.membank.models.nodes import Bug, Memory, Story, Task
+
+
+def _sqlite_storage(tmp_path: Path) -> SqliteStorageEngine:
+    storage = SqliteStorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    return storage
+
+
+def test_sqlite_save_load_roundtrip_and_types(tmp_path: Path):
+    storage = _sqlite_storage(tmp_path)
+    story_uid = storage.save_node(Story(role="dev", benefit="ship", tags={"auth": 1.0}), "story")
+    bug = Task(content="fix login bug")
+    bug.add_tag("bug", 1.0)
+    bug_uid = storage.save_node(bug, "task")
+
+    loaded = {n.uid: n for n in storage.load_nodes([story_uid, bug_uid])}
+    assert isinstance(loaded[story_uid], Story)
+    assert isinstance(loaded[bug_uid], Bug)
+    assert [n.uid for n in storage.load_nodes_by_type("story")] == [story_uid]
+    assert storage.load_index().tags["auth"] == {story_uid}
+
+
+def test_sqlite_resolve_uid_prefix_and_ambiguity(tmp_path: Path):
+    storage = _sqlite_storage(tmp_path)
+    storage.save_node(Memory(uid="abcd1111-1111-1111-1111-111111111111", content="one"), "memory")
+    storage.save_node(Memory(uid="abcd2222-2222-2222-2222-222222222222", content="two"), "memory")
+
+    assert storage.resolve_uid_with_reason("abcd1") == ("abcd1111-1111-1111-1111-111111111111", "prefix")
+    assert storage.resolve_uid_with_reason("abcd") == (None, "ambiguous")
+    assert storage.resolve_uid_with_reason("zzzz") == (None, "missing")
+
+
+def test_sqlite_status_links_and_remove(tmp_path: Path):
+    storage = _sqlite_storage(tmp_path)
+    source_uid = storage.save_node(Memory(content="source"), "memory")
+    target_uid = storage.save_node(Story(role="r", benefit="b"), "story")
+    storage.save_link(Link(source=source_uid, target=target_uid, tags=["tcp", "method"]))
+
+    assert storage.update_node_status(target_uid, "done") is True
+    assert storage.update_node_status(source_uid, "done") is False
+    assert storage.load_node(target_uid).status.value == "done"
+    assert storage.adjust_link_weights_by_tags(["tcp", "method"], 0.5) == 1
+    assert storage.load_links([source_uid])[0].weight == 1.5
+
+    assert storage.remove_node(target_uid) is True
+    assert storage.load_node(target_uid) is None
+    assert storage.load_links([source_uid]) == []
+    assert storage.remove_node(target_uid) is False
+
+
+def test_migrate_json_bank_to_sqlite_and_back(tmp_path: Path):
+    root = tmp_path / ".pvrclawk"
+    storage = StorageEngine(root)
+    storage.init_db()
+    a = storage.save_node(Memory(content="a", tags={"tcp": 1.0}), "memory")
+    b = storage.save_node(Memory(content="b", tags={"tcp": 1.0}), "memory")
+    storage.save_link(Link(source=a, target=b, tags=["tcp"]))
+
+    assert migrate_storage(root, "sqlite") == (2, 1)
+    migrated = open_storage(root)
+    assert isinstance(migrated, SqliteStorageEngine)
+    assert {n.uid for n in migrated.all_nodes()} == {a, b}
+    assert [link.target for link in migrated.load_links([a])] == [b]
+
+    migrated.remove_node(b)
+    assert migrate_storage(root, "json") == (1, 0)
+    restored = open_storage(root)
+    assert type(restored) is StorageEngine
+    assert [n.uid for n in restored.all_nodes()] == [a]
+
+
+def test_sqlite_records_link_usage(tmp_path: Path):
+    storage = _sqlite_storage(tmp_path)
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    link = Link(source=a, target=b, tags=["tcp"], usage_count=1)
+    storage.save_link(link)
+
+    assert storage.record_link_usage([link.uid, "missing"]) == 2
+    assert storage.all_links()[0].usage_count == 1
+    assert storage.flush_link_usage() == 2
+    (stored,) = storage.all_links()
+    assert stored.usage_count == 2
+
+
+def test_sqlite_answers_candidate_lookups_without_rebuilding_the_index(tmp_path: Path, monkeypatch):
+    storage = _sqlite_storage(tmp_path)
+    a = storage.save_node(Memory(content="a", tags={"tcp": 1.0}), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    c = storage.save_node(Memory(content="c"), "memory")
+    storage.save_link(Link(source=a, target=b, tags=["tcp"], usage_count=3))
+    storage.save_link(Link(source=b, target=c, tags=["udp"], usage_count=2))
+
+    def no_index():
+        raise AssertionError("load_index should not be needed")
+
+    monkeypatch.setattr(storage, "load_index", no_index)
+    assert storage.tag_postings(["tcp", "missing"]) == {"tcp": {a}}
+    assert [payload["target"] for payload in storage.links_with_tags(["tcp"])] == [b]
+    assert storage.total_link_usage() == 5
+    assert storage.bank_order([c, a, "missing"]) == sorted([a, c])
+    adjacency = storage.load_adjacency()
+    assert b in adjacency and "missing" not in adjacency
+    assert adjacency.neighbors(b) == [a, c]
+
+
+def test_sqlite_backfills_usage_column_of_older_databases(tmp_path: Path):
+    storage = _sqlite_storage(tmp_path)
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    storage.save_link(Link(source=a, target=b, tags=["tcp"], usage_count=4))
+    conn = storage._connect()
+    conn.execute("ALTER TABLE links DROP COLUMN usage_count")
+    conn.commit()
+    storage.close()
+
+    assert SqliteStorageEngine(storage.root).total_link_usage() == 4
+
+
+def test_sqlite_term_positions_are_upgraded_to_frequencies(tmp_path: Path):
+    storage = _sqlite_storage(tmp_path)
+    uid = storage.save_node(Memory(content="auth auth flow"), "memory")
+    conn = storage._connect()
+    conn.execute("DROP TABLE node_terms")
+    conn.execute("CREATE TABLE node_terms (term TEXT, uid TEXT, positions TEXT NOT NULL, PRIMARY KEY (term, uid))")
+    conn.commit()
+    storage.close()
+
+    reopened = SqliteStorageEngine(storage.root)
+    assert reopened.search_text(["au"]) == [{uid}]
+    assert reopened.text_statistics(["auth"]).frequencies == {"auth": {uid: 2}}
+
+
+def test_sqlite_text_rows_posted_with_the_uid_are_reindexed(tmp_path: Path):
+    storage = _sqlite_storage(tmp_path)
+    uid = storage.save_node(Memory(content="packet loss"), "memory")
+    conn = storage._connect()
+    conn.execute("DELETE FROM node_uid_chars")
+    conn.execute("INSERT INTO node_trigrams (trigram, uid) VALUES (?, ?)", (uid[:3], uid))
+    conn.commit()
+    storage.close()
+
+    reopened = SqliteStorageEngine(storage.root)
+    grams = {gram for (gram,) in reopened._connect().execute("SELECT trigram FROM node_trigrams")}
+    assert uid[:3] not in grams
+    assert reopened.search_text([uid[:6], "packet"]) == [{uid}, {uid}]
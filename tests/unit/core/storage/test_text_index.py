@@ -0,0 +1,182 @@
+import json
+import random
+import sqlite3
+from pathlib import Path
+
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.sqlite import SqliteStorageEngine
+from pvrclawk.membank.core.storage.text_index import (
+    TEXT_SCHEMA,
+    TextIndex,
+    index_rows,
+    stored_seq,
+    tokenize,
+    trigrams,
+    unindex_rows,
+)
+from pvrclawk.membank.models.nodes import Memory, Story
+
+
+def _storage(tmp_path: Path) -> StorageEngine:
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    return storage
+
+
+def _conn(texts: dict[str, str]) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(TEXT_SCHEMA)
+    for uid, text in texts.items():
+        index_rows(conn, uid, text)
+    return conn
+
+
+def _remove_text_index(storage: StorageEngine) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{storage.text_index_file}{suffix}").unlink(missing_ok=True)
+
+
+def test_index_records_term_frequencies_after_the_uid_and_unindex_drops_rows():
+    conn = _conn({"a": "a Auth flow, auth TOKEN", "b": "b token"})
+
+    assert tokenize("Auth-flow x_1") == ["auth", "flow", "x_1"]
+    terms = set(conn.execute("SELECT term, uid, frequency FROM node_terms"))
+    assert terms == {("auth", "a", 2), ("flow", "a", 1), ("token", "a", 1), ("token", "b", 1)}
+    assert TextIndex(conn).texts(["a", "z"]) == {"a": "a auth flow, auth token"}
+
+    unindex_rows(conn, "a")
+    assert {term for (term,) in conn.execute("SELECT term FROM node_terms")} == {"token"}
+    assert TextIndex(conn).texts(["a"]) == {}
+
+
+def test_index_keeps_document_lengths_for_statistics():
+    conn = _conn({"a": "a auth flow auth", "b": "b authentication"})
+    index_rows(conn, "a", "a auth")
+
+    statistics = TextIndex(conn).statistics(["Auth"])
+    assert statistics.phrase_words == {"auth": ["auth"]}
+    assert statistics.frequencies == {"auth": {"a": 1, "b": 1}}
+    assert statistics.doc_lengths == {"a": 1, "b": 1}
+    assert statistics.average_length == 1.0
+
+
+def test_search_covers_every_substring_match_including_the_uid():
+    words = ["auth", "flow", "token", "re", "authentication", "flows", "x"]
+    rng = random.Random(7)
+    texts = {f"n{i}": f"n{i} " + " ".join(rng.choice(words) for _ in range(6)) for i in range(60)}
+    text_index = TextIndex(_conn(texts))
+
+    phrases = ["auth", "thent", "re", "x", "auth flow", "n flow", "x x", "zzz", "n1", "7 auth", "n4 re", "n"]
+    for phrase, found in zip(phrases, text_index.search(phrases)):
+        assert {uid for uid, text in texts.items() if phrase in text} <= found
+    assert text_index.search(["--"]) == [None]
+
+
+def test_search_matches_across_words_and_punctuation():
+    texts = {"a": "a fix: auth-flow --> retry", "b": "b auth flow", "c": "c authentication", "d": "d ok"}
+    text_index = TextIndex(_conn(texts))
+
+    phrases = ["h-f", "-->", ": a", "th fl", "ntica", "AUTH", "zzz"]
+    for phrase, found in zip(phrases, text_index.search(phrases)):
+        assert {uid for uid, text in texts.items() if phrase.lower() in text} <= found
+    assert text_index.search(["h-f", "ok", "zzz"]) == [{"a"}, {"d"}, set()]
+
+
+def test_uids_are_not_posted_but_phrases_inside_them_still_match():
+    uid = "3f2a9c1e-77b0-4d2e-9a51-0c6e8d1f4b2a"
+    conn = _conn({uid: f"{uid} packet loss"})
+    grams = {gram for (gram,) in conn.execute("SELECT trigram FROM node_trigrams")}
+    terms = {term for (term,) in conn.execute("SELECT term FROM node_terms")}
+
+    assert grams == set(trigrams(" packet loss"))
+    assert terms == {"packet", "loss"}
+    assert TextIndex(conn).search(["3f2a9", "4b2a packet", "b2a p", "4b2a loss"]) == [{uid}, {uid}, {uid}, set()]
+
+
+def test_changes_are_layered_over_the_stored_rows():
+    conn = _conn({"a": "a auth flow", "b": "b auth token"})
+    text_index = TextIndex(conn, {"a": None, "c": "c auth auth retry"})
+
+    assert text_index.search(["auth", "retry", "flow"]) == [{"b", "c"}, {"c"}, set()]
+    assert text_index.texts(["a", "b", "c"]) == {"b": "b auth token", "c": "c auth auth retry"}
+    statistics = text_index.statistics(["auth"])
+    assert (statistics.doc_count, statistics.average_length) == (2, 2.5)
+    assert statistics.frequencies == {"auth": {"b": 1, "c": 2}}
+    assert statistics.doc_lengths == {"b": 2, "c": 3}
+
+
+def test_text_index_follows_log_mutations_and_compaction(tmp_path: Path):
+    storage = _storage(tmp_path)
+    uid = storage.save_node(Story(role="dev", benefit="ship auth", status="todo"), "story")
+    other = storage.save_node(Memory(content="auth flow"), "memory")
+
+    assert storage.search_text(["auth", "done"]) == [{uid, other}, set()]
+    storage.update_node_status(uid, "done")
+    storage.remove_node(other)
+    assert storage.search_text(["auth", "done"]) == [{uid}, {uid}]
+    statistics = storage.text_statistics(["auth"])
+    assert (statistics.doc_count, statistics.doc_lengths) == (1, {uid: 4})
+
+    conn = storage._text_index_db()
+    removed_rows = sum(
+        conn.execute(f"SELECT COUNT(*) FROM {table} WHERE uid = ?", (other,)).fetchone()[0]
+        for table in ("node_terms", "node_trigrams", "node_texts")
+    )
+    changes = conn.total_changes
+    storage.flush_inbox()
+    assert stored_seq(conn) == storage.load_index().wal_seq
+    # The folded rows only: the other node's rows go, the story is rewritten, and the seq moves.
+    assert conn.total_changes - changes < removed_rows + 2 * len(trigrams(storage.load_search_texts([uid])[uid]))
+    assert {row for (row,) in conn.execute("SELECT uid FROM node_texts")} == {uid}
+    assert StorageEngine(storage.root).search_text(["ship auth", "auth flow"]) == [{uid}, set()]
+
+    changes = conn.total_changes
+    storage.prune()
+    assert conn.total_changes == changes
+
+
+def test_missing_text_index_is_rebuilt_without_bumping_the_generation(tmp_path: Path):
+    storage = _storage(tmp_path)
+    uid = storage.save_node(Memory(content="packet loss"), "memory")
+    storage.prune()
+    _remove_text_index(storage)
+
+    generation = storage.generation()
+    assert StorageEngine(storage.root).search_text(["packet"]) == [{uid}]
+    assert storage.text_index_file.exists()
+    assert storage.generation() == generation
+
+    _remove_text_index(storage)
+    reopened = StorageEngine(storage.root)
+    reopened.prune()
+    texts = dict(sqlite3.connect(reopened.text_index_file).execute("SELECT uid, text FROM node_texts"))
+    assert set(texts) == {uid}
+
+
+def test_prune_removes_the_legacy_json_text_index(tmp_path: Path):
+    storage = _storage(tmp_path)
+    storage.save_node(Memory(content="packet loss"), "memory")
+    for name in ("text_index.json", "text_delta.json"):
+        (storage.root / name).write_text(json.dumps({"texts": {}}), encoding="utf-8")
+
+    storage.prune()
+    assert not (storage.root / "text_index.json").exists()
+    assert not (storage.root / "text_delta.json").exists()
+
+
+def test_sqlite_text_terms_follow_mutations(tmp_path: Path):
+    storage = SqliteStorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    uid = storage.save_node(Story(role="dev", benefit="ship auth", status="todo"), "story")
+    other = storage.save_node(Memory(content="auth flow"), "memory")
+
+    assert storage.search_text(["auth", "ship auth", "p au", "--"]) == [{uid, other}, {uid}, {uid}, None]
+    storage.update_node_status(uid, "done")
+    storage.remove_node(other)
+    assert storage.search_text(["auth", "done", uid[:8]]) == [{uid}, {uid}, {uid}]
+
+    storage._connect().execute("DELETE FROM node_terms")
+    storage._connect().execute("DELETE FROM node_texts")
+    storage._connect().execute("DELETE FROM node_trigrams")
+    assert storage.search_text(["ship"]) == [{uid}]
+    assert storage.text_statistics(["ship"]).doc_lengths == {uid: 4}
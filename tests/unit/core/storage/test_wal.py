@@ -0,0 +1,270 @@
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.models.link import Link
+from pvrclawk.membank.models.nodes import Memory, Story
+from pvrclawk.utils.config import set_config_value
+
+
+def _storage(tmp_path: Path) -> StorageEngine:
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    return storage
+
+
+def test_saved_nodes_are_readable_from_log_before_compaction(tmp_path: Path):
+    storage = _storage(tmp_path)
+    uid = storage.save_node(Memory(content="pending", tags={"tcp": 1.0}), "memory")
+
+    assert json.loads((storage.nodes_dir / "_inbox.json").read_text(encoding="utf-8")) == {}
+    assert storage.load_node(uid).content == "pending"
+    assert storage.load_index().tags["tcp"] == {uid}
+
+    reopened = StorageEngine(storage.root)
+    assert reopened.load_node(uid).content == "pending"
+    assert reopened.resolve_uid(uid[:8]) == uid
+
+
+def test_status_update_appends_patch_without_rewriting_cluster(tmp_path: Path):
+    storage = _storage(tmp_path)
+    uid = storage.save_node(Story(role="dev", benefit="b", status="todo"), "story")
+    storage.prune()
+    cluster_files = {path: path.read_text(encoding="utf-8") for path in storage.nodes_dir.glob("*.json")}
+
+    assert storage.update_node_status(uid, "done") is True
+
+    assert {path: path.read_text(encoding="utf-8") for path in storage.nodes_dir.glob("*.json")} == cluster_files
+    assert storage.wal.read()[-1]["op"] == "patch"
+    assert storage.load_node(uid).status == "done"
+
+
+def test_remove_hides_node_and_incident_links(tmp_path: Path):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a", tags={"x": 1.0}), "memory")
+    b = storage.save_node(Memory(content="b", tags={"x": 1.0}), "memory")
+    storage.save_links([Link(source=a, target=b, tags=["x"])])
+    storage.prune()
+
+    assert storage.remove_node(b) is True
+
+    assert storage.load_node(b) is None
+    assert storage.load_links([a]) == []
+    assert storage.load_index().tags["x"] == {a}
+    assert b not in storage.load_index().links_in
+
+
+def test_prune_folds_log_into_snapshot_files(tmp_path: Path):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a", tags={"x": 1.0}), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    storage.save_links([Link(source=a, target=b)])
+
+    storage.prune()
+
+    assert storage.wal.read() == []
+    index = json.loads(storage.index_file.read_text(encoding="utf-8"))
+    assert index["wal_seq"] == 3
+    assert set(index["uid_file"]) == {a, b}
+    assert json.loads(storage.links_file.read_text(encoding="utf-8"))[a][0]["target"] == b
+    assert {node.uid for node in storage.all_nodes()} == {a, b}
+
+
+def test_torn_trailing_record_is_ignored(tmp_path: Path):
+    storage = _storage(tmp_path)
+    uid = storage.save_node(Memory(content="kept"), "memory")
+    with storage.wal.path.open("a", encoding="utf-8") as handle:
+        handle.write('{"seq": 2, "op": "node", "payl')
+
+    reopened = StorageEngine(storage.root)
+    assert [node.uid for node in reopened.all_nodes()] == [uid]
+
+
+def test_index_without_link_maps_is_upgraded_on_load(tmp_path: Path):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    link = Link(source=a, target=b)
+    storage.save_links([link])
+    storage.prune()
+    legacy = json.loads(storage.index_file.read_text(encoding="utf-8"))
+    del legacy["links_out"]
+    storage.index_file.write_text(json.dumps(legacy), encoding="utf-8")
+
+    reopened = StorageEngine(storage.root)
+    assert reopened.load_index().links_out == {a: {link.uid}}
+    assert reopened.remove_node(b) is True
+    assert reopened.load_index().links_in == {}
+
+
+def test_link_usage_is_logged_and_folded_by_prune(tmp_path: Path):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a", tags={"tcp": 1.0}), "memory")
+    b = storage.save_node(Memory(content="b", tags={"tcp": 1.0}), "memory")
+    link = Link(source=a, target=b, tags=["tcp"], usage_count=2)
+    storage.save_link(link)
+    storage.prune()
+    links_before = storage.links_file.read_bytes()
+    used_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    assert storage.record_link_usage([link.uid, link.uid], accessed_at=used_at) == 1
+    assert storage.wal.read() == []
+    assert storage.flush_link_usage() == 1
+
+    assert storage.links_file.read_bytes() == links_before
+    assert [record["op"] for record in storage.wal.read()] == ["usage"]
+    (pending,) = storage.all_links()
+    assert pending.usage_count == 4
+    assert pending.last_accessed == used_at
+
+    storage.prune()
+    assert storage.wal.read() == []
+    (folded,) = json.loads(storage.links_file.read_text(encoding="utf-8"))[a]
+    assert folded["usage_count"] == 4
+    assert StorageEngine(storage.root).all_links()[0].last_accessed == used_at
+
+
+def test_index_link_aggregates_track_saves_usage_and_removals(tmp_path: Path):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    c = storage.save_node(Memory(content="c"), "memory")
+    ab = Link(source=a, target=b, tags=["tcp"], usage_count=2)
+    bc = Link(source=b, target=c, tags=["tcp", "dns"], usage_count=3)
+    storage.save_links([ab, bc])
+    storage.record_link_usage([bc.uid])
+    storage.flush_link_usage()
+
+    index = StorageEngine(storage.root).load_index()
+    assert (index.total_usage, index.tag_usage, index.tag_link_counts) == (6, {"tcp": 6, "dns": 4}, {"tcp": 2, "dns": 1})
+
+    storage.remove_node(a)
+    index = StorageEngine(storage.root).load_index()
+    assert (index.total_usage, index.tag_usage, index.tag_link_counts) == (4, {"tcp": 4, "dns": 4}, {"tcp": 1, "dns": 1})
+    storage.prune()
+    index = StorageEngine(storage.root).load_index()
+    assert (index.total_usage, index.tag_usage, index.tag_link_counts) == (4, {"tcp": 4, "dns": 4}, {"tcp": 1, "dns": 1})
+    # Per-link data stays in links.json; the index only keeps postings and aggregates.
+    raw = json.loads(storage.index_file.read_text(encoding="utf-8"))
+    assert not {"link_ends", "link_usage", "link_tags"} & set(raw)
+
+
+def test_usage_records_carry_link_tags_and_skip_unknown_links(tmp_path: Path):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    link = Link(source=a, target=b, tags=["tcp"])
+    storage.save_link(link)
+
+    storage.record_link_usage([link.uid, "missing"])
+    storage.flush_link_usage()
+    (usage,) = [record for record in storage.wal.read() if record["op"] == "usage"]
+    assert (usage["links"], usage["tags"]) == ({link.uid: 1}, {link.uid: ["tcp"]})
+    index = StorageEngine(storage.root).load_index()
+    assert (index.total_usage, index.tag_usage) == (2, {"tcp": 2})
+
+
+def test_remove_records_without_link_details_are_settled_by_compaction(tmp_path: Path):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    link = Link(source=a, target=b, tags=["tcp"], usage_count=3)
+    storage.save_link(link)
+    storage.prune()
+    cluster = storage.load_index().uid_file[b]
+    legacy = {"seq": 0, "op": "remove", "uid": b, "type": "memory", "tags": [], "cluster": cluster, "links": {link.uid: a}}
+    storage.wal.append([legacy])
+
+    reopened = StorageEngine(storage.root)
+    assert reopened.load_index().links_out == {}
+    reopened.flush_inbox()
+    index = StorageEngine(storage.root).load_index()
+    assert (index.links_in, index.total_usage, index.tag_link_counts) == ({}, 0, {})
+    assert [node.uid for node in StorageEngine(storage.root).all_nodes()] == [a]
+
+
+def test_index_without_usage_aggregates_is_upgraded_on_load(tmp_path: Path):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    storage.save_link(Link(source=a, target=b, tags=["tcp"], usage_count=4))
+    storage.prune()
+    raw = json.loads(storage.index_file.read_text(encoding="utf-8"))
+    for key in ("total_usage", "tag_usage", "tag_link_counts"):
+        raw.pop(key)
+    storage.index_file.write_text(json.dumps(raw), encoding="utf-8")
+
+    index = StorageEngine(storage.root).load_index()
+
+    assert index.total_usage == 4
+    assert index.tag_link_counts == {"tcp": 1}
+
+
+def test_log_is_compacted_once_it_outgrows_the_configured_records(tmp_path: Path):
+    storage = _storage(tmp_path)
+    set_config_value(storage.config_file, "storage.wal_max_records", "3")
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    link = Link(source=a, target=b)
+    storage.save_link(link)
+    assert len(storage.wal.read()) == 3
+
+    storage.record_link_usage([link.uid])
+    storage.flush_link_usage()
+
+    assert storage.wal.read() == []
+    assert StorageEngine(storage.root).all_links()[0].usage_count == 2
+
+
+def test_concurrent_appends_keep_both_records(tmp_path: Path):
+    first = _storage(tmp_path)
+    second = StorageEngine(first.root)
+
+    with first.batch():
+        a = first.save_node(Memory(content="a"), "memory")
+        b = second.save_node(Memory(content="b"), "memory")
+
+    assert [record["seq"] for record in first.wal.read()] == [1, 2]
+    assert {node.uid for node in StorageEngine(first.root).all_nodes()} == {a, b}
+
+
+def test_compaction_keeps_records_appended_by_another_process(tmp_path: Path):
+    first = _storage(tmp_path)
+    second = StorageEngine(first.root)
+    a = first.save_node(Memory(content="a"), "memory")
+    b = first.save_node(Memory(content="b"), "memory")
+    link = Link(source=a, target=b)
+    first.save_link(link)
+
+    with first.batch():
+        first._compact_wal()
+        second.record_link_usage([link.uid])
+        second.flush_link_usage()
+
+    assert [record["op"] for record in first.wal.read()] == ["usage"]
+    assert StorageEngine(first.root).all_links()[0].usage_count == 2
+
+
+def test_link_usage_is_buffered_and_written_without_fsync(tmp_path: Path, monkeypatch):
+    storage = _storage(tmp_path)
+    a = storage.save_node(Memory(content="a"), "memory")
+    b = storage.save_node(Memory(content="b"), "memory")
+    links = [Link(source=a, target=b, tags=[str(i)]) for i in range(3)]
+    storage.save_links(links)
+    monkeypatch.setattr("pvrclawk.membank.core.storage.engine.USAGE_BUFFER_LIMIT", 2)
+    monkeypatch.setattr(os, "fsync", lambda fd: pytest.fail("usage must not be fsynced"))
+
+    used_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    storage.record_link_usage([links[0].uid], accessed_at=used_at)
+    storage.record_link_usage([links[0].uid], accessed_at=used_at)
+    assert [record["op"] for record in storage.wal.read()] == ["node", "node", "link", "link", "link"]
+
+    storage.record_link_usage([links[1].uid], accessed_at=used_at)
+    (usage,) = [record for record in storage.wal.read() if record["op"] == "usage"]
+    assert usage["links"] == {links[0].uid: 2, links[1].uid: 1}
+    assert storage.flush_link_usage() == 0
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from pvrclawk.membank.core.storage import writer as writer_module
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.core.storage.writer import StorageWriter
+from pvrclawk.membank.models.nodes import Memory
+from pvrclawk.utils.json_io import JsonCodec
+
+
+def _record_writes(monkeypatch) -> list[Path]:
+    written: list[Path] = []
+    original = writer_module.atomic_write_bytes
+
+    def recording_write(path, blob):
+        written.append(Path(path))
+        original(path, blob)
+
+    monkeypatch.setattr(writer_module, "atomic_write_bytes", recording_write)
+    return written
+
+
+def test_writer_skips_unchanged_content(tmp_path: Path, monkeypatch):
+    path = tmp_path / "data.json"
+    writer = StorageWriter(JsonCodec("stdlib"))
+    written = _record_writes(monkeypatch)
+
+    assert writer.write_json(path, {"a": 1}) is True
+    assert writer.write_json(path, {"a": 1}) is False
+    assert StorageWriter(JsonCodec("stdlib")).read_json(path, {}) == {"a": 1}
+    assert writer.write_json(path, {"a": 2}) is True
+    assert written == [path, path]
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+
+def test_writer_rewrites_after_forget_or_external_delete(tmp_path: Path):
+    path = tmp_path / "data.json"
+    writer = StorageWriter(JsonCodec("stdlib"))
+    writer.write_json(path, {"a": 1})
+    path.unlink()
+
+    assert writer.write_json(path, {"a": 1}) is True
+    assert path.exists()
+
+
+def test_repeated_prune_writes_nothing(tmp_path: Path, monkeypatch):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    storage.save_node(Memory(content="a", tags={"tcp": 1.0}), "memory")
+    storage.prune()
+
+    reopened = StorageEngine(storage.root)
+    written = _record_writes(monkeypatch)
+    reopened.prune()
+
+    assert written == []
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pvrclawk.membank.commands.render import render_node
+from pvrclawk.membank.core.storage.engine import StorageEngine
+from pvrclawk.membank.models.nodes import Memory, Task
+from pvrclawk.membank.models.view import NodeView
+
+
+def test_view_reads_header_fields_without_validating():
+    payload = {
+        "uid": "u1",
+        "tags": {"tcp": 1.0},
+        "updated_at": "2026-01-02T03:04:05Z",
+        "content": "hello",
+        "__type__": "memory",
+    }
+    view = NodeView(payload, Memory)
+
+    assert view.uid == "u1"
+    assert view.tags == {"tcp": 1.0}
+    assert view.updated_at == datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert view._node is None
+    assert render_node(view, truncated=True) == "(Memory) [u1] tcp"
+    assert view._node is None
+
+    assert view.content == "hello"
+    assert isinstance(view.materialize(), Memory)
+    assert "__type__" in payload
+
+
+def test_storage_returns_views_when_lazy(tmp_path: Path):
+    storage = StorageEngine(tmp_path / ".pvrclawk")
+    storage.init_db()
+    uid = storage.save_node(Task(content="ship it", tags={"release": 1.0}), "task")
+
+    views = storage.load_nodes_by_type("task", lazy=True)
+    assert [type(view) for view in views] == [NodeView]
+    assert views[0].node_class is Task
+    assert render_node(views[0]) == render_node(storage.load_node(uid))
@@ -1,5 +1,8 @@
 from pathlib import Path
 
+import pydantic
+import pytest
+
 from pvrclawk.utils.config import (
     AppConfig,
     FederationScoringConfig,
@@ -77,3 +80,8 @@ def test_set_retrieval_resistance_threshold(tmp_path: Path):
     assert updated.retrieval.resistance_threshold == 0.5
     loaded = load_config(path)
     assert loaded.retrieval.resistance_threshold == 0.5
+
+
+def test_storage_backend_must_be_known():
+    with pytest.raises(pydantic.ValidationError):
+        AppConfig.model_validate({"storage": {"backend": "mongo"}})
@@ -1,6 +1,8 @@
 from pathlib import Path
 
-from pvrclawk.utils.json_io import read_json, write_json
+import pytest
+
+from pvrclawk.utils.json_io import JsonCodec, read_json, write_json
 
 
 def test_write_and_read_json(tmp_path: Path):
@@ -30,3 +32,26 @@ def test_write_json_nested(tmp_path: Path):
     write_json(path, data)
     loaded = read_json(path, {})
     assert loaded["a"]["b"] == [1, 2, 3]
+
+
+def test_write_json_is_compact_unless_pretty(tmp_path: Path):
+    path = tmp_path / "data.json"
+    codec = JsonCodec("stdlib")
+    write_json(path, {"a": [1, 2]}, codec)
+    assert path.read_text(encoding="utf-8") == '{"a":[1,2]}'
+    write_json(path, {"a": [1, 2]}, codec, pretty=True)
+    assert path.read_text(encoding="utf-8").startswith('{\n  "a"')
+
+
+def test_codecs_read_each_others_output(tmp_path: Path):
+    path = tmp_path / "data.json"
+    data = {"uid": "é", "tags": {"tcp": 0.5}, "n": [1, None, True]}
+    write_json(path, data, JsonCodec("auto"))
+    assert read_json(path, {}, JsonCodec("stdlib")) == data
+    write_json(path, data, JsonCodec("stdlib"))
+    assert read_json(path, {}, JsonCodec("auto")) == data
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        JsonCodec("yaml")